@@ -2,10 +2,15 @@ import os
 from flask import Flask
 from flask_session import Session
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from dotenv import load_dotenv
 from datetime import timedelta
 from backend.extensions import db, bcrypt  # extensions에서 가져옴
 from flask_migrate import Migrate  # 마이그레이션 모듈 추가
+from backend.json_provider import FastJSONProvider
+from backend.compression import init_compression
+from backend.resilience import init_resilience
+from backend.summary_queue import init_summary_queue
 import logging
 from logging import FileHandler
 
@@ -13,6 +18,7 @@ from logging import FileHandler
 load_dotenv()
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)  # orjson / msgspec 이 있으면 사용하는 JSON 직렬화
 CORS(app, resources={r"/*": {"origin": ["http://reciperecom.store"]}}, supports_credentials=True)
 
 # 환경 변수에서 DB 정보 가져오기
@@ -26,6 +32,11 @@ DB_NAME = os.getenv('DB_NAME')
 app.config['SQLALCHEMY_DATABASE_URI'] = f'mysql://{DB_USERNAME}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# 리버스 프록시 뒤에서 X-Forwarded-For 로 실제 클라이언트 IP 를 얻을 때 신뢰할 프록시 수 (0 이면 사용 안 함)
+PROXY_FIX_X_FOR = int(os.getenv('PROXY_FIX_X_FOR', 0))
+if PROXY_FIX_X_FOR:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=PROXY_FIX_X_FOR)
+
 # 세션 설정
 app.config['SESSION_TYPE'] = 'filesystem'
 app.config['SECRET_KEY'] = os.urandom(24)
@@ -38,6 +49,15 @@ db.init_app(app)
 bcrypt.init_app(app)
 Session(app)
 
+# 응답 압축 (br / gzip)
+init_compression(app)
+
+# 요청별 업스트림 호출 기한 (REQUEST_DEADLINE)
+init_resilience(app)
+
+# 저장된 대화 백그라운드 요약 워커 (SUMMARY_WORKERS)
+init_summary_queue(app)
+
 # Flask-Migrate 초기화
 # 마이그레이션 설정 추가
 migrate = Migrate(app, db)
@@ -53,6 +73,10 @@ from backend.routes import register_routes
 # Routes 등록
 register_routes(app)
 
+# 디스크에 저장된 검색 색인 불러오기 (없으면 첫 검색 시 생성)
+from backend.search import search_index
+search_index.load()
+
 if __name__ == '__main__':
     # app.run(debug=True, port=5001)
     app.run('0.0.0.0', port=5000)
@@ -0,0 +1,11 @@
+"""ASGI 진입점.
+
+업스트림 호출 위주의 엔드포인트(/api/chat, /api/speech-to-text, /api/play_voice,
+/api/search-trend)는 asyncio 로, 나머지는 Flask 앱으로 처리한다.
+
+    uvicorn backend.asgi:application --host 0.0.0.0 --port 5000
+"""
+from backend.app import app
+from backend.async_routes import create_asgi_app
+
+application = create_asgi_app(app)
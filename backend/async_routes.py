@@ -0,0 +1,311 @@
+"""ASGI 실행 모드용 라우트.
+
+업스트림(Clova / Naver) 응답을 기다리는 시간이 대부분인 엔드포인트는 asyncio
+핸들러로 처리해 워커 하나가 수백 개의 업스트림 호출을 동시에 기다릴 수 있게 하고,
+나머지 요청은 스레드 풀에서 기존 Flask 앱(WSGI)으로 처리한다.
+두 경우 모두 Flask 의 request / session / after_request 훅(CORS, 압축)을 그대로 쓴다.
+
+/api/save-conversation 은 원문 저장 후 요약 작업을 큐에 넣기만 하고 업스트림을 기다리지
+않으므로 (backend/summary_queue.py) asyncio 핸들러 없이 WSGI 쪽에서 처리한다.
+
+    uvicorn backend.asgi:application --host 0.0.0.0 --port 5000
+"""
+import asyncio
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+import aiohttp
+from flask import current_app, request, jsonify, send_file
+from .http_client import async_http_client
+from .resilience import UpstreamUnavailable
+from .chat_context import record_exchange, request_chat_session
+from .retrieval import catalog_answer, linked_recipe_ids, retrieve_recipes, strip_recipe_ids
+from .routes import (
+    build_chat_request, chat_content, completion_executor, fallback_chat_answer,
+    fetch_tts_audio_async, get_search_trend_async, search_trend_params, stt_request_args,
+)
+
+
+# WSGI(Flask) 로 넘기는 요청을 처리할 스레드 수 (동기 워커 수에 해당)
+ASGI_WSGI_THREADS = int(os.getenv('ASGI_WSGI_THREADS', 32))
+
+
+def build_environ(scope, body):
+    """ASGI http scope + 요청 본문 -> WSGI environ."""
+    script_name = scope.get('root_path', '')
+    path_info = scope['path']
+    if script_name and path_info.startswith(script_name):
+        path_info = path_info[len(script_name):]
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': script_name.encode('utf-8').decode('latin1'),
+        'PATH_INFO': path_info.encode('utf-8').decode('latin1'),
+        'QUERY_STRING': scope['query_string'].decode('latin1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope['http_version']}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin1').upper().replace('-', '_')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = 'HTTP_' + name
+        value = value.decode('latin1')
+        environ[name] = f'{environ[name]},{value}' if name in environ else value
+    return environ
+
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            break
+    return b''.join(chunks)
+
+
+def response_start(status, headers):
+    return {
+        'type': 'http.response.start',
+        'status': int(status.split(' ', 1)[0]),
+        'headers': [(k.lower().encode('latin1'), v.encode('latin1')) for k, v in headers],
+    }
+
+
+class FlaskAsgiApp:
+    """Flask 앱을 감싸는 ASGI 앱. route() 로 등록한 경로만 asyncio 핸들러로 처리한다."""
+
+    def __init__(self, flask_app, wsgi_threads=ASGI_WSGI_THREADS):
+        self.flask_app = flask_app
+        self.routes = {}  # (method, path) -> async handler
+        self.executor = ThreadPoolExecutor(max_workers=wsgi_threads, thread_name_prefix='wsgi')
+
+    def route(self, path, methods):
+        def decorator(handler):
+            for method in methods:
+                self.routes[(method, path)] = handler
+            return handler
+        return decorator
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+        handler = self.routes.get((scope['method'], scope['path']))
+        body = await read_body(receive)
+        environ = build_environ(scope, body)
+        if handler is None:
+            await self.call_wsgi(environ, send)
+        else:
+            await self.dispatch(handler, environ, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await async_http_client.aclose()
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def dispatch(self, handler, environ, send):
+        """Flask.wsgi_app / full_dispatch_request 와 같은 순서로 async 핸들러 실행."""
+        app = self.flask_app
+        ctx = app.request_context(environ)
+        error = None
+        ctx.push()
+        try:
+            try:
+                try:
+                    rv = app.preprocess_request()
+                    if rv is None:
+                        rv = await handler()
+                except Exception as e:
+                    rv = app.handle_user_exception(e)
+                response = app.finalize_request(rv)
+            except Exception as e:
+                error = e
+                response = app.handle_exception(e)
+
+            status_headers = []
+            body = response(environ, lambda status, headers, exc_info=None: status_headers.extend((status, headers)))
+            try:
+                await send(response_start(*status_headers))
+                for chunk in body:
+                    if chunk:
+                        await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                await send({'type': 'http.response.body', 'body': b''})
+            finally:
+                if hasattr(body, 'close'):
+                    body.close()
+        finally:
+            ctx.pop(error)
+
+    async def call_wsgi(self, environ, send):
+        """나머지 요청은 스레드 풀에서 Flask 앱으로 처리 (스트리밍 응답은 청크 단위로 전달)."""
+        loop = asyncio.get_running_loop()
+
+        def send_sync(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        def run():
+            status_headers = []
+            body = self.flask_app(environ, lambda status, headers, exc_info=None: status_headers.extend((status, headers)))
+            try:
+                send_sync(response_start(*status_headers))
+                for chunk in body:
+                    if chunk:
+                        send_sync({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                send_sync({'type': 'http.response.body', 'body': b''})
+            finally:
+                if hasattr(body, 'close'):
+                    body.close()
+
+        await loop.run_in_executor(self.executor, run)
+
+
+def register_async_routes(asgi_app):
+    # Clova X Chat Route
+    @asgi_app.route('/api/chat', methods=['POST'])
+    async def clova_x_chat():
+        data = request.get_json()
+
+        # DB 조회 / 레시피 후보 검색은 이벤트 루프를 막지 않도록 스레드에서 실행
+        def prepare():
+            chat_session = request_chat_session(data)
+            candidates, items, confident = retrieve_recipes(data.get('message'))
+            if confident:
+                answer = catalog_answer(candidates, items)
+                record_exchange(chat_session, data.get('message'), answer)
+                return chat_session, candidates, items, answer, None
+            return chat_session, candidates, items, None, build_chat_request(data, chat_session, candidates)
+
+        chat_session, candidates, items, answer, request_data = await asyncio.to_thread(prepare)
+        if answer is not None:
+            return jsonify({"response": answer, "session_id": chat_session.id,
+                            "recipe_ids": [c.id for c in candidates], "source": "catalog"})
+
+        # Clova 장애 시 캐시된 답변 / 카탈로그 후보로 바로 응답
+        async def fallback_response(error_response):
+            answer, source, recipe_ids = await asyncio.to_thread(fallback_chat_answer, request_data, candidates, items)
+            if answer is None:
+                return error_response
+            return jsonify({"response": answer, "session_id": chat_session.id,
+                            "recipe_ids": recipe_ids, "source": source, "fallback": True})
+
+        try:
+            response_data = await completion_executor.execute_async(request_data)
+            content = chat_content(response_data)
+            if not content:
+                return await fallback_response(
+                    (jsonify({"response": "An error occurred while retrieving the recommended menu."}), 500))
+
+            recipe_ids = linked_recipe_ids(content, candidates)
+            content = strip_recipe_ids(content)
+            await asyncio.to_thread(record_exchange, chat_session, data.get('message'), content)
+            return jsonify({"response": content, "session_id": chat_session.id,
+                            "recipe_ids": recipe_ids, "source": "clova"})
+
+        except (aiohttp.ClientError, UpstreamUnavailable) as e:
+            current_app.logger.warning("Error in clova_x_chat: %s", e)
+            return await fallback_response(
+                (jsonify({"error": "The recommendation service is temporarily unavailable."}), 503))
+
+        except Exception:
+            current_app.logger.exception("Error in clova_x_chat")
+            return jsonify({"error": "An error occurred while processing your request."}), 500
+
+    # 네이버 음성 인식 API 호출 엔드포인트
+    @asgi_app.route('/api/speech-to-text', methods=['POST'])
+    async def speech_to_text():
+        if 'audio' not in request.files:
+            return jsonify({"error": "No audio file provided"}), 400
+
+        audio_file = request.files['audio']
+        current_app.logger.debug("Received file content type: %s", audio_file.content_type)
+
+        # 동시 요청끼리 파일이 겹치지 않도록 요청마다 임시 디렉터리 사용
+        with tempfile.TemporaryDirectory() as workdir:
+            original_path = os.path.join(workdir, 'uploaded_audio.webm')
+            converted_path = os.path.join(workdir, 'converted_audio.mp3')
+            audio_file.save(original_path)
+
+            # WebM to MP3 변환
+            process = await asyncio.create_subprocess_exec(
+                '/usr/bin/ffmpeg', '-y', '-i', original_path, '-f', 'mp3', '-ab', '192k', converted_path,
+                stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+            )
+            if await process.wait() != 0:
+                current_app.logger.error("Error during audio conversion: ffmpeg exited with %s", process.returncode)
+                return jsonify({"error": "Audio conversion failed"}), 500
+
+            with open(converted_path, 'rb') as mp3_file:
+                audio_data = mp3_file.read()
+
+        try:
+            response = await async_http_client.post('stt', idempotent=True, **stt_request_args(audio_data))
+        except UpstreamUnavailable as e:
+            current_app.logger.warning("Error during STT process: %s", e)
+            return jsonify({"error": "Speech recognition is temporarily unavailable"}), 503
+        except aiohttp.ClientError as e:
+            current_app.logger.warning("Error during STT process: %s", e)
+            return jsonify({"error": "Failed to process audio"}), 502
+
+        if response.status_code == 200:
+            return jsonify({"transcript": response.json().get("text", "")})
+        current_app.logger.warning("Error during STT process: %s", response.text)
+        return jsonify({
+            "error": "Failed to process audio",
+            "details": response.text,
+            "status_code": response.status_code
+        }), response.status_code
+
+    @asgi_app.route('/api/play_voice', methods=['POST'])
+    async def play_voice():
+        data = request.get_json()
+        text = data.get('text', '')
+
+        if not text:
+            return jsonify({"error": "No text provided"}), 400
+
+        try:
+            audio_content = await fetch_tts_audio_async(text)
+            return send_file(BytesIO(audio_content), mimetype="audio/mpeg")
+
+        except UpstreamUnavailable as e:
+            current_app.logger.warning("TTS API Error: %s", e)
+            return jsonify({"error": "Text-to-speech is temporarily unavailable"}), 503
+        except aiohttp.ClientError as e:
+            current_app.logger.warning("TTS API Error: %s", e)
+            return jsonify({"error": "Failed to fetch TTS audio"}), 500
+
+    # NAVER Trend
+    @asgi_app.route('/api/search-trend', methods=['POST'])
+    async def search_trend():
+        data = request.get_json()
+        response_data = await get_search_trend_async(**search_trend_params(data))
+        return jsonify(response_data)
+
+
+def create_asgi_app(flask_app):
+    asgi_app = FlaskAsgiApp(flask_app)
+    register_async_routes(asgi_app)
+    return asgi_app
@@ -0,0 +1,94 @@
+"""대화 기록 내보내기: 전체를 메모리에 올려 JSON 하나로 응답 vs /api/conversations/export NDJSON 스트리밍.
+
+대화 수를 늘려 가며 응답을 끝까지 받는 시간과 Python 힙 최대 사용량(tracemalloc)을 비교한다.
+스트리밍은 대화 수와 관계없이 최대 메모리가 일정해야 한다.
+
+    python -m backend.benchmarks.conversation_export --sizes 1000 5000 20000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from flask import jsonify
+from sqlalchemy import insert
+from backend.benchmarks.upstream_concurrency import make_app
+from backend.benchmarks.conversation_history import TRANSCRIPT_LINES
+from backend.extensions import db
+from backend.models import User, Conversation
+
+
+def seed(app, username, conversations):
+    rng = random.Random(7)
+    with app.app_context():
+        user = User(username=username, email=f'{username}@example.com', password='x')
+        db.session.add(user)
+        db.session.flush()
+        for start in range(0, conversations, 1000):
+            db.session.execute(insert(Conversation), [{
+                'user_id': user.id,
+                'original_text': '\n'.join(rng.choice(TRANSCRIPT_LINES) for _ in range(rng.randint(4, 40))),
+                'summary_text': '계란과 양파로 만들 수 있는 메뉴를 추천받았습니다.',
+                'summary_status': 'done',
+            } for _ in range(min(1000, conversations - start))])
+        db.session.commit()
+        return user.id
+
+
+def export_all(user_id):
+    """기존 방식으로 내보내기: 사용자 대화를 모두 불러와 JSON 응답 하나로 만듦."""
+    conversations = Conversation.query.filter_by(user_id=user_id).order_by(Conversation.id).all()
+    return jsonify({'conversations': [{
+        'id': conv.id,
+        'created_at': conv.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+        'summary': conv.summary_text,
+        'original_text': conv.original_text,
+    } for conv in conversations]})
+
+
+def measure(fn):
+    """fn 이 응답 본문 크기를 돌려줄 때까지의 시간(ms)과 힙 최대 사용량(MiB)."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = fn()
+    elapsed = (time.perf_counter() - started) * 1000
+    peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description='conversation export memory benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 20000])
+    args = parser.parse_args()
+
+    database = tempfile.NamedTemporaryFile(suffix='.db', delete=False).name
+    try:
+        app = make_app(database)
+        print(f'{"conversations":>13} {"mode":<10} {"time ms":>9} {"peak MiB":>9} {"bytes":>11}')
+        for conversations in args.sizes:
+            user_id = seed(app, f'export{conversations}', conversations)
+            client = app.test_client()
+            with client.session_transaction() as sess:
+                sess['user_id'] = user_id
+
+            def before():
+                with app.test_request_context():
+                    return len(export_all(user_id).get_data())
+
+            def after():
+                response = client.get('/api/conversations/export', buffered=False)
+                size = sum(len(chunk) for chunk in response.response)
+                response.close()
+                return size
+
+            for mode, fn in (('all', before), ('stream', after)):
+                elapsed, peak, size = measure(fn)
+                print(f'{conversations:>13} {mode:<10} {elapsed:>9.1f} {peak:>9.2f} {size:>11}')
+    finally:
+        os.unlink(database)
+
+
+if __name__ == '__main__':
+    main()
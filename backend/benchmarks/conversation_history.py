@@ -0,0 +1,157 @@
+"""대화 목록 API: 전체 조회(기존) vs (created_at, id) 커서 페이지 + original_text 제외 조회.
+
+임시 sqlite DB 에 사용자별로 수천 개의 대화(대화 원문 수 KB)를 넣고
+/api/conversations 한 번에 걸리는 시간과 응답 크기, SELECT 로 읽는 컬럼을 비교한다.
+
+    python -m backend.benchmarks.conversation_history --users 5 --conversations 5000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import event, insert
+from backend.benchmarks.upstream_concurrency import make_app
+from backend.extensions import db
+from backend.models import User, Conversation
+
+ROUNDS = 20
+
+TRANSCRIPT_LINES = (
+    '계란이랑 양파, 대파가 있는데 저녁으로 뭐 만들 수 있을까요?',
+    '계란과 양파로 간단하게 만들 수 있는 양파 계란덮밥이나 계란말이를 추천드려요.',
+    '맵지 않은 걸로 아이도 같이 먹을 수 있는 메뉴면 좋겠어요.',
+    '그렇다면 새우 두부 계란찜은 어떠세요? 부드럽고 간이 세지 않아 아이와 함께 먹기 좋아요.',
+    '두부는 없는데 대신 넣을 수 있는 재료가 있을까요?',
+    '두부 대신 애호박이나 감자를 넣어도 식감이 비슷하게 부드러워요.',
+)
+
+
+def seed(app, users, conversations):
+    """사용자별 대화 생성 (대화 원문은 4 ~ 40 줄)."""
+    rng = random.Random(7)
+    start = datetime(2024, 1, 1)
+    text_bytes = 0
+    with app.app_context():
+        user_ids = []
+        for n in range(users):
+            user = User(username=f'bench{n}', email=f'bench{n}@example.com', password='x')
+            db.session.add(user)
+            db.session.flush()
+            user_ids.append(user.id)
+        for user_id in user_ids:
+            rows = []
+            for i in range(conversations):
+                lines = [rng.choice(TRANSCRIPT_LINES) for _ in range(rng.randint(4, 40))]
+                rows.append({
+                    'user_id': user_id,
+                    'original_text': '\n'.join(lines),
+                    'summary_text': '계란과 양파로 만들 수 있는 메뉴를 추천받았습니다.',
+                    # 초 단위 시각이 같은 대화가 섞이도록 (MySQL DATETIME 정밀도)
+                    'created_at': start + timedelta(seconds=i // 3),
+                    'summary_status': 'done',
+                    'summary_attempts': 1,
+                })
+            text_bytes += sum(len(row['original_text'].encode('utf-8')) for row in rows)
+            db.session.execute(insert(Conversation), rows)
+        db.session.commit()
+    return user_ids, text_bytes
+
+
+def list_all(user_id):
+    """기존 /api/conversations: 사용자 대화 전체를 모든 컬럼과 함께 조회."""
+    conversations = Conversation.query.filter_by(user_id=user_id).all()
+    return {
+        'conversations': [
+            {
+                'id': conv.id,
+                'created_at': conv.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+                'summary_text': conv.summary_text,
+            } for conv in conversations
+        ]
+    }
+
+
+def capture_selects(engine):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append(' '.join(statement.split()))
+
+    event.listen(engine, 'before_cursor_execute', capture)
+    return statements, lambda: event.remove(engine, 'before_cursor_execute', capture)
+
+
+def timed(fn, rounds=ROUNDS):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        result = fn()
+    return (time.perf_counter() - started) / rounds * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='conversation history listing benchmark')
+    parser.add_argument('--users', type=int, default=5)
+    parser.add_argument('--conversations', type=int, default=5000, help='conversations per user')
+    parser.add_argument('--limit', type=int, default=20, help='page size')
+    args = parser.parse_args()
+
+    database = tempfile.NamedTemporaryFile(suffix='.db', delete=False).name
+    try:
+        app = make_app(database)
+        user_ids, text_bytes = seed(app, args.users, args.conversations)
+        user_id = user_ids[len(user_ids) // 2]
+        print(f'{args.users} users x {args.conversations} conversations, '
+              f'original_text {text_bytes / 1024 / 1024:.1f} MiB in total')
+
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['user_id'] = user_id
+
+        with app.app_context():
+            before_ms, payload = timed(lambda: app.json.dumps(list_all(user_id)))
+            statements, stop = capture_selects(db.engine)
+            list_all(user_id)
+            stop()
+        print(f'[before] full list          {before_ms:8.2f} ms  {len(payload):>9} bytes  '
+              f'{args.conversations} rows')
+        print(f'         {statements[-1][:150]}')
+
+        url = f'/api/conversations?limit={args.limit}'
+        first_ms, response = timed(lambda: client.get(url))
+        first_page = response.get_json()
+        print(f'[after]  first page         {first_ms:8.2f} ms  {len(response.data):>9} bytes  '
+              f'{len(first_page["conversations"])} rows')
+
+        # 깊은 페이지: 목록 끝 근처 커서 (keyset 이라 OFFSET 처럼 앞 페이지를 건너뛰며 읽지 않음)
+        cursor = first_page['next_cursor']
+        with app.app_context():
+            statements, stop = capture_selects(db.engine)
+        walk_started = time.perf_counter()
+        pages = 1
+        deep_cursor = None
+        while cursor:
+            body = client.get(f'{url}&cursor={cursor}').get_json()
+            cursor = body['next_cursor']
+            pages += 1
+            if pages == max(2, args.conversations // args.limit - 1):
+                deep_cursor = cursor
+        walk_ms = (time.perf_counter() - walk_started) * 1000
+        stop()
+        print(f'[after]  walk all pages     {walk_ms:8.2f} ms  {pages} pages')
+        print(f'         {statements[-1][:150]}')
+        if deep_cursor:
+            deep_ms, response = timed(lambda: client.get(f'{url}&cursor={deep_cursor}'))
+            print(f'[after]  deep page          {deep_ms:8.2f} ms  {len(response.data):>9} bytes')
+
+        detail_id = first_page['conversations'][0]['id']
+        detail_ms, response = timed(lambda: client.get(f'/api/conversation/{detail_id}'))
+        print(f'[after]  one transcript     {detail_ms:8.2f} ms  {len(response.data):>9} bytes')
+    finally:
+        os.unlink(database)
+
+
+if __name__ == '__main__':
+    main()
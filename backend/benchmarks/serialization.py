@@ -0,0 +1,75 @@
+"""목록 / 상세 응답의 JSON 직렬화 시간과 전송 크기 비교.
+
+기존 방식(표준 json + 무압축)과 FastJSONProvider + gzip / br 압축을 비교한다.
+DB 없이 실제 데이터와 비슷한 형태의 샘플 응답으로 측정한다.
+
+    python -m backend.benchmarks.serialization
+"""
+import gzip
+import timeit
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from backend.json_provider import FastJSONProvider
+from backend.compression import brotli, compress_body
+
+ROUNDS = 2000
+
+IMAGE_BASE = 'http://www.foodsafetykorea.go.kr/uploadimg/cook/'
+
+
+def sample_list_payload(size=12):
+    return {
+        'recipes': [
+            {'id': 100 + i, 'rcp_nm': f'새우 두부 계란찜 {i}', 'att_file_no_main': f'{IMAGE_BASE}10_{i:05}_2.png'}
+            for i in range(size)
+        ],
+        'total_pages': 94,
+    }
+
+
+def sample_detail_payload(steps=10):
+    return {
+        'id': 28,
+        'name': '새우 두부 계란찜',
+        'main_image': f'{IMAGE_BASE}10_00028_2.png',
+        'ingredients': '새우두부계란찜\n연두부 75g(3/4모), 칵테일새우 20g(5마리), 달걀 30g(1/2개), '
+                       '생크림 13g(1큰술), 설탕 5g(1작은술), 무염버터 5g(1작은술)\n고명\n시금치 10g(3줄기)',
+        'tip': '기호에 따라 새우 대신 게살을 넣어도 부드럽게 즐길 수 있습니다.',
+        'steps': [
+            {
+                'step': i,
+                'description': f'{i}. 손질된 새우를 끓는 물에 데쳐 건진 후 달걀은 잘 풀어 생크림, 설탕을 넣고 섞는다.',
+                'image': f'{IMAGE_BASE}20_00028_{i}.png',
+            } for i in range(1, steps + 1)
+        ],
+    }
+
+
+def measure(name, payload, before, after):
+    before_time = timeit.timeit(lambda: before.dumps(payload).encode('utf-8'), number=ROUNDS) / ROUNDS
+    after_time = timeit.timeit(lambda: after.dumps_bytes(payload), number=ROUNDS) / ROUNDS
+    raw = after.dumps_bytes(payload)
+    print(f'[{name}]')
+    print(f'  encode  json(before) {before_time * 1e6:8.1f} us   {after.backend}(after) {after_time * 1e6:8.1f} us')
+    print(f'  bytes   json(before) {len(before.dumps(payload).encode("utf-8")):8d}      {after.backend}(after) {len(raw):8d}')
+
+    gzip_time = timeit.timeit(lambda: compress_body(raw, 'gzip'), number=ROUNDS // 10) / (ROUNDS // 10)
+    print(f'  gzip    {len(gzip.compress(raw)):8d} bytes  {gzip_time * 1e6:8.1f} us')
+    if brotli is not None:
+        br_time = timeit.timeit(lambda: compress_body(raw, 'br'), number=ROUNDS // 10) / (ROUNDS // 10)
+        print(f'  br      {len(compress_body(raw, "br")):8d} bytes  {br_time * 1e6:8.1f} us')
+    else:
+        print('  br      (brotli not installed)')
+
+
+def main():
+    app = Flask(__name__)
+    before = DefaultJSONProvider(app)
+    after = FastJSONProvider(app)
+    measure('list /api/recipes', sample_list_payload(), before, after)
+    measure('detail /api/recipe/<id>', sample_detail_payload(), before, after)
+    measure('batch /api/recipes/batch (12)', {'recipes': [sample_detail_payload() for _ in range(12)]}, before, after)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""비슷한 레시피 사전 계산의 단계별 소요 시간 측정.
+
+DB 의 rcp_set 전체를 한 번 읽은 뒤, 그대로(x1)와 복제해서 늘린 크기(x2, x4)로
+벡터화 / top-k 계산 시간을 측정한다. 결과 파일은 임시 디렉터리에 저장한다.
+
+    python -m backend.benchmarks.similar_build
+"""
+import tempfile
+from collections import namedtuple
+from backend.app import app
+from backend.similar import build, load_rows, SIMILAR_TOP_K
+
+Row = namedtuple('Row', 'id rcp_nm hash_tag rcp_parts_dtls rcp_way2 rcp_pat2')
+
+
+def scaled(rows, factor):
+    """레시피를 factor 배로 복제 (ID 만 다르게)."""
+    offset = max(r.id for r in rows)
+    return [Row(r.id + offset * i, *r[1:]) for i in range(factor) for r in rows]
+
+
+def main():
+    with app.app_context():
+        rows = [Row(*r) for r in load_rows()]
+    if not rows:
+        raise SystemExit('rcp_set 테이블이 비어 있습니다.')
+
+    for factor in (1, 2, 4):
+        with tempfile.TemporaryDirectory() as directory:
+            with app.app_context():
+                meta, timings = build(scaled(rows, factor), k=SIMILAR_TOP_K, directory=directory)
+        total = timings['vectorize'] + timings['top_k']
+        print(f"x{factor}: {meta['recipes']} recipes, {meta['features']} features, "
+              f"vectorize {timings['vectorize']:.3f}s, top_k {timings['top_k']:.3f}s, total {total:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
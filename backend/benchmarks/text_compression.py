@@ -0,0 +1,94 @@
+"""대화 원문 압축 방식 비교: 무압축 / zlib / zstd / zstd + 학습한 사전.
+
+레시피 추천 대화와 비슷한 합성 대화를 만들어 일부로 zstd 사전을 학습하고,
+나머지 대화로 저장 크기와 압축 / 해제 시간을 측정한다 (DB 없이 backend/text_compression.py 코덱만 사용).
+
+    python -m backend.benchmarks.text_compression --conversations 3000
+"""
+import argparse
+import random
+import tempfile
+import time
+from backend.text_compression import TextCodec, train_dictionary, zstandard
+
+RECIPES = ('양파 계란덮밥', '계란말이', '새우 두부 계란찜', '김치찌개', '된장찌개', '닭볶음탕', '불고기',
+           '잡채', '미역국', '감자조림', '애호박전', '두부조림', '참치김치볶음밥', '소고기무국', '어묵볶음')
+INGREDIENTS = ('계란', '양파', '대파', '김치', '두부', '새우', '감자', '애호박', '돼지고기', '소고기',
+               '당근', '버섯', '참치캔', '어묵', '고추장', '된장', '마늘', '시금치')
+USER_LINES = (
+    '{a}랑 {b} 있는데 저녁으로 뭐 만들 수 있을까요?',
+    '냉장고에 {a}, {b}, {c} 남았어요. 간단한 요리 추천해 주세요.',
+    '맵지 않은 걸로 아이도 같이 먹을 수 있는 메뉴면 좋겠어요.',
+    '{recipe} 만드는 법 알려주세요.',
+    '{a} 대신 넣을 수 있는 재료가 있을까요?',
+    '칼로리가 낮은 메뉴로 부탁해요.',
+    '20분 안에 만들 수 있는 걸로요.',
+)
+ASSISTANT_LINES = (
+    '{a}와 {b}로 간단하게 만들 수 있는 {recipe}를 추천드려요.',
+    '{recipe}는 어떠세요? {a}의 단맛과 {b}의 식감이 잘 어울려 부담 없이 즐기기 좋아요.',
+    '{recipe} 만드는 법: 1. {a}를 먹기 좋게 썰어 주세요. 2. 팬에 기름을 두르고 {b}를 볶아 주세요. '
+    '3. 간장 1큰술과 설탕 1작은술로 간을 맞춘 뒤 {c}를 넣고 한소끔 끓여 완성합니다.',
+    '{a} 대신 {b}나 {c}를 넣어도 비슷한 맛을 낼 수 있어요.',
+    '1인분 기준 약 {kcal}kcal 정도이고, 나트륨이 걱정되면 간장을 조금 줄여 주세요.',
+    '우리 서비스의 {recipe} 레시피를 참고하시면 단계별 사진과 함께 보실 수 있어요.',
+)
+
+
+def transcript(rng):
+    """사용자 / Clova 메시지를 줄바꿈으로 이은 대화 원문 (save-conversation 과 같은 형식)."""
+    lines = []
+    for _ in range(rng.randint(2, 12)):
+        for templates in (USER_LINES, ASSISTANT_LINES):
+            a, b, c = rng.sample(INGREDIENTS, 3)
+            lines.append(rng.choice(templates).format(a=a, b=b, c=c, recipe=rng.choice(RECIPES),
+                                                      kcal=rng.randint(150, 800)))
+    return '\n'.join(lines)
+
+
+def measure(name, codec, texts):
+    started = time.perf_counter()
+    stored = [codec.encode(t) for t in texts]
+    encode_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    for value in stored:
+        codec.decode(value)
+    decode_seconds = time.perf_counter() - started
+    raw_bytes = sum(len(t.encode('utf-8')) for t in texts)
+    stored_bytes = sum(len(v) for v in stored)
+    print(f'{name:<16} {stored_bytes:>10} {stored_bytes / raw_bytes:>7.3f} '
+          f'{encode_seconds / len(texts) * 1e6:>10.1f} {decode_seconds / len(texts) * 1e6:>10.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='conversation transcript compression benchmark')
+    parser.add_argument('--conversations', type=int, default=3000)
+    parser.add_argument('--train', type=float, default=0.5, help='fraction of conversations used to train the dictionary')
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    texts = [transcript(rng) for _ in range(args.conversations)]
+    split = int(len(texts) * args.train)
+    train, test = texts[:split], texts[split:]
+    raw_bytes = sum(len(t.encode('utf-8')) for t in test)
+    print(f'{len(test)} conversations, {raw_bytes} bytes, '
+          f'{raw_bytes / len(test):.0f} bytes per conversation on average')
+
+    print(f'{"codec":<16} {"bytes":>10} {"ratio":>7} {"encode us":>10} {"decode us":>10}')
+    measure('none', TextCodec('none'), test)
+    measure('zlib', TextCodec('zlib'), test)
+    if zstandard is None:
+        print('zstd             (zstandard not installed)')
+        return
+    with tempfile.TemporaryDirectory() as empty_dir:
+        measure('zstd', TextCodec('zstd', dict_dir=empty_dir), test)
+    with tempfile.TemporaryDirectory() as dict_dir:
+        started = time.perf_counter()
+        dict_id = train_dictionary(train, dict_dir=dict_dir)
+        print(f'  (trained dictionary {dict_id} from {len(train)} conversations in '
+              f'{time.perf_counter() - started:.2f}s)')
+        measure('zstd + dict', TextCodec('zstd', dict_dir=dict_dir), test)
+
+
+if __name__ == '__main__':
+    main()
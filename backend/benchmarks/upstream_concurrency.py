@@ -0,0 +1,195 @@
+"""업스트림 호출 엔드포인트 부하 테스트: 동기 워커(WSGI) vs ASGI(asyncio) 모드.
+
+로컬 스텁(backend/stubs/naver_stub.py)이 Clova / Naver 를 대신해 response_delay 만큼
+지연한 뒤 응답한다. 동기 모드는 요청마다 워커 스레드 하나를 점유하므로 동시 처리 수가
+워커 수로 제한되고, ASGI 모드는 이벤트 루프 하나가 업스트림 응답을 기다리는 요청을
+모두 들고 있는다. /api/chat, /api/search-trend, /api/play_voice 를 섞어 호출한다.
+스텁 / 동기 서버 / ASGI 서버는 각각 별도 프로세스로 실행한다.
+
+    python -m backend.benchmarks.upstream_concurrency --delay 0.2 --workers 8 --concurrency 10 50 200
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+import aiohttp
+
+WORKLOAD = (
+    ('/api/chat', lambda i: {'message': f'계란, 양파 있어요 {i}', 'username': 'bench'}),
+    ('/api/search-trend', lambda i: {'keywords': f'김치찌개, 된장찌개, 계란말이{i}'}),
+    ('/api/play_voice', lambda i: {'text': f'양파 계란덮밥 {i}'}),
+)
+
+
+def make_app(database_path):
+    from flask import Flask
+    from backend.extensions import db, bcrypt
+    from backend.json_provider import FastJSONProvider
+    from backend.compression import init_compression
+    from backend.resilience import init_resilience
+    from backend.routes import register_routes
+
+    app = Flask('benchmark')
+    app.json = FastJSONProvider(app)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{database_path}'
+    app.config['SECRET_KEY'] = 'benchmark'
+    db.init_app(app)
+    bcrypt.init_app(app)
+    init_compression(app)
+    init_resilience(app)
+    register_routes(app)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def serve(mode, port, workers, stub_url):
+    """벤치마크 대상 서버 실행 (부하 발생기와 GIL 을 나눠 쓰지 않도록 별도 프로세스)."""
+    # 스텁 주소와 캐시 설정은 backend.routes import 전에 지정해야 한다
+    os.environ['CLOVA_HOST'] = stub_url
+    os.environ['NAVER_API_HOST'] = stub_url
+    os.environ['CHAT_CACHE_PATH'] = ''   # 디스크 캐시 사용 안 함
+    os.environ.setdefault('CHAT_CACHE_SIZE', '1')  # 매 요청마다 메시지를 바꾸므로 캐시가 의미 없음
+
+    with tempfile.TemporaryDirectory() as workdir:
+        app = make_app(os.path.join(workdir, 'benchmark.db'))
+        if mode == 'asgi':
+            import uvicorn
+            from backend.async_routes import create_asgi_app
+            uvicorn.run(create_asgi_app(app), host='127.0.0.1', port=port,
+                        log_level='warning', lifespan='on', backlog=2048)
+            return
+
+        from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+        class QuietRequestHandler(WSGIRequestHandler):
+            def log_request(self, *args, **kwargs):
+                pass
+
+        class BoundedWSGIServer(BaseWSGIServer):
+            """요청을 최대 workers 개까지만 동시에 처리하는 WSGI 서버 (gunicorn sync 워커 수에 해당)."""
+
+            request_queue_size = 1024
+
+            def __init__(self):
+                super().__init__('127.0.0.1', port, app, handler=QuietRequestHandler)
+                self.pool = ThreadPoolExecutor(max_workers=workers)
+
+            def process_request(self, request, client_address):
+                self.pool.submit(self._handle, request, client_address)
+
+            def _handle(self, request, client_address):
+                try:
+                    self.finish_request(request, client_address)
+                except Exception:
+                    self.handle_error(request, client_address)
+                finally:
+                    self.shutdown_request(request)
+
+        BoundedWSGIServer().serve_forever()
+
+
+def spawn(args, port, env=None):
+    """하위 프로세스 실행 후 포트가 열릴 때까지 대기. env 는 추가할 환경 변수."""
+    process = subprocess.Popen([sys.executable, '-m', *args], stdout=subprocess.DEVNULL,
+                               env={**os.environ, **env} if env else None)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f'{args} did not start')
+
+
+async def run_load(base_url, concurrency, total):
+    latencies, errors = [], 0
+    counter = iter(range(total))
+    connector = aiohttp.TCPConnector(limit=concurrency)
+
+    async with aiohttp.ClientSession(base_url, connector=connector,
+                                     timeout=aiohttp.ClientTimeout(total=120)) as client:
+        async def user():
+            nonlocal errors
+            for i in counter:
+                path, body = WORKLOAD[i % len(WORKLOAD)]
+                started = time.perf_counter()
+                try:
+                    async with client.post(path, json=body(i)) as response:
+                        await response.read()
+                        if response.status != 200:
+                            errors += 1
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'rps': total / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p95_ms': latencies[int(len(latencies) * 0.95)] * 1000,
+        'errors': errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='sync WSGI vs ASGI upstream concurrency benchmark')
+    parser.add_argument('--delay', type=float, default=0.2, help='stub upstream latency (seconds)')
+    parser.add_argument('--workers', type=int, default=8, help='sync worker count')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[10, 50, 200])
+    parser.add_argument('--requests-per-client', type=int, default=5)
+    parser.add_argument('--serve', choices=['sync', 'asgi'], help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--stub-url', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port, args.workers, args.stub_url)
+        return
+
+    module = 'backend.benchmarks.upstream_concurrency'
+    stub_port = free_port()
+    stub_url = f'http://127.0.0.1:{stub_port}'
+    processes = [spawn(['backend.stubs.naver_stub', '--port', str(stub_port),
+                        '--response-delay', str(args.delay), '--token-delay', '0'], stub_port)]
+    try:
+        servers = {}
+        for mode, name in (('sync', f'sync ({args.workers} workers)'), ('asgi', 'asgi (1 event loop)')):
+            port = free_port()
+            processes.append(spawn([module, '--serve', mode, '--port', str(port), '--workers', str(args.workers),
+                                    '--stub-url', stub_url], port))
+            servers[name] = f'http://127.0.0.1:{port}'
+
+        print(f'upstream delay {args.delay * 1000:.0f} ms -> '
+              f'sync ceiling {args.workers / args.delay:.1f} req/s')
+        print(f'{"mode":<22} {"concurrency":>11} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} {"errors":>6}')
+        for concurrency in args.concurrency:
+            total = concurrency * args.requests_per_client
+            for name, base_url in servers.items():
+                result = asyncio.run(run_load(base_url, concurrency, total))
+                print(f'{name:<22} {concurrency:>11} {result["rps"]:>8.1f} {result["p50_ms"]:>8.1f} '
+                      f'{result["p95_ms"]:>8.1f} {result["errors"]:>6}')
+    finally:
+        for process in processes:
+            process.terminate()
+
+
+if __name__ == '__main__':
+    main()
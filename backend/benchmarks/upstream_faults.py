@@ -0,0 +1,155 @@
+"""업스트림 장애 시나리오: circuit breaker / bulkhead / 요청 기한 / 대체 응답 확인.
+
+스텁(backend/stubs/naver_stub.py)에 장애를 주입하고 동기 워커 서버 두 개에 같은 부하를 보낸다.
+- guarded: backend/resilience.py 설정을 시나리오에 맞게 줄인 서버
+- unguarded: 동시 호출 제한 / circuit breaker / 요청 기한을 사실상 끈 서버 (기존 동작)
+
+단계별로 /api/chat, /api/search-trend, /api/play_voice 의 지연시간과 상태 코드,
+대체 응답(fallback: 캐시 / 재료 색인, stale 트렌드) 수를 출력한다.
+
+    python -m backend.benchmarks.upstream_faults --workers 8 --concurrency 24 --slow-delay 5
+"""
+import argparse
+import asyncio
+import json
+import time
+import urllib.request
+import aiohttp
+from backend.benchmarks.upstream_concurrency import free_port, spawn
+
+WORKLOAD = (
+    ('/api/chat', {'message': '계란, 양파 있어요', 'username': 'bench'}),
+    ('/api/search-trend', {'keywords': '김치찌개, 된장찌개'}),
+    ('/api/play_voice', {'text': '양파 계란덮밥'}),
+    ('/api/chat', {'message': '두부랑 김치로 뭐 만들까요', 'username': 'bench'}),
+    ('/api/search-trend', {'keywords': '계란말이'}),
+    ('/api/play_voice', {'text': '계란말이'}),
+)
+
+SERVERS = {
+    'guarded': {
+        'UPSTREAM_BREAKER_FAILURES': '3',
+        'UPSTREAM_BREAKER_SLOW_CALL': '2',
+        'UPSTREAM_BREAKER_RESET': '60',
+        'UPSTREAM_MAX_CONCURRENCY': '2',
+        'UPSTREAM_BULKHEAD_WAIT': '0.2',
+        'REQUEST_DEADLINE': '3',
+    },
+    'unguarded': {
+        'UPSTREAM_BREAKER_FAILURES': '1000000',
+        'UPSTREAM_BREAKER_SLOW_CALL': '1000000',
+        'UPSTREAM_MAX_CONCURRENCY': '1000',
+        'UPSTREAM_BULKHEAD_WAIT': '60',
+        'REQUEST_DEADLINE': '0',
+    },
+}
+
+
+def phases(slow_delay):
+    return (
+        ('healthy', {}),
+        ('slow tts', {'slow_rate': 1, 'slow_delay': slow_delay, 'fault_paths': ['/tts-premium']}),
+        ('failing clova + datalab', {'failure_rate': 1, 'fault_paths': ['/testapp', '/datalab']}),
+    )
+
+
+def set_faults(stub_url, **faults):
+    faults = {'failure_rate': 0, 'drop_rate': 0, 'slow_rate': 0, 'slow_delay': 0, 'fault_paths': [], **faults}
+    request = urllib.request.Request(f'{stub_url}/__faults', data=json.dumps(faults).encode('utf-8'),
+                                     headers={'Content-Type': 'application/json'})
+    urllib.request.urlopen(request).close()
+
+
+async def run_phases(base_url, stub_url, concurrency, requests_per_user, slow_delay):
+    """단계별 부하. 사용자마다 세션(쿠키)을 단계가 바뀌어도 유지해 대화가 이어지게 한다."""
+    # 127.0.0.1 에서 받은 쿠키도 저장하도록 unsafe 쿠키 저장소 사용
+    clients = [aiohttp.ClientSession(base_url, timeout=aiohttp.ClientTimeout(total=120),
+                                     cookie_jar=aiohttp.CookieJar(unsafe=True))
+               for _ in range(concurrency)]
+    try:
+        for phase, faults in phases(slow_delay):
+            await asyncio.to_thread(set_faults, stub_url, **faults)
+            results = {}  # path -> {'latencies': [], 'statuses': {}, 'fallbacks': 0}
+
+            async def user(n, client):
+                for i in range(requests_per_user):
+                    path, body = WORKLOAD[(n + i) % len(WORKLOAD)]
+                    result = results.setdefault(path, {'latencies': [], 'statuses': {}, 'fallbacks': 0})
+                    started = time.perf_counter()
+                    try:
+                        async with client.post(path, json=body) as response:
+                            content = await response.read()
+                            status = response.status
+                    except (aiohttp.ClientError, asyncio.TimeoutError):
+                        content, status = b'', 'error'
+                    result['latencies'].append(time.perf_counter() - started)
+                    result['statuses'][status] = result['statuses'].get(status, 0) + 1
+                    if content.startswith(b'{'):
+                        payload = json.loads(content)
+                        if payload.get('fallback') or payload.get('stale'):
+                            result['fallbacks'] += 1
+
+            await asyncio.gather(*(user(n, client) for n, client in enumerate(clients)))
+            yield phase, results
+    finally:
+        for client in clients:
+            await client.close()
+
+
+async def report(server, base_url, stub_url, args):
+    async for phase, results in run_phases(base_url, stub_url, args.concurrency, args.requests_per_user,
+                                           args.slow_delay):
+        for path, result in sorted(results.items()):
+            latencies = sorted(result['latencies'])
+            p50 = latencies[len(latencies) // 2] * 1000
+            p95 = latencies[int(len(latencies) * 0.95)] * 1000
+            statuses = ', '.join(f'{k}: {v}' for k, v in sorted(result['statuses'].items(), key=str))
+            print(f'{server:<10} {phase:<24} {path:<18} {p50:>8.1f} {p95:>8.1f} '
+                  f'{result["fallbacks"]:>8}  {statuses}')
+
+
+# 벤치마크 서버에만 쓰는 지표 조회 토큰
+METRICS_TOKEN = 'upstream-faults-bench'
+
+
+def fetch_metrics(base_url):
+    request = urllib.request.Request(f'{base_url}/api/metrics',
+                                     headers={'Authorization': f'Bearer {METRICS_TOKEN}'})
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read()).get('resilience', {})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='upstream fault-injection scenario')
+    parser.add_argument('--workers', type=int, default=8, help='sync worker count')
+    parser.add_argument('--concurrency', type=int, default=24)
+    parser.add_argument('--requests-per-user', type=int, default=4)
+    parser.add_argument('--delay', type=float, default=0.05, help='stub upstream latency (seconds)')
+    parser.add_argument('--slow-delay', type=float, default=5.0, help='latency of the degraded upstream (seconds)')
+    args = parser.parse_args()
+
+    stub_port = free_port()
+    stub_url = f'http://127.0.0.1:{stub_port}'
+    processes = [spawn(['backend.stubs.naver_stub', '--port', str(stub_port),
+                        '--response-delay', str(args.delay), '--token-delay', '0'], stub_port)]
+    try:
+        print(f'{"server":<10} {"phase":<24} {"endpoint":<18} {"p50 ms":>8} {"p95 ms":>8} '
+              f'{"fallback":>8}  statuses')
+        for server, env in SERVERS.items():
+            port = free_port()
+            # 대체 응답에 쓰도록 채팅 응답 캐시를 켠다
+            processes.append(spawn(['backend.benchmarks.upstream_concurrency', '--serve', 'sync',
+                                    '--port', str(port), '--workers', str(args.workers), '--stub-url', stub_url],
+                                   port, env={**env, 'CHAT_CACHE_SIZE': '512', 'METRICS_TOKEN': METRICS_TOKEN}))
+            base_url = f'http://127.0.0.1:{port}'
+            asyncio.run(report(server, base_url, stub_url, args))
+            set_faults(stub_url)
+            for upstream, stats in sorted(fetch_metrics(base_url).items()):
+                print(f'  {server} {upstream}: {stats}')
+    finally:
+        for process in processes:
+            process.terminate()
+
+
+if __name__ == '__main__':
+    main()
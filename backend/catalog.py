@@ -0,0 +1,183 @@
+import os
+import threading
+import time
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+from .extensions import db
+from .cache import LRUTTLCache
+from .metrics import register_metrics
+from .models import Recipe, RecipeStep
+
+
+# rcp_set 변경 감지용 버전 파일
+# load_dataset 로더는 별도 프로세스라서 파일 하나로 모든 워커에 변경을 알림
+CATALOG_VERSION_FILE = os.getenv(
+    'CATALOG_VERSION_FILE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.catalog_version')
+)
+# 버전 파일 확인 주기 (초)
+CATALOG_VERSION_CHECK_INTERVAL = float(os.getenv('CATALOG_VERSION_CHECK_INTERVAL', 1.0))
+
+# 레시피 상세 캐시 설정
+RECIPE_CACHE_SIZE = int(os.getenv('RECIPE_CACHE_SIZE', 2048))
+RECIPE_CACHE_TTL = float(os.getenv('RECIPE_CACHE_TTL', 3600))
+FILTERED_COUNT_CACHE_SIZE = int(os.getenv('FILTERED_COUNT_CACHE_SIZE', 1024))
+
+# 변경 시 카탈로그 버전을 올려야 하는 모델
+CATALOG_MODELS = (Recipe, RecipeStep)
+
+_version_lock = threading.Lock()
+_version_state = {'value': None, 'checked_at': 0.0}
+
+
+def bump_catalog_version():
+    """rcp_set 이 바뀌었음을 모든 프로세스에 알린다 (로더 실행 후 호출)."""
+    version = str(time.time_ns())
+    tmp_path = f'{CATALOG_VERSION_FILE}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(version)
+    os.replace(tmp_path, CATALOG_VERSION_FILE)
+    with _version_lock:
+        _version_state['value'] = version
+        _version_state['checked_at'] = time.monotonic()
+    return version
+
+
+def current_catalog_version():
+    """현재 카탈로그 버전. 파일은 CATALOG_VERSION_CHECK_INTERVAL 마다 한 번만 읽는다."""
+    now = time.monotonic()
+    with _version_lock:
+        if now - _version_state['checked_at'] < CATALOG_VERSION_CHECK_INTERVAL:
+            return _version_state['value']
+        _version_state['checked_at'] = now
+        try:
+            with open(CATALOG_VERSION_FILE) as f:
+                _version_state['value'] = f.read().strip() or None
+        except FileNotFoundError:
+            pass
+        return _version_state['value']
+
+
+# 앱 안에서 ORM 으로 레시피를 수정한 경우에도 커밋 시점에 버전을 올림
+@event.listens_for(Session, 'before_flush')
+def _mark_catalog_dirty(session, flush_context, instances):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, CATALOG_MODELS):
+            session.info['catalog_dirty'] = True
+            return
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_on_commit(session):
+    if session.info.pop('catalog_dirty', False):
+        bump_catalog_version()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _clear_dirty_on_rollback(session):
+    session.info.pop('catalog_dirty', None)
+
+
+class RecipeCountCache:
+    """category × rcp_pat2 × rcp_way2 레시피 개수를 메모리에 보관하는 캐시.
+
+    GROUP BY 쿼리 한 번으로 모든 조합을 계산해 두고, 카탈로그 버전이
+    바뀔 때만 다시 계산한다. 목록 API 는 COUNT 쿼리 없이 개수를 조회한다.
+    """
+
+    FACET_FIELDS = ('category', 'rcp_pat2', 'rcp_way2')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._loaded = False
+        self._rows = []     # (category, rcp_pat2, rcp_way2, count)
+        self._counts = {}   # (category|None, rcp_pat2|None) -> count
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded = False
+
+    def refresh(self):
+        version = current_catalog_version()
+        rows = db.session.query(
+            Recipe.category, Recipe.rcp_pat2, Recipe.rcp_way2, func.count(Recipe.id)
+        ).group_by(Recipe.category, Recipe.rcp_pat2, Recipe.rcp_way2).all()
+
+        # 필터가 없는 경우(None)까지 포함해 모든 조합의 개수를 미리 합산
+        counts = {}
+        for category, rcp_pat2, _, count in rows:
+            # category / rcp_pat2 가 NULL 이면 키가 겹치므로 한 번만 더함
+            for key in {(None, None), (category, None), (None, rcp_pat2), (category, rcp_pat2)}:
+                counts[key] = counts.get(key, 0) + count
+
+        with self._lock:
+            self._rows = [tuple(r) for r in rows]
+            self._counts = counts
+            self._version = version
+            self._loaded = True
+
+    def _ensure_fresh(self):
+        if not self._loaded or self._version != current_catalog_version():
+            self.refresh()
+
+    def count(self, category=None, rcp_pat2=None):
+        self._ensure_fresh()
+        return self._counts.get((category or None, rcp_pat2 or None), 0)
+
+    def facets(self, category=None, rcp_pat2=None, rcp_way2=None):
+        """필터 조건에 맞는 레시피의 필드별 개수를 한 번에 반환."""
+        self._ensure_fresh()
+        filters = dict(zip(self.FACET_FIELDS, (category, rcp_pat2, rcp_way2)))
+        result = {field: {} for field in self.FACET_FIELDS}
+        total = 0
+        for row in self._rows:
+            values = dict(zip(self.FACET_FIELDS, row[:3]))
+            if any(want and values[field] != want for field, want in filters.items()):
+                continue
+            total += row[3]
+            for field in self.FACET_FIELDS:
+                if values[field]:
+                    bucket = result[field]
+                    bucket[values[field]] = bucket.get(values[field], 0) + row[3]
+        result['total'] = total
+        return result
+
+
+recipe_counts = RecipeCountCache()
+
+
+class CatalogCache(LRUTTLCache):
+    """카탈로그 버전이 바뀌면 전체를 비우는 LRU+TTL 캐시."""
+
+    def __init__(self, maxsize=1024, ttl=300):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self._catalog_version = current_catalog_version()
+
+    def get(self, key, default=None):
+        version = current_catalog_version()
+        if version != self._catalog_version:
+            self.clear()
+            self._catalog_version = version
+        return super().get(key, default)
+
+
+# 직렬화된 레시피 상세 응답 캐시: recipe_id -> (body, etag)
+recipe_detail_cache = CatalogCache(maxsize=RECIPE_CACHE_SIZE, ttl=RECIPE_CACHE_TTL)
+register_metrics('recipe_detail_cache', recipe_detail_cache.stats)
+
+# 영양 정보 필터 / 정렬이 있는 목록의 개수: (category, rcp_pat2, 영양 필터, 정렬) -> count
+filtered_recipe_counts = CatalogCache(maxsize=FILTERED_COUNT_CACHE_SIZE, ttl=RECIPE_CACHE_TTL)
+register_metrics('filtered_recipe_counts', filtered_recipe_counts.stats)
+
+
+def invalidate_recipe_cache(recipe_id=None):
+    """레시피 상세 캐시 무효화. recipe_id 가 없으면 전체를 비운다.
+
+    다른 프로세스(로더)에서는 bump_catalog_version() 을 호출하면
+    각 워커가 다음 조회 시 캐시를 비운다.
+    """
+    if recipe_id is None:
+        recipe_detail_cache.clear()
+    else:
+        recipe_detail_cache.pop(recipe_id)
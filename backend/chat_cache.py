@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from .cache import LRUTTLCache
+from .metrics import register_metrics
+
+
+# 채팅 응답 캐시 설정
+CHAT_CACHE_SIZE = int(os.getenv('CHAT_CACHE_SIZE', 512))
+CHAT_CACHE_TTL = float(os.getenv('CHAT_CACHE_TTL', 24 * 3600))
+CHAT_CACHE_DISK_MAX_ENTRIES = int(os.getenv('CHAT_CACHE_DISK_MAX_ENTRIES', 20000))
+# 비워 두면 디스크 캐시를 사용하지 않음
+CHAT_CACHE_PATH = os.getenv(
+    'CHAT_CACHE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.chat_cache.sqlite3')
+)
+
+_SPACE_RE = re.compile(r'\s+')
+_SEPARATOR_RE = re.compile(r'\s*([,，、/])\s*')
+_TRAILING_RE = re.compile(r'[\s.!?~…]+$')
+
+
+def normalize_message(text):
+    """공백 / 구분자 / 끝 문장부호 차이만 있는 메시지를 같은 문자열로 정규화.
+
+    '계란, 양파 있어요.' 와 '계란,양파  있어요' -> '계란,양파 있어요'
+    """
+    text = unicodedata.normalize('NFC', text or '').lower()
+    text = _SEPARATOR_RE.sub(r'\1', text)
+    text = _SPACE_RE.sub(' ', text).strip()
+    return _TRAILING_RE.sub('', text)
+
+
+def chat_cache_key(request_data):
+    """정규화된 대화 + 프로필(system 프롬프트) 지문 + 생성 파라미터로 만든 캐시 키."""
+    profile = []
+    messages = []
+    for message in request_data.get('messages', []):
+        if message.get('role') == 'system':
+            profile.append(message.get('content') or '')
+        else:
+            messages.append([message.get('role'), normalize_message(message.get('content'))])
+    profile_fingerprint = hashlib.sha1('\n'.join(profile).encode('utf-8')).hexdigest()
+    params = {k: v for k, v in request_data.items() if k != 'messages'}
+    raw = json.dumps([profile_fingerprint, messages, params], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def chat_fallback_key(request_data):
+    """생성 파라미터를 뺀 대화 키. Clova 장애 시 같은 프로필 / 대화에서 받은 답변을 찾는다.
+
+    system 프롬프트(사용자 프로필, 이전 대화 요약)와 대화 턴을 모두 포함하므로
+    다른 사용자에게 맞춰 생성된 답변은 찾지 않는다.
+    """
+    profile = []
+    messages = []
+    for message in request_data.get('messages', []):
+        if message.get('role') == 'system':
+            profile.append(message.get('content') or '')
+        else:
+            messages.append([message.get('role'), normalize_message(message.get('content'))])
+    profile_fingerprint = hashlib.sha1('\n'.join(profile).encode('utf-8')).hexdigest()
+    raw = json.dumps([profile_fingerprint, messages], ensure_ascii=False)
+    return 'fallback:' + hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class ChatResponseCache:
+    """메모리(LRU+TTL) -> 디스크(SQLite) 2단계 채팅 응답 캐시.
+
+    디스크 캐시는 재시작 후에도 유지되며 CHAT_CACHE_DISK_MAX_ENTRIES 를
+    넘으면 오래된 항목부터 지운다.
+    """
+
+    # 이 횟수만큼 저장할 때마다 디스크 캐시의 만료 / 초과 항목 정리
+    PRUNE_EVERY = 100
+
+    def __init__(self, path=CHAT_CACHE_PATH, maxsize=CHAT_CACHE_SIZE, ttl=CHAT_CACHE_TTL,
+                 disk_max_entries=CHAT_CACHE_DISK_MAX_ENTRIES):
+        self.memory = LRUTTLCache(maxsize=maxsize, ttl=ttl)
+        self.ttl = ttl
+        self.path = path
+        self.disk_max_entries = disk_max_entries
+        self._lock = threading.Lock()
+        self._conn = None
+        self._stores = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.fallback_hits = 0
+
+    def _disk(self):
+        if not self.path:
+            return None
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS chat_cache ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, expires_at REAL NOT NULL)'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS ix_chat_cache_created_at ON chat_cache (created_at)')
+        return self._conn
+
+    def get(self, key, count=True):
+        """캐시된 응답 (없으면 None). count=False 면 hit / miss 지표에 세지 않는다 (장애 시 대체 답변 조회)."""
+        value = self.memory.get(key) if count else self.memory.peek(key)
+        if value is not None:
+            return value
+        try:
+            with self._lock:
+                conn = self._disk()
+                row = conn.execute('SELECT value FROM chat_cache WHERE key = ? AND expires_at > ?',
+                                   (key, time.time())).fetchone() if conn else None
+        except sqlite3.Error as e:
+            print(f"Chat cache read failed: {e}")
+            row = None
+        if row is None:
+            if count:
+                self.misses += 1
+            return None
+        if count:
+            self.disk_hits += 1
+        value = json.loads(row[0])
+        self.memory.set(key, value)
+        return value
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._disk()
+                if conn is None:
+                    return
+                conn.execute('INSERT OR REPLACE INTO chat_cache (key, value, created_at, expires_at) VALUES (?, ?, ?, ?)',
+                             (key, json.dumps(value, ensure_ascii=False), now, now + self.ttl))
+                self._stores += 1
+                if self._stores % self.PRUNE_EVERY == 0:
+                    self._prune(conn, now)
+        except sqlite3.Error as e:
+            print(f"Chat cache write failed: {e}")
+
+    def _prune(self, conn, now):
+        conn.execute('DELETE FROM chat_cache WHERE expires_at <= ?', (now,))
+        conn.execute(
+            'DELETE FROM chat_cache WHERE key IN ('
+            'SELECT key FROM chat_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)',
+            (self.disk_max_entries,)
+        )
+
+    def stats(self):
+        memory = self.memory.stats()
+        hits = memory['hits'] + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            'memory': memory,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+            'fallback_hits': self.fallback_hits,
+        }
+
+
+class CachingCompletionExecutor:
+    """CompletionExecutor 앞단의 응답 캐시. 같은 요청이면 Clova 를 호출하지 않는다.
+
+    캐시에 없는 같은 요청이 동시에 들어오면 flight 로 업스트림 호출 한 번에 합친다.
+    """
+
+    def __init__(self, executor, cache, flight=None):
+        self._executor = executor
+        self._cache = cache
+        self._flight = flight
+
+    def _store(self, key, completion_request, response_data):
+        # 정상 응답만 저장 (장애 시 대체 답변용으로 메시지 키에도 저장)
+        if response_data.get('result', {}).get('message', {}).get('content'):
+            self._cache.set(key, response_data)
+            self._cache.set(chat_fallback_key(completion_request), response_data)
+        return response_data
+
+    def _fetch(self, key, completion_request):
+        return self._store(key, completion_request, self._executor.execute(completion_request))
+
+    async def _fetch_async(self, key, completion_request):
+        return self._store(key, completion_request, await self._executor.execute_async(completion_request))
+
+    def fallback(self, completion_request):
+        """Clova 를 쓸 수 없을 때 대신 쓸 수 있는, 같은 프로필 / 대화에 대해 캐시된 응답 (없으면 None)."""
+        cached = self._cache.get(chat_fallback_key(completion_request), count=False)
+        if cached is not None:
+            self._cache.fallback_hits += 1
+        return cached
+
+    def execute(self, completion_request):
+        key = chat_cache_key(completion_request)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        if self._flight is None:
+            return self._fetch(key, completion_request)
+        return self._flight.do(key, self._fetch, key, completion_request)
+
+    async def execute_async(self, completion_request):
+        key = chat_cache_key(completion_request)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        if self._flight is None:
+            return await self._fetch_async(key, completion_request)
+        return await self._flight.do_async(key, self._fetch_async, key, completion_request)
+
+    def execute_stream(self, completion_request):
+        key = chat_cache_key(completion_request)
+        cached = self._cache.get(key)
+        if cached is not None:
+            # 캐시된 답변은 result 이벤트 하나로 바로 반환
+            yield 'result', cached['result']
+            return
+        for event, data in self._executor.execute_stream(completion_request):
+            if event == 'result':
+                self._store(key, completion_request, {'result': data})
+            yield event, data
+
+
+chat_response_cache = ChatResponseCache()
+register_metrics('chat_cache', chat_response_cache.stats)
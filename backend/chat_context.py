@@ -0,0 +1,177 @@
+import os
+import re
+import secrets
+import threading
+from datetime import datetime, timedelta
+from flask import session
+from sqlalchemy.exc import SQLAlchemyError
+from .extensions import db
+from .models import ChatSession, ChatTurn
+
+
+# 프롬프트에 넣는 이전 대화(요약 + 최근 턴 + 새 메시지)의 토큰 예산
+CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv('CHAT_HISTORY_TOKEN_BUDGET', 1200))
+# 오래된 턴을 접어 둔 요약의 토큰 예산 (넘치면 가장 오래된 줄부터 버림)
+CHAT_SUMMARY_TOKEN_BUDGET = int(os.getenv('CHAT_SUMMARY_TOKEN_BUDGET', 300))
+# 요약에 남기는 사용자 메시지 최대 길이
+SUMMARY_MESSAGE_CHARS = 100
+# 마지막 대화 후 이 시간(초)이 지난 대화 상태는 이어 가지 않고 정리 대상이 됨
+CHAT_SESSION_TTL = float(os.getenv('CHAT_SESSION_TTL', 7 * 24 * 3600))
+# 새 대화를 이 횟수만큼 만들 때마다 만료된 대화 상태를 CHAT_SESSION_PURGE_BATCH 건씩 삭제
+CHAT_SESSION_PURGE_EVERY = int(os.getenv('CHAT_SESSION_PURGE_EVERY', 100))
+CHAT_SESSION_PURGE_BATCH = 500
+
+_HANGUL_RE = re.compile(r'[가-힣]')
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s+|\n+')
+# 답변의 "1. 양파 계란덮밥 2. 계란말이" 같은 번호 목록 항목
+_LIST_ITEM_RE = re.compile(r'(?:^|\s)\d+[.)]\s*([^\n]+?)(?=\s+\d+[.)]\s|\n|$)')
+
+
+def estimate_tokens(text):
+    """토큰 수 근사치. 한글 음절 1개 ≈ 1 토큰, 그 외 문자 4개 ≈ 1 토큰."""
+    if not text:
+        return 0
+    hangul = len(_HANGUL_RE.findall(text))
+    other = len(text) - hangul - text.count(' ')
+    return hangul + (other + 3) // 4
+
+
+def summarize_turn(role, content):
+    """턴 하나를 요약 한 줄로 추출 (업스트림 호출 없음).
+
+    사용자 메시지는 앞부분을 그대로, 답변은 첫 문장과 추천 목록 항목만 남긴다.
+    """
+    content = ' '.join(content.split())
+    if role == 'user':
+        return f"사용자: {content[:SUMMARY_MESSAGE_CHARS]}"
+    first_sentence = _SENTENCE_END_RE.split(content, 1)[0][:SUMMARY_MESSAGE_CHARS]
+    items = [item.strip()[:30] for item in _LIST_ITEM_RE.findall(content)]
+    if items:
+        return f"답변: {first_sentence} (추천: {', '.join(items[:6])})"
+    return f"답변: {first_sentence}"
+
+
+def roll_summary(summary, turns):
+    """기존 요약 뒤에 turns 의 요약 줄을 붙이고, 예산을 넘으면 오래된 줄부터 버린다."""
+    lines = summary.split('\n') if summary else []
+    lines.extend(summarize_turn(turn.role, turn.content) for turn in turns)
+    while len(lines) > 1 and estimate_tokens('\n'.join(lines)) > CHAT_SUMMARY_TOKEN_BUDGET:
+        lines.pop(0)
+    return '\n'.join(lines)
+
+
+def session_expired(chat_session):
+    last_active = chat_session.updated_at or chat_session.created_at
+    return last_active is not None and last_active < datetime.utcnow() - timedelta(seconds=CHAT_SESSION_TTL)
+
+
+def open_chat_session(session_id, user_id=None):
+    """session_id 의 대화 상태를 불러오고, 없거나 만료됐거나 다른 사용자의 것이면 새로 만든다."""
+    chat_session = db.session.get(ChatSession, session_id) if session_id else None
+    if (chat_session is None or session_expired(chat_session)
+            or (chat_session.user_id is not None and chat_session.user_id != user_id)):
+        chat_session = create_chat_session(user_id)
+    return chat_session
+
+
+_created_lock = threading.Lock()
+_created = {'count': 0}
+
+
+def create_chat_session(user_id=None):
+    """새 대화 상태를 바로 커밋해서 만든다.
+
+    답변을 저장하지 않는 폴백 / 오류 응답 뒤에도 클라이언트가 받은 session_id 가
+    다음 요청에서 그대로 이어지도록 record_exchange() 를 기다리지 않는다.
+    """
+    chat_session = ChatSession(id=secrets.token_hex(16), user_id=user_id, summarized_seq=0, last_seq=0)
+    db.session.add(chat_session)
+    db.session.commit()
+
+    # 쿠키 없는 요청마다 대화 상태가 생기므로 주기적으로 만료된 것을 정리
+    with _created_lock:
+        _created['count'] += 1
+        purge = _created['count'] % CHAT_SESSION_PURGE_EVERY == 0
+    if purge:
+        purge_chat_sessions()
+    return chat_session
+
+
+def purge_chat_sessions(batch_size=CHAT_SESSION_PURGE_BATCH):
+    """CHAT_SESSION_TTL 동안 대화가 없던 대화 상태와 턴을 batch_size 건 삭제. 삭제한 대화 수를 반환."""
+    cutoff = datetime.utcnow() - timedelta(seconds=CHAT_SESSION_TTL)
+    try:
+        expired = [row.id for row in db.session.query(ChatSession.id)
+                   .filter(ChatSession.updated_at < cutoff).limit(batch_size)]
+        if expired:
+            # sqlite 등 ON DELETE CASCADE 가 꺼진 DB 에서도 턴이 남지 않도록 직접 삭제
+            ChatTurn.query.filter(ChatTurn.session_id.in_(expired)).delete(synchronize_session=False)
+            ChatSession.query.filter(ChatSession.id.in_(expired)).delete(synchronize_session=False)
+        db.session.commit()
+        return len(expired)
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        print(f"Failed to purge chat sessions: {e}")
+        return 0
+
+
+def request_chat_session(data):
+    """채팅 요청의 대화 상태. session_id 가 없으면 Flask 세션에 저장된 대화를 이어 간다."""
+    session_id = None if data.get('new_session') else (data.get('session_id') or session.get('chat_session_id'))
+    chat_session = open_chat_session(session_id, session.get('user_id'))
+    session['chat_session_id'] = chat_session.id
+    return chat_session
+
+
+def context_messages(chat_session, user_message):
+    """토큰 예산 안에 들어가는 (요약, 최근 턴 메시지 목록).
+
+    예산을 넘는 오래된 턴은 user / assistant 한 쌍씩 요약으로 접고,
+    요약 상태는 다음 record_exchange() 커밋 때 함께 저장된다.
+    """
+    turns = []
+    if chat_session.last_seq > chat_session.summarized_seq:
+        turns = ChatTurn.query.filter(
+            ChatTurn.session_id == chat_session.id,
+            ChatTurn.seq > chat_session.summarized_seq
+        ).order_by(ChatTurn.seq).all()
+
+    budget = CHAT_HISTORY_TOKEN_BUDGET - estimate_tokens(user_message)
+    summary = chat_session.summary
+    while turns and estimate_tokens(summary) + sum(turn.tokens for turn in turns) > budget:
+        size = 2 if len(turns) > 1 and turns[1].role == 'assistant' else 1
+        folded, turns = turns[:size], turns[size:]
+        summary = roll_summary(summary, folded)
+        chat_session.summary = summary
+        chat_session.summarized_seq = folded[-1].seq
+
+    return summary, [{"role": turn.role, "content": turn.content} for turn in turns]
+
+
+def record_exchange(chat_session, user_message, answer):
+    """사용자 메시지와 답변을 턴으로 저장."""
+    if not user_message:
+        return
+    seq = chat_session.last_seq
+    db.session.add_all([
+        ChatTurn(session_id=chat_session.id, seq=seq + 1, role='user',
+                 content=user_message, tokens=estimate_tokens(user_message)),
+        ChatTurn(session_id=chat_session.id, seq=seq + 2, role='assistant',
+                 content=answer, tokens=estimate_tokens(answer)),
+    ])
+    chat_session.last_seq = seq + 2
+    try:
+        db.session.commit()
+    except SQLAlchemyError as e:
+        # 같은 대화에 동시에 들어온 요청 등으로 저장 실패 시 답변은 그대로 반환
+        db.session.rollback()
+        print(f"Failed to save chat turns: {e}")
+
+
+def session_transcript(session_id, user_id=None):
+    """저장된 전체 대화 (요약으로 접힌 턴 포함). 다른 사용자의 대화면 빈 문자열."""
+    chat_session = db.session.get(ChatSession, session_id) if session_id else None
+    if chat_session is None or (chat_session.user_id is not None and chat_session.user_id != user_id):
+        return ""
+    turns = ChatTurn.query.filter_by(session_id=session_id).order_by(ChatTurn.seq).all()
+    return "\n".join(turn.content for turn in turns)
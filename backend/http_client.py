@@ -0,0 +1,317 @@
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+import requests
+from requests.adapters import HTTPAdapter
+from .metrics import register_metrics
+from .resilience import remaining_time, upstream_guards, within_deadline
+
+try:
+    import aiohttp  # ASGI 모드(backend/asgi.py) 에서만 필요
+except ImportError:
+    aiohttp = None
+
+
+# 공용 HTTP 클라이언트 설정
+UPSTREAM_POOL_HOSTS = int(os.getenv('UPSTREAM_POOL_HOSTS', 10))   # 풀을 유지할 호스트 수
+UPSTREAM_POOL_SIZE = int(os.getenv('UPSTREAM_POOL_SIZE', 20))     # 호스트별 keep-alive 커넥션 수
+UPSTREAM_CONNECT_TIMEOUT = float(os.getenv('UPSTREAM_CONNECT_TIMEOUT', 3.05))
+UPSTREAM_READ_TIMEOUT = float(os.getenv('UPSTREAM_READ_TIMEOUT', 30))
+UPSTREAM_MAX_RETRIES = int(os.getenv('UPSTREAM_MAX_RETRIES', 2))
+UPSTREAM_BACKOFF_BASE = float(os.getenv('UPSTREAM_BACKOFF_BASE', 0.2))
+UPSTREAM_BACKOFF_MAX = float(os.getenv('UPSTREAM_BACKOFF_MAX', 2.0))
+
+# 재시도할 응답 코드
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+
+class UpstreamStats:
+    """업스트림 하나의 호출 수 / 오류 / 재시도 / 지연시간(최근 LATENCY_SAMPLES 건) 지표."""
+
+    LATENCY_SAMPLES = 1024
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.status_codes = {}
+        self._latencies = deque(maxlen=self.LATENCY_SAMPLES)
+
+    def record(self, latency, status_code=None, error=False):
+        with self._lock:
+            self.calls += 1
+            self._latencies.append(latency)
+            if error:
+                self.errors += 1
+            if status_code is not None:
+                self.status_codes[status_code] = self.status_codes.get(status_code, 0) + 1
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def snapshot(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            result = {
+                'calls': self.calls,
+                'errors': self.errors,
+                'retries': self.retries,
+                'status_codes': {str(k): v for k, v in self.status_codes.items()},
+            }
+        if latencies:
+            def percentile(p):
+                return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 1)
+            result.update(p50_ms=percentile(0.50), p95_ms=percentile(0.95), p99_ms=percentile(0.99),
+                          avg_ms=round(sum(latencies) / len(latencies) * 1000, 1))
+        return result
+
+
+class UpstreamClient:
+    """Clova / Naver API 호출에 쓰는 앱 공용 HTTP 클라이언트.
+
+    - 세션 하나를 공유해 호스트별 커넥션 풀(keep-alive)을 재사용 (TLS 핸드셰이크 절감)
+    - 업스트림별 connect / read 타임아웃 (<NAME>_READ_TIMEOUT 환경 변수로 변경)
+    - 멱등 호출은 연결 오류 / 429 / 5xx(500, 502, 503, 504) 에 대해 지터를 준 지수 백오프로 재시도
+    - 업스트림별 지연시간 지표
+    - 업스트림별 circuit breaker / 동시 호출 제한 / 요청 기한 (backend/resilience.py)
+      호출하지 않고 바로 실패하면 resilience.UpstreamUnavailable 을 올린다
+    - stream=True 호출은 GuardedStream 을 반환하고, 닫을 때까지 동시 호출 자리를 유지
+    """
+
+    def __init__(self, pool_hosts=UPSTREAM_POOL_HOSTS, pool_size=UPSTREAM_POOL_SIZE,
+                 max_retries=UPSTREAM_MAX_RETRIES):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.max_retries = max_retries
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    def stats_for(self, upstream):
+        with self._stats_lock:
+            if upstream not in self._stats:
+                self._stats[upstream] = UpstreamStats()
+            return self._stats[upstream]
+
+    def timeout_for(self, upstream):
+        read_timeout = float(os.getenv(f'{upstream.upper()}_READ_TIMEOUT', UPSTREAM_READ_TIMEOUT))
+        return (UPSTREAM_CONNECT_TIMEOUT, read_timeout)
+
+    @staticmethod
+    def backoff(attempt):
+        # full jitter: 0 ~ min(최대값, 기본값 * 2^attempt)
+        return random.uniform(0, min(UPSTREAM_BACKOFF_MAX, UPSTREAM_BACKOFF_BASE * (2 ** attempt)))
+
+    def request(self, upstream, method, url, idempotent=None, timeout=None, **kwargs):
+        """업스트림 호출. 재시도가 끝나도 실패하면 requests 예외를 그대로 올린다."""
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        attempts = 1 + (self.max_retries if idempotent else 0)
+        stats = self.stats_for(upstream)
+        guard = upstream_guards.get(upstream)
+        timeout = timeout or self.timeout_for(upstream)
+
+        # stream=True 응답은 본문을 다 읽고 닫을 때까지 bulkhead 자리를 GuardedStream 이 들고 있음
+        with ExitStack() as slot:
+            slot.enter_context(guard.bulkhead.acquire())
+            for attempt in range(attempts):
+                call_timeout = guard.before_call(timeout)
+                # 요청 기한 안에 재시도할 수 없으면 이번 시도가 마지막
+                delay = self.backoff(attempt)
+                started = time.perf_counter()
+                try:
+                    response = self.session.request(method, url, timeout=call_timeout, **kwargs)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                    latency = time.perf_counter() - started
+                    stats.record(latency, error=True)
+                    guard.record(latency, failed=True)
+                    if attempt == attempts - 1 or not within_deadline(delay):
+                        raise
+                else:
+                    latency = time.perf_counter() - started
+                    stats.record(latency, response.status_code, error=response.status_code >= 500)
+                    failed = response.status_code >= 500 or response.status_code == 429
+                    if (response.status_code not in RETRY_STATUS_CODES or attempt == attempts - 1
+                            or not within_deadline(delay)):
+                        if kwargs.get('stream'):
+                            return GuardedStream(response, guard, latency, failed, slot.pop_all())
+                        guard.record(latency, failed=failed)
+                        return response
+                    guard.record(latency, failed=failed)
+                    response.close()
+                stats.record_retry()
+                time.sleep(delay)
+
+    def post(self, upstream, url, **kwargs):
+        return self.request(upstream, 'POST', url, **kwargs)
+
+    def get(self, upstream, url, **kwargs):
+        return self.request(upstream, 'GET', url, **kwargs)
+
+    def stats(self):
+        with self._stats_lock:
+            upstreams = dict(self._stats)
+        return {name: stats.snapshot() for name, stats in upstreams.items()}
+
+
+class GuardedStream:
+    """stream=True 로 받은 응답. requests.Response 처럼 쓰고 with 문 / close() 로 닫는다.
+
+    헤더만 받은 시점에는 본문(SSE 등)을 아직 읽지 않았으므로, 닫을 때까지 bulkhead 자리를
+    유지하고 circuit breaker 에도 닫을 때 결과를 기록한다. 본문을 읽다가 연결 오류가 나면 실패로 센다.
+    느린 호출 판정에는 첫 응답까지의 시간을 쓴다 (긴 스트림 자체는 느린 호출이 아님).
+    """
+
+    def __init__(self, response, guard, latency, failed, slot):
+        self._response = response
+        self._guard = guard
+        self._latency = latency
+        self._failed = failed
+        self._slot = slot
+        self._closed = False
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+    def _guarded(self, chunks):
+        try:
+            yield from chunks
+        except requests.exceptions.RequestException:
+            self._failed = True
+            raise
+
+    def iter_lines(self, *args, **kwargs):
+        return self._guarded(self._response.iter_lines(*args, **kwargs))
+
+    def iter_content(self, *args, **kwargs):
+        return self._guarded(self._response.iter_content(*args, **kwargs))
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._response.close()
+        finally:
+            self._guard.record(self._latency, failed=self._failed)
+            self._slot.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class AsyncResponse:
+    """본문까지 읽은 aiohttp 응답. 핸들러에서 requests.Response 처럼 쓸 수 있다."""
+
+    def __init__(self, response, content):
+        self._response = response
+        self.status_code = response.status
+        self.headers = response.headers
+        self.content = content
+
+    @property
+    def text(self):
+        return self.content.decode(self._response.get_encoding(), errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        self._response.raise_for_status()
+
+
+class AsyncUpstreamClient:
+    """UpstreamClient 의 asyncio 버전 (aiohttp 기반).
+
+    타임아웃 / 재시도 / 백오프 정책과 지표는 동기 클라이언트와 공유한다.
+    aiohttp.ClientSession 은 이벤트 루프에 묶이므로 첫 요청 시 현재 루프에서 만든다.
+    실패하면 aiohttp.ClientError 를 올린다.
+    """
+
+    def __init__(self, sync_client, pool_size=None):
+        self._sync = sync_client
+        # 이벤트 루프 하나가 수백 개의 요청을 동시에 처리하므로 풀을 더 크게 둔다
+        self.pool_size = pool_size or int(os.getenv('ASYNC_UPSTREAM_POOL_SIZE', 200))
+        self._session = None
+        self._loop = None
+
+    @property
+    def session(self):
+        if aiohttp is None:
+            raise RuntimeError('aiohttp is required for the async upstream client')
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._loop is not loop:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, limit_per_host=self.pool_size)
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._loop = loop
+        return self._session
+
+    async def aclose(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def request(self, upstream, method, url, idempotent=None, timeout=None, **kwargs):
+        """업스트림 호출. 재시도가 끝나도 실패하면 aiohttp.ClientError 를 올린다."""
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        attempts = 1 + (self._sync.max_retries if idempotent else 0)
+        stats = self._sync.stats_for(upstream)
+        guard = upstream_guards.get(upstream)
+        timeout = timeout or self._sync.timeout_for(upstream)
+        # 값이 None 인 헤더(설정되지 않은 API 키)는 requests 처럼 빼고 보낸다
+        if kwargs.get('headers'):
+            kwargs['headers'] = {k: v for k, v in kwargs['headers'].items() if v is not None}
+        session = self.session
+
+        async with guard.bulkhead.acquire_async():
+            for attempt in range(attempts):
+                connect_timeout, read_timeout = guard.before_call(timeout)
+                # 요청 기한이 있으면 응답 전체를 남은 기한 안에 받아야 한다
+                call_timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout,
+                                                     total=remaining_time())
+                delay = self._sync.backoff(attempt)
+                started = time.perf_counter()
+                try:
+                    async with session.request(method, url, timeout=call_timeout, **kwargs) as response:
+                        content = await response.read()
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    latency = time.perf_counter() - started
+                    stats.record(latency, error=True)
+                    guard.record(latency, failed=True)
+                    if attempt == attempts - 1 or not within_deadline(delay):
+                        if isinstance(e, aiohttp.ClientError):
+                            raise
+                        raise aiohttp.ServerTimeoutError(f'{upstream} request timed out') from e
+                else:
+                    latency = time.perf_counter() - started
+                    stats.record(latency, response.status, error=response.status >= 500)
+                    guard.record(latency, failed=response.status >= 500 or response.status == 429)
+                    if (response.status not in RETRY_STATUS_CODES or attempt == attempts - 1
+                            or not within_deadline(delay)):
+                        return AsyncResponse(response, content)
+                stats.record_retry()
+                await asyncio.sleep(delay)
+
+    async def post(self, upstream, url, **kwargs):
+        return await self.request(upstream, 'POST', url, **kwargs)
+
+    async def get(self, upstream, url, **kwargs):
+        return await self.request(upstream, 'GET', url, **kwargs)
+
+
+http_client = UpstreamClient()
+async_http_client = AsyncUpstreamClient(http_client)
+register_metrics('upstreams', http_client.stats)
@@ -0,0 +1,181 @@
+import re
+import threading
+from array import array
+from .extensions import db
+from .models import Recipe
+from .catalog import current_catalog_version
+from .metrics import register_metrics
+
+
+# 같은 재료의 다른 표기 -> 대표 표기
+INGREDIENT_SYNONYMS = {
+    '달걀': '계란',
+    '계란노른자': '계란',
+    '달걀노른자': '계란',
+    '계란흰자': '계란',
+    '달걀흰자': '계란',
+    '대파': '파',
+    '쪽파': '파',
+    '실파': '파',
+    '다진마늘': '마늘',
+    '깐마늘': '마늘',
+    '다진생강': '생강',
+    '다진양파': '양파',
+    '돼지고기목살': '돼지고기',
+    '돼지목살': '돼지고기',
+    '소고기': '쇠고기',
+    '우유(저지방)': '우유',
+}
+
+# 재료 목록에 섞여 있는 소제목 / 구분 문구
+_SECTION_RE = re.compile(r'^(?:\[[^\]]*\]|[●•·\-]?\s*[^\s:]{0,10}\s*:)\s*')
+_PAREN_RE = re.compile(r'\([^)]*\)|\[[^\]]*\]')
+# 수량과 단위 (예: 75g, 1/2개, 1큰술, 약간)
+_QUANTITY_RE = re.compile(
+    r'\d[\d./~]*\s*(?:kg|g|mg|ml|l|cc|컵|큰술|작은술|스푼|개|모|줄기|장|쪽|대|알|마리|봉|팩|캔|통|톨|뿌리|포기|줌|꼬집|인분|cm)?'
+    r'|약간|적당량|조금|소량',
+    re.IGNORECASE
+)
+_SPLIT_RE = re.compile(r'[\n,，、]')
+# 채팅 메시지에서 재료 이름 뒤에 붙는 조사 ('계란이랑', '양파가')
+_PARTICLE_RE = re.compile(r'(?:이랑|랑|하고|이나|밖에|으로|로|과|와|을|를|이|가|은|는|도|만|나)$')
+_WORD_RE = re.compile(r'[가-힣A-Za-z]+')
+_SECTION_WORDS = {'재료', '주재료', '부재료', '양념', '양념장', '소스', '고명', '기타', '육수', '드레싱'}
+
+
+def normalize_ingredient(name):
+    """재료 이름 하나를 정규화 (공백 제거, 동의어 치환)."""
+    token = re.sub(r'\s+', '', name or '')
+    return INGREDIENT_SYNONYMS.get(token, token)
+
+
+def _clean_part(part):
+    """소제목, 괄호, 수량/단위를 제거한 재료 문구."""
+    part = _SECTION_RE.sub('', part.strip())
+    part = _PAREN_RE.sub(' ', part)
+    return _QUANTITY_RE.sub(' ', part).strip()
+
+
+def parse_ingredients(text, recipe_name=None):
+    """rcp_parts_dtls 자유 텍스트를 정규화된 재료 토큰 집합으로 변환.
+
+    '연두부 75g(3/4모), 칵테일새우 20g(5마리)\\n고명\\n시금치 10g(3줄기)'
+    -> {'연두부', '칵테일새우', '시금치'}
+    재료 목록 첫 줄에 들어 있는 레시피 이름(recipe_name)은 제외한다.
+    """
+    skip = {normalize_ingredient(_clean_part(recipe_name))} if recipe_name else set()
+    tokens = set()
+    for part in _SPLIT_RE.split(text or ''):
+        part = _clean_part(part)
+        if not part:
+            continue
+        # 첫 줄의 레시피 이름처럼 공백이 많은 문장은 재료로 보지 않음
+        if len(part.split()) > 3:
+            continue
+        token = normalize_ingredient(part)
+        if not token or token in _SECTION_WORDS or token in skip or token.isdigit():
+            continue
+        tokens.add(token)
+    return tokens
+
+
+class IngredientIndex:
+    """재료 -> 레시피 ID 정렬 배열(posting list) 역색인.
+
+    카탈로그 버전이 바뀌면 전체를 다시 만든다 (기존 레시피의 재료 / 이름 수정도 반영).
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()
+        self._postings = {}        # 재료 -> array('I') (정렬된 레시피 ID)
+        self._recipe_tokens = {}   # 레시피 ID -> frozenset(재료)
+        self._version = None
+        self._loaded = False
+
+    def refresh(self):
+        # 조회 도중 카탈로그가 바뀌면 다음 조회 때 다시 만들도록 조회 전에 버전을 읽어 둠
+        version = current_catalog_version()
+        rows = db.session.query(Recipe.id, Recipe.rcp_nm, Recipe.rcp_parts_dtls).order_by(Recipe.id).all()
+        postings = {}
+        recipe_tokens = {}
+        for recipe_id, name, parts in rows:
+            tokens = frozenset(parse_ingredients(parts, name))
+            recipe_tokens[recipe_id] = tokens
+            for token in tokens:
+                # ID 오름차순으로 읽으므로 append 만으로 정렬이 유지됨
+                postings.setdefault(token, array('I')).append(recipe_id)
+        with self._lock:
+            self._postings = postings
+            self._recipe_tokens = recipe_tokens
+            self._version = version
+            self._loaded = True
+
+    def _ensure_fresh(self):
+        if self._loaded and self._version == current_catalog_version():
+            return
+        # 여러 요청이 동시에 재구성하지 않도록 한 번만 수행
+        with self._build_lock:
+            if not self._loaded or self._version != current_catalog_version():
+                self.refresh()
+
+    def recipe_tokens(self, recipe_id):
+        self._ensure_fresh()
+        return self._recipe_tokens.get(recipe_id, frozenset())
+
+    def parse_message(self, text):
+        """자유 문장(채팅 메시지)을 (색인에 있는 재료 목록, 재료가 아닌 단어 목록)으로 나눈다.
+
+        '계란이랑 양파가 있어요' -> (['계란', '양파'], ['있어요'])
+        """
+        self._ensure_fresh()
+        found, other_words = [], []
+        with self._lock:
+            for word in _WORD_RE.findall(text or ''):
+                # 조사를 떼기 전 단어를 먼저 확인 ('오이' 가 '오' 로 바뀌지 않도록)
+                for candidate in (word, _PARTICLE_RE.sub('', word)):
+                    token = normalize_ingredient(candidate)
+                    if token in self._postings:
+                        if token not in found:
+                            found.append(token)
+                        break
+                else:
+                    other_words.append(word)
+        return found, other_words
+
+    def search(self, ingredients, limit=20, min_overlap=1):
+        """보유 재료와 겹치는 재료 수(overlap)와 레시피 재료 대비 비율(coverage)로 순위 결정.
+
+        반환: [(recipe_id, overlap, coverage, matched, missing), ...]
+        """
+        self._ensure_fresh()
+        query_tokens = {normalize_ingredient(i) for i in ingredients if i and i.strip()}
+        with self._lock:
+            overlap = {}
+            for token in query_tokens:
+                for recipe_id in self._postings.get(token, ()):
+                    overlap[recipe_id] = overlap.get(recipe_id, 0) + 1
+
+            results = []
+            for recipe_id, count in overlap.items():
+                if count < min_overlap:
+                    continue
+                tokens = self._recipe_tokens[recipe_id]
+                results.append((recipe_id, count, count / len(tokens), tokens))
+
+        results.sort(key=lambda r: (-r[1], -r[2], r[0]))
+        return [
+            (recipe_id, count, coverage, sorted(tokens & query_tokens), sorted(tokens - query_tokens))
+            for recipe_id, count, coverage, tokens in results[:limit]
+        ]
+
+    def stats(self):
+        return {
+            'recipes': len(self._recipe_tokens),
+            'ingredients': len(self._postings),
+            'postings': sum(len(p) for p in self._postings.values()),
+        }
+
+
+ingredient_index = IngredientIndex()
+register_metrics('ingredient_index', ingredient_index.stats)
@@ -0,0 +1,72 @@
+import dataclasses
+import json
+from datetime import date
+from flask.json.provider import DefaultJSONProvider
+
+# 설치되어 있으면 더 빠른 JSON 라이브러리 사용 (orjson > msgspec > 표준 json)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+def _dates_to_default(obj, default):
+    """msgspec 은 date / datetime 을 enc_hook 없이 ISO 8601 로 직렬화하므로 미리 default() 결과로 바꿔 둔다."""
+    if isinstance(obj, dict):
+        return {key: _dates_to_default(value, default) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_dates_to_default(value, default) for value in obj]
+    if isinstance(obj, date):
+        return default(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return _dates_to_default(dataclasses.asdict(obj), default)
+    return obj
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """orjson / msgspec 를 사용하는 Flask JSON provider.
+
+    둘 다 없으면 Flask 기본 provider(표준 json)와 동일하게 동작한다.
+    datetime 등은 기본 provider 의 default() 로 넘겨 기존과 같은 형식으로 직렬화한다.
+    """
+
+    if orjson is not None:
+        backend = 'orjson'
+    elif msgspec is not None:
+        backend = 'msgspec'
+    else:
+        backend = 'json'
+
+    def dumps_bytes(self, obj, **kwargs):
+        if self.backend == 'orjson' and not kwargs.get('cls'):
+            option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+            if kwargs.get('sort_keys', self.sort_keys):
+                option |= orjson.OPT_SORT_KEYS
+            if kwargs.get('indent'):
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=self.default, option=option)
+        if self.backend == 'msgspec' and not kwargs.get('indent') and not kwargs.get('cls'):
+            order = 'sorted' if kwargs.get('sort_keys', self.sort_keys) else None
+            return msgspec.json.encode(_dates_to_default(obj, self.default), enc_hook=self.default, order=order)
+        return super().dumps(obj, **kwargs).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        if self.backend == 'json':
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj, **kwargs).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs or self.backend == 'json':
+            return super().loads(s, **kwargs)
+        if self.backend == 'orjson':
+            return orjson.loads(s)  # orjson.JSONDecodeError 는 json.JSONDecodeError 의 하위 클래스
+        try:
+            return msgspec.json.decode(s)
+        except msgspec.DecodeError as e:
+            # request.get_json 이 400 으로 처리하도록 표준 json 예외로 변환
+            raise json.JSONDecodeError(str(e), s if isinstance(s, str) else '', 0) from e
@@ -0,0 +1,55 @@
+import mysql.connector
+import os
+import sys
+from dotenv import load_dotenv
+
+# backend 패키지를 import 할 수 있도록 저장소 루트를 경로에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from backend.snapshot import write_snapshot, RECIPE_SNAPSHOT_PATH
+from backend.catalog import current_catalog_version
+
+# 환경 변수 로드
+load_dotenv()
+
+# 저장 경로: 인자 > RECIPE_SNAPSHOT_PATH > recipe_snapshot.bin
+snapshot_path = sys.argv[1] if len(sys.argv) > 1 else (RECIPE_SNAPSHOT_PATH or "recipe_snapshot.bin")
+
+# MySQL 연결 설정
+db_connection = mysql.connector.connect(
+    user=os.getenv('DB_USERNAME'),
+    password=os.getenv('DB_PASSWORD'),
+    host=os.getenv('DB_HOST'),
+    port=os.getenv('DB_PORT'),
+    database=os.getenv('DB_NAME')
+)
+
+cursor = db_connection.cursor(dictionary=True)
+
+# 스냅샷에 필요한 컬럼만 조회
+def fetch_recipes():
+    cursor.execute("""
+        SELECT id, rcp_nm, att_file_no_main, rcp_parts_dtls, rcp_na_tip, category, rcp_pat2
+        FROM rcp_set ORDER BY id
+    """)
+    recipes = cursor.fetchall()
+
+    cursor.execute("SELECT recipe_id, step_no, description, image FROM recipe_step ORDER BY recipe_id, step_no")
+    steps = {}
+    for row in cursor.fetchall():
+        steps.setdefault(row['recipe_id'], []).append((row['step_no'], row['description'], row['image']))
+
+    for recipe in recipes:
+        recipe['steps'] = steps.get(recipe['id'], [])
+    return recipes
+
+
+try:
+    recipes = fetch_recipes()
+    write_snapshot(snapshot_path, recipes, version=current_catalog_version() or '')
+    print(f"스냅샷 저장 완료: {snapshot_path} ({len(recipes)}건)")
+except Exception as e:
+    print(f"스냅샷 저장 실패: {e}")
+
+# 커서 및 연결 종료
+cursor.close()
+db_connection.close()
@@ -1,8 +1,14 @@
 import mysql.connector
 import os
+import sys
 from dotenv import load_dotenv
 import requests
 
+# backend 패키지를 import 할 수 있도록 저장소 루트를 경로에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from backend.catalog import bump_catalog_version
+from backend.nutrition import parse_nutrition
+
 # 환경 변수 로드
 load_dotenv()
 
@@ -32,6 +38,14 @@ response = requests.get(api_url)
 # 데이터 삽입 함수 수정
 def insert_into_db(item):
     try:
+        # rcp_seq 는 유니크 인덱스라서 빈 값은 NULL 로 넣고, 이미 적재된 레시피는 건너뜀 (로더 재실행 대비)
+        rcp_seq = (item.get('RCP_SEQ') or '').strip() or None
+        if rcp_seq is not None:
+            cursor.execute("SELECT id FROM rcp_set WHERE rcp_seq = %s", (rcp_seq,))
+            if cursor.fetchone():
+                print(f"이미 있는 레시피: {item.get('RCP_NM', '')}")
+                return
+
         query = """
         INSERT INTO rcp_set (
             rcp_seq, rcp_nm, rcp_way2, rcp_pat2, info_wgt, info_eng, info_car, info_pro,
@@ -42,15 +56,17 @@ def insert_into_db(item):
             manual10, manual_img10, manual11, manual_img11, manual12, manual_img12,
             manual13, manual_img13, manual14, manual_img14, manual15, manual_img15,
             manual16, manual_img16, manual17, manual_img17, manual18, manual_img18,
-            manual19, manual_img19, manual20, manual_img20, rcp_na_tip
+            manual19, manual_img19, manual20, manual_img20, rcp_na_tip,
+            kcal, carbohydrate, protein, fat, sodium, weight
         ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
                   %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                  %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                  %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
+                  %s, %s, %s, %s, %s, %s)
         """
         
         # 각 필드를 가져올 때 기본값을 빈 문자열로 설정하고 모든 파라미터에 대해 빈 문자열로 대체
         values = (
-            item.get('RCP_SEQ', ''), item.get('RCP_NM', ''), item.get('RCP_WAY2', ''), item.get('RCP_PAT2', ''), item.get('INFO_WGT', ''),
+            rcp_seq, item.get('RCP_NM', ''), item.get('RCP_WAY2', ''), item.get('RCP_PAT2', ''), item.get('INFO_WGT', ''),
             item.get('INFO_ENG', ''), item.get('INFO_CAR', ''), item.get('INFO_PRO', ''),
             item.get('INFO_FAT', ''), item.get('INFO_NA', ''), item.get('HASH_TAG', ''),
             item.get('ATT_FILE_NO_MAIN', ''), item.get('ATT_FILE_NO_MK', ''), item.get('RCP_PARTS_DTLS', ''),
@@ -66,9 +82,33 @@ def insert_into_db(item):
             item.get('MANUAL19', ''), item.get('MANUAL_IMG19', ''), item.get('MANUAL20', ''), item.get('MANUAL_IMG20', ''),
             item.get('RCP_NA_TIP', '')
         )
+
+        # 영양 정보 숫자 컬럼 (범위 검색 / 정렬용)
+        nutrition = parse_nutrition({
+            'info_eng': item.get('INFO_ENG'), 'info_car': item.get('INFO_CAR'), 'info_pro': item.get('INFO_PRO'),
+            'info_fat': item.get('INFO_FAT'), 'info_na': item.get('INFO_NA'), 'info_wgt': item.get('INFO_WGT')
+        })
+        values += (
+            nutrition['kcal'], nutrition['carbohydrate'], nutrition['protein'],
+            nutrition['fat'], nutrition['sodium'], nutrition['weight']
+        )
         
         # 쿼리 실행
         cursor.execute(query, values)
+        recipe_id = cursor.lastrowid
+
+        # 비어 있지 않은 조리 단계를 recipe_step 테이블에도 저장
+        steps = []
+        for i in range(1, 21):
+            manual = (item.get(f'MANUAL{i:02}') or '').strip()
+            manual_img = (item.get(f'MANUAL_IMG{i:02}') or '').strip()
+            if manual:
+                steps.append((recipe_id, i, manual, manual_img or None))
+        if steps:
+            cursor.executemany(
+                "INSERT INTO recipe_step (recipe_id, step_no, description, image) VALUES (%s, %s, %s, %s)",
+                steps
+            )
         print(f"성공적으로 삽입됨: {item.get('RCP_NM', '')}")
     
     except Exception as e:
@@ -88,6 +128,9 @@ if response.status_code == 200:
         # DB에 반영
         db_connection.commit()
         print("DB에 모든 데이터 커밋 완료.")
+
+        # 실행 중인 서버의 카탈로그 캐시(개수, 레시피 상세 등) 무효화
+        bump_catalog_version()
     else:
         print("'row' 키가 응답에 존재하지 않거나 데이터가 없습니다.")
 else:
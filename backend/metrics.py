@@ -0,0 +1,30 @@
+# 모니터링용 지표 레지스트리
+# 각 모듈이 register_metrics 로 통계 함수를 등록하면 /api/metrics 에서 한 번에 조회
+import hmac
+import os
+
+# /api/metrics 는 Authorization: Bearer <METRICS_TOKEN> 으로만 조회 (설정하지 않으면 모두 거절)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+# 토큰 없이 허용할 클라이언트 IP (쉼표 구분, 기본은 없음)
+# 리버스 프록시 뒤에서는 모든 요청이 프록시 IP 로 보이므로 PROXY_FIX_X_FOR 를 함께 설정해야 한다
+METRICS_ALLOWED_IPS = {ip.strip() for ip in os.getenv('METRICS_ALLOWED_IPS', '').split(',') if ip.strip()}
+
+_providers = {}
+
+
+def register_metrics(name, provider):
+    _providers[name] = provider
+
+
+def metrics_snapshot():
+    return {name: provider() for name, provider in _providers.items()}
+
+
+def metrics_allowed(remote_addr, authorization=None):
+    """지표 조회 허용 여부: METRICS_TOKEN 이 일치하거나 명시적으로 허용된 IP 일 때만."""
+    if remote_addr in METRICS_ALLOWED_IPS:
+        return True
+    if METRICS_TOKEN and authorization:
+        scheme, _, token = authorization.partition(' ')
+        return scheme.lower() == 'bearer' and hmac.compare_digest(token.strip(), METRICS_TOKEN)
+    return False
@@ -0,0 +1,39 @@
+"""Add recipe_step table and backfill from manual columns
+
+Revision ID: 4b7d2e9c1a05
+Revises: e3a1a063524a
+Create Date: 2026-10-18 10:12:44.318207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b7d2e9c1a05'
+down_revision = 'e3a1a063524a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('recipe_step',
+    sa.Column('recipe_id', sa.Integer(), nullable=False),
+    sa.Column('step_no', sa.SmallInteger(), autoincrement=False, nullable=False),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('image', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['recipe_id'], ['rcp_set.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('recipe_id', 'step_no')
+    )
+
+    # manual01~20 컬럼에서 비어 있지 않은 단계만 옮김
+    for i in range(1, 21):
+        op.execute(sa.text(
+            f"INSERT INTO recipe_step (recipe_id, step_no, description, image) "
+            f"SELECT id, {i}, TRIM(manual{i:02}), NULLIF(TRIM(manual_img{i:02}), '') "
+            f"FROM rcp_set WHERE manual{i:02} IS NOT NULL AND TRIM(manual{i:02}) <> ''"
+        ))
+
+
+def downgrade():
+    op.drop_table('recipe_step')
@@ -0,0 +1,51 @@
+"""Add chat_session and chat_turn tables
+
+Revision ID: 5e81c7a2f9d3
+Revises: d2c84f1b7e36
+Create Date: 2026-10-18 20:05:12.581940
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e81c7a2f9d3'
+down_revision = 'd2c84f1b7e36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('chat_session',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('summary', sa.Text(), nullable=True),
+    sa.Column('summarized_seq', sa.Integer(), nullable=False),
+    sa.Column('last_seq', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('chat_session', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_chat_session_user_id'), ['user_id'], unique=False)
+
+    op.create_table('chat_turn',
+    sa.Column('session_id', sa.String(length=32), nullable=False),
+    sa.Column('seq', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('role', sa.String(length=16), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('tokens', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['session_id'], ['chat_session.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('session_id', 'seq')
+    )
+
+
+def downgrade():
+    op.drop_table('chat_turn')
+    with op.batch_alter_table('chat_session', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_chat_session_user_id'))
+
+    op.drop_table('chat_session')
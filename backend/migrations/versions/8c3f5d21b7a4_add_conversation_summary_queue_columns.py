@@ -0,0 +1,36 @@
+"""Add background summary queue columns to conversation
+
+Revision ID: 8c3f5d21b7a4
+Revises: 5e81c7a2f9d3
+Create Date: 2026-10-18 21:14:37.418265
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c3f5d21b7a4'
+down_revision = '5e81c7a2f9d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 기존 대화는 이미 요약이 끝난 상태(done)로 둔다
+    with op.batch_alter_table('conversation', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('summary_status', sa.String(length=16), server_default='done', nullable=False))
+        batch_op.add_column(sa.Column('summary_attempts', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('summary_next_attempt_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('summary_error', sa.String(length=255), nullable=True))
+        batch_op.create_index('ix_conversation_summary_status_next_attempt',
+                              ['summary_status', 'summary_next_attempt_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('conversation', schema=None) as batch_op:
+        batch_op.drop_index('ix_conversation_summary_status_next_attempt')
+        batch_op.drop_column('summary_error')
+        batch_op.drop_column('summary_next_attempt_at')
+        batch_op.drop_column('summary_attempts')
+        batch_op.drop_column('summary_status')
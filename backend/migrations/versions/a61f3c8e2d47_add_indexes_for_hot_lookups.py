@@ -0,0 +1,69 @@
+"""Add indexes for hot lookups
+
+Revision ID: a61f3c8e2d47
+Revises: 4b7d2e9c1a05
+Create Date: 2026-10-18 11:02:09.871530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a61f3c8e2d47'
+down_revision = '4b7d2e9c1a05'
+branch_labels = None
+depends_on = None
+
+
+def dedupe_rcp_seq(conn):
+    """유니크 인덱스를 만들기 전에 빈 값 / 중복된 rcp_seq 정리.
+
+    로더는 RCP_SEQ 가 없으면 빈 문자열을 넣었고 여러 번 실행될 수 있었으므로,
+    빈 값은 NULL 로 바꾸고 중복은 가장 먼저 적재된 행(id 최소)에만 남긴다.
+    """
+    conn.execute(sa.text("UPDATE rcp_set SET rcp_seq = NULL WHERE TRIM(rcp_seq) = ''"))
+    duplicates = conn.execute(sa.text(
+        "SELECT rcp_seq, MIN(id) AS keep_id FROM rcp_set "
+        "WHERE rcp_seq IS NOT NULL GROUP BY rcp_seq HAVING COUNT(*) > 1"
+    )).all()
+    for rcp_seq, keep_id in duplicates:
+        conn.execute(sa.text("UPDATE rcp_set SET rcp_seq = NULL WHERE rcp_seq = :rcp_seq AND id <> :keep_id"),
+                     {'rcp_seq': rcp_seq, 'keep_id': keep_id})
+    if duplicates:
+        print(f"rcp_seq 중복 {len(duplicates)}건 정리 (가장 먼저 적재된 레시피에만 남김)")
+
+
+def upgrade():
+    conn = op.get_bind()
+    # category 컬럼은 모델에만 있고 이전 마이그레이션에서 만들지 않았음 (직접 추가한 DB 는 그대로 둠)
+    columns = {column['name'] for column in sa.inspect(conn).get_columns('rcp_set')}
+    if 'category' not in columns:
+        with op.batch_alter_table('rcp_set', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('category', sa.String(length=50), nullable=True))
+
+    dedupe_rcp_seq(conn)
+
+    with op.batch_alter_table('rcp_set', schema=None) as batch_op:
+        # /api/recipes 의 category, rcp_pat2 필터 + id 정렬
+        batch_op.create_index('ix_rcp_set_category_rcp_pat2_id', ['category', 'rcp_pat2', 'id'],
+                              unique=False, mysql_length={'rcp_pat2': 50})
+        # 공공데이터 레시피 고유 ID 중복 방지
+        batch_op.create_index('ix_rcp_set_rcp_seq', ['rcp_seq'],
+                              unique=True, mysql_length={'rcp_seq': 20})
+
+    with op.batch_alter_table('conversation', schema=None) as batch_op:
+        # /api/conversations 의 user_id 필터 + created_at 정렬
+        batch_op.create_index('ix_conversation_user_id_created_at', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('conversation', schema=None) as batch_op:
+        # 외래키(user_id)에 필요한 인덱스를 먼저 만들어 두고 복합 인덱스 삭제
+        batch_op.create_index('ix_conversation_user_id', ['user_id'], unique=False)
+        batch_op.drop_index('ix_conversation_user_id_created_at')
+
+    with op.batch_alter_table('rcp_set', schema=None) as batch_op:
+        batch_op.drop_index('ix_rcp_set_rcp_seq')
+        batch_op.drop_index('ix_rcp_set_category_rcp_pat2_id')
+    # category 컬럼은 이 마이그레이션 이전부터 있던 DB 가 있으므로 되돌리지 않음
@@ -0,0 +1,89 @@
+"""Store conversation.original_text compressed
+
+Revision ID: b5e07a3d9c62
+Revises: 8c3f5d21b7a4
+Create Date: 2026-10-18 22:05:12.630417
+
+"""
+import zlib
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5e07a3d9c62'
+down_revision = '8c3f5d21b7a4'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+# backend/text_compression.py 저장 형식 (0x00 + 원문 / 0x01 + zlib)
+# 마이그레이션은 zlib 로 압축하고, zstd / 사전 압축은 python -m backend.text_compression recompress 로 적용
+RAW, ZLIB = b'\x00', b'\x01'
+MIN_SIZE = 64
+
+
+def blob_type():
+    return sa.LargeBinary().with_variant(mysql.MEDIUMBLOB(), 'mysql')
+
+
+def compress(value):
+    raw = value.encode('utf-8')
+    stored = RAW + raw
+    if len(raw) >= MIN_SIZE:
+        compressed = ZLIB + zlib.compress(raw, 6)
+        if len(compressed) < len(stored):
+            stored = compressed
+    return stored
+
+
+def decompress(stored):
+    stored = bytes(stored)
+    if stored[:1] == RAW:
+        return stored[1:].decode('utf-8')
+    if stored[:1] == ZLIB:
+        return zlib.decompress(stored[1:]).decode('utf-8')
+    # zstd 로 다시 압축된 값은 앱의 코덱(사전 포함)으로 풀어야 함
+    from backend.text_compression import text_codec
+    return text_codec.decode(stored)
+
+
+def copy_column(source, target, convert):
+    """conversation 의 source 컬럼을 convert 해서 target 컬럼에 BATCH_SIZE 행씩 복사."""
+    conn = op.get_bind()
+    select_sql = sa.text(
+        f"SELECT id, {source} FROM conversation WHERE id > :last_id ORDER BY id LIMIT {BATCH_SIZE}"
+    )
+    update_sql = sa.text(f"UPDATE conversation SET {target} = :value WHERE id = :id")
+    last_id = 0
+    while True:
+        rows = conn.execute(select_sql, {'last_id': last_id}).all()
+        if not rows:
+            break
+        conn.execute(update_sql, [{'id': row[0], 'value': convert(row[1])} for row in rows])
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    with op.batch_alter_table('conversation', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('original_text_compressed', blob_type(), nullable=True))
+
+    copy_column('original_text', 'original_text_compressed', compress)
+
+    with op.batch_alter_table('conversation', schema=None) as batch_op:
+        batch_op.drop_column('original_text')
+        batch_op.alter_column('original_text_compressed', new_column_name='original_text',
+                              existing_type=blob_type(), nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('conversation', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('original_text_plain', sa.Text(), nullable=True))
+
+    copy_column('original_text', 'original_text_plain', decompress)
+
+    with op.batch_alter_table('conversation', schema=None) as batch_op:
+        batch_op.drop_column('original_text')
+        batch_op.alter_column('original_text_plain', new_column_name='original_text',
+                              existing_type=sa.Text(), nullable=False)
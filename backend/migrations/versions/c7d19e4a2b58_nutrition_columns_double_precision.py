@@ -0,0 +1,71 @@
+"""Store numeric nutrition columns as double precision
+
+Revision ID: c7d19e4a2b58
+Revises: b5e07a3d9c62
+Create Date: 2026-10-19 10:12:44.918302
+
+"""
+import re
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7d19e4a2b58'
+down_revision = 'b5e07a3d9c62'
+branch_labels = None
+depends_on = None
+
+NUTRITION_COLUMNS = {
+    'info_eng': 'kcal',
+    'info_car': 'carbohydrate',
+    'info_pro': 'protein',
+    'info_fat': 'fat',
+    'info_na': 'sodium',
+    'info_wgt': 'weight',
+}
+BATCH_SIZE = 1000
+
+_NUMBER_RE = re.compile(r'\d+(?:\.\d+)?')
+
+
+def parse_nutrient(text):
+    if text is None:
+        return None
+    match = _NUMBER_RE.search(str(text).replace(',', ''))
+    return float(match.group()) if match else None
+
+
+def upgrade():
+    # MySQL FLOAT 는 단정밀도라 커서 값(Python float)과 비교하면 페이지 경계에서 행이 빠지거나 겹침
+    with op.batch_alter_table('rcp_set', schema=None) as batch_op:
+        for column in NUTRITION_COLUMNS.values():
+            batch_op.alter_column(column, existing_type=sa.Float(), type_=sa.Double(), existing_nullable=True)
+
+    # 이미 단정밀도로 반올림된 값은 텍스트 영양 정보에서 다시 파싱해 채움
+    conn = op.get_bind()
+    select_sql = sa.text(
+        f"SELECT id, {', '.join(NUTRITION_COLUMNS)} FROM rcp_set "
+        f"WHERE id > :last_id ORDER BY id LIMIT {BATCH_SIZE}"
+    )
+    update_sql = sa.text(
+        f"UPDATE rcp_set SET {', '.join(f'{c} = :{c}' for c in NUTRITION_COLUMNS.values())} "
+        f"WHERE id = :id"
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(select_sql, {'last_id': last_id}).mappings().all()
+        if not rows:
+            break
+        conn.execute(update_sql, [
+            {'id': row['id'], **{column: parse_nutrient(row[text_column])
+                                 for text_column, column in NUTRITION_COLUMNS.items()}}
+            for row in rows
+        ])
+        last_id = rows[-1]['id']
+
+
+def downgrade():
+    with op.batch_alter_table('rcp_set', schema=None) as batch_op:
+        for column in NUTRITION_COLUMNS.values():
+            batch_op.alter_column(column, existing_type=sa.Double(), type_=sa.Float(), existing_nullable=True)
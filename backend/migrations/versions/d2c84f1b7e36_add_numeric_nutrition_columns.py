@@ -0,0 +1,77 @@
+"""Add numeric nutrition columns to rcp_set
+
+Revision ID: d2c84f1b7e36
+Revises: a61f3c8e2d47
+Create Date: 2026-10-18 11:48:30.204115
+
+"""
+import re
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2c84f1b7e36'
+down_revision = 'a61f3c8e2d47'
+branch_labels = None
+depends_on = None
+
+NUTRITION_COLUMNS = {
+    'info_eng': 'kcal',
+    'info_car': 'carbohydrate',
+    'info_pro': 'protein',
+    'info_fat': 'fat',
+    'info_na': 'sodium',
+    'info_wgt': 'weight',
+}
+INDEXED_COLUMNS = ('kcal', 'carbohydrate', 'protein', 'fat', 'sodium')
+BATCH_SIZE = 1000
+
+_NUMBER_RE = re.compile(r'\d+(?:\.\d+)?')
+
+
+def parse_nutrient(text):
+    if text is None:
+        return None
+    match = _NUMBER_RE.search(str(text).replace(',', ''))
+    return float(match.group()) if match else None
+
+
+def upgrade():
+    with op.batch_alter_table('rcp_set', schema=None) as batch_op:
+        for column in NUTRITION_COLUMNS.values():
+            batch_op.add_column(sa.Column(column, sa.Float(), nullable=True))
+
+    # 텍스트 영양 정보를 BATCH_SIZE 건씩 파싱해서 채움
+    conn = op.get_bind()
+    select_sql = sa.text(
+        f"SELECT id, {', '.join(NUTRITION_COLUMNS)} FROM rcp_set "
+        f"WHERE id > :last_id ORDER BY id LIMIT {BATCH_SIZE}"
+    )
+    update_sql = sa.text(
+        f"UPDATE rcp_set SET {', '.join(f'{c} = :{c}' for c in NUTRITION_COLUMNS.values())} "
+        f"WHERE id = :id"
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(select_sql, {'last_id': last_id}).mappings().all()
+        if not rows:
+            break
+        conn.execute(update_sql, [
+            {'id': row['id'], **{column: parse_nutrient(row[text_column])
+                                 for text_column, column in NUTRITION_COLUMNS.items()}}
+            for row in rows
+        ])
+        last_id = rows[-1]['id']
+
+    with op.batch_alter_table('rcp_set', schema=None) as batch_op:
+        for column in INDEXED_COLUMNS:
+            batch_op.create_index(f'ix_rcp_set_{column}', [column], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('rcp_set', schema=None) as batch_op:
+        for column in INDEXED_COLUMNS:
+            batch_op.drop_index(f'ix_rcp_set_{column}')
+        for column in NUTRITION_COLUMNS.values():
+            batch_op.drop_column(column)
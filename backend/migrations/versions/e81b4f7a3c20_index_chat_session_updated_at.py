@@ -0,0 +1,27 @@
+"""Index chat_session.updated_at for expiry purge
+
+Revision ID: e81b4f7a3c20
+Revises: c7d19e4a2b58
+Create Date: 2026-10-19 14:31:07.552184
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e81b4f7a3c20'
+down_revision = 'c7d19e4a2b58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('chat_session', schema=None) as batch_op:
+        # 만료된 대화 상태 정리 (chat_context.purge_chat_sessions)
+        batch_op.create_index(batch_op.f('ix_chat_session_updated_at'), ['updated_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('chat_session', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_chat_session_updated_at'))
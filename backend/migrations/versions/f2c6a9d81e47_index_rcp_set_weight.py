@@ -0,0 +1,27 @@
+"""Index rcp_set.weight for nutrition filter and sort
+
+Revision ID: f2c6a9d81e47
+Revises: e81b4f7a3c20
+Create Date: 2026-10-19 15:02:41.206318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c6a9d81e47'
+down_revision = 'e81b4f7a3c20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('rcp_set', schema=None) as batch_op:
+        # /api/recipes 의 min_weight / max_weight 필터와 sort=weight 정렬
+        batch_op.create_index('ix_rcp_set_weight', ['weight'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('rcp_set', schema=None) as batch_op:
+        batch_op.drop_index('ix_rcp_set_weight')
@@ -1,4 +1,5 @@
 from .extensions import db, bcrypt
+from .text_compression import CompressedText
 from datetime import datetime
 
 class User(db.Model):
@@ -20,18 +21,63 @@ class User(db.Model):
 
 # Conversation 모델 정의
 class Conversation(db.Model):
+    # 마이페이지 대화 목록 조회용 (user_id, created_at) 인덱스
+    # 요약 작업 큐 조회용 (summary_status, summary_next_attempt_at) 인덱스
+    __table_args__ = (
+        db.Index('ix_conversation_user_id_created_at', 'user_id', 'created_at'),
+        db.Index('ix_conversation_summary_status_next_attempt', 'summary_status', 'summary_next_attempt_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    original_text = db.Column(db.Text, nullable=False)
+    original_text = db.Column(CompressedText, nullable=False)  # 압축 저장 (backend/text_compression.py)
     summary_text = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # 백그라운드 요약 상태 (backend/summary_queue.py): pending -> running -> done / failed
+    summary_status = db.Column(db.String(16), nullable=False, default='done', server_default='done')
+    summary_attempts = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    summary_next_attempt_at = db.Column(db.DateTime, nullable=True)  # 다음 시도 시각 (running 이면 작업 임대 만료 시각)
+    summary_error = db.Column(db.String(255), nullable=True)
 
     user = db.relationship('User', backref=db.backref('conversations', lazy=True))
 
 
+# 서버에 보관하는 채팅 대화 상태 (오래된 턴은 summary 로 접어 둔다)
+class ChatSession(db.Model):
+    __tablename__ = 'chat_session'
+
+    id = db.Column(db.String(32), primary_key=True)  # 클라이언트에 전달하는 임의 토큰
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=True, index=True)
+    summary = db.Column(db.Text, nullable=True)
+    summarized_seq = db.Column(db.Integer, nullable=False, default=0)  # summary 에 포함된 마지막 턴 번호
+    last_seq = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # 만료 정리용
+
+    turns = db.relationship('ChatTurn', order_by='ChatTurn.seq', cascade='all, delete-orphan',
+                            passive_deletes=True, lazy='noload')
+
+
+class ChatTurn(db.Model):
+    __tablename__ = 'chat_turn'
+
+    session_id = db.Column(db.String(32), db.ForeignKey('chat_session.id', ondelete='CASCADE'), primary_key=True)
+    seq = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    role = db.Column(db.String(16), nullable=False)  # user / assistant
+    content = db.Column(db.Text, nullable=False)
+    tokens = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
 
 class Recipe(db.Model):
     __tablename__ = 'rcp_set'
+    # TEXT 컬럼은 MySQL 에서 prefix 길이를 지정해야 인덱스를 만들 수 있음
+    __table_args__ = (
+        db.Index('ix_rcp_set_category_rcp_pat2_id', 'category', 'rcp_pat2', 'id',
+                 mysql_length={'rcp_pat2': 50}),
+        db.Index('ix_rcp_set_rcp_seq', 'rcp_seq', unique=True, mysql_length={'rcp_seq': 20}),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     rcp_seq = db.Column(db.Text, nullable=True)  # 레시피 고유 ID
@@ -44,6 +90,13 @@ class Recipe(db.Model):
     info_pro = db.Column(db.Text, nullable=True)  # 단백질
     info_fat = db.Column(db.Text, nullable=True)  # 지방
     info_na = db.Column(db.Text, nullable=True)  # 나트륨
+    # 영양 정보 숫자 컬럼 (info_* 텍스트에서 파싱, 범위 검색 / 정렬용)
+    kcal = db.Column(db.Double, nullable=True, index=True)  # 칼로리 (kcal)
+    carbohydrate = db.Column(db.Double, nullable=True, index=True)  # 탄수화물 (g)
+    protein = db.Column(db.Double, nullable=True, index=True)  # 단백질 (g)
+    fat = db.Column(db.Double, nullable=True, index=True)  # 지방 (g)
+    sodium = db.Column(db.Double, nullable=True, index=True)  # 나트륨 (mg)
+    weight = db.Column(db.Double, nullable=True, index=True)  # 중량 (g)
     hash_tag = db.Column(db.Text, nullable=True)  # 해시태그
     att_file_no_main = db.Column(db.Text, nullable=True)  # 메인 이미지 URL
     att_file_no_mk = db.Column(db.Text, nullable=True)  # 만드는 방법 이미지 URL
@@ -93,6 +146,10 @@ class Recipe(db.Model):
     manual20 = db.Column(db.Text, nullable=True)
     manual_img20 = db.Column(db.Text, nullable=True)
 
+    # 정규화된 조리 단계 (비어 있지 않은 단계만 저장)
+    steps = db.relationship('RecipeStep', backref='recipe', lazy=True,
+                            order_by='RecipeStep.step_no', cascade='all, delete-orphan')
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -152,3 +209,20 @@ class Recipe(db.Model):
             'manual20': self.manual20,
             'manual_img20': self.manual_img20
         }
+
+
+# 조리 단계 테이블 (manual01~20 / manual_img01~20 컬럼을 정규화)
+class RecipeStep(db.Model):
+    __tablename__ = 'recipe_step'
+
+    # (recipe_id, step_no) 기본키로 레시피별 단계를 한 번의 인덱스 범위 조회로 가져옴
+    recipe_id = db.Column(db.Integer, db.ForeignKey('rcp_set.id', ondelete='CASCADE'), primary_key=True)
+    step_no = db.Column(db.SmallInteger, primary_key=True, autoincrement=False)
+    description = db.Column(db.Text, nullable=False)  # 조리 과정
+    image = db.Column(db.Text, nullable=True)  # 조리 과정 이미지 URL
+
+    def to_dict(self):
+        step = {'step': self.step_no, 'description': self.description}
+        if self.image:
+            step['image'] = self.image
+        return step
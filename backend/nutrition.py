@@ -0,0 +1,38 @@
+import re
+
+
+# 영양 정보 TEXT 컬럼 -> 숫자 컬럼 매핑
+NUTRITION_COLUMNS = {
+    'info_eng': 'kcal',
+    'info_car': 'carbohydrate',
+    'info_pro': 'protein',
+    'info_fat': 'fat',
+    'info_na': 'sodium',
+    'info_wgt': 'weight',
+}
+
+# /api/recipes 의 min_<name> / max_<name> / sort=<name> 파라미터 -> 숫자 컬럼
+NUTRITION_PARAMS = {
+    'kcal': 'kcal',
+    'carb': 'carbohydrate',
+    'protein': 'protein',
+    'fat': 'fat',
+    'na': 'sodium',
+    'weight': 'weight',
+}
+
+_NUMBER_RE = re.compile(r'\d+(?:\.\d+)?')
+
+
+def parse_nutrient(text):
+    """'1,234.5 kcal' 같은 문자열에서 첫 번째 숫자를 float 로 추출 (없으면 None)."""
+    if text is None:
+        return None
+    match = _NUMBER_RE.search(str(text).replace(',', ''))
+    return float(match.group()) if match else None
+
+
+def parse_nutrition(values):
+    """{'info_eng': '...', ...} -> {'kcal': 123.0, ...}"""
+    return {column: parse_nutrient(values.get(text_column))
+            for text_column, column in NUTRITION_COLUMNS.items()}
@@ -0,0 +1,93 @@
+import os
+import threading
+from datetime import datetime
+from .cache import LRUTTLCache
+from .metrics import register_metrics
+from .models import User
+
+
+# 사용자별 채팅 프롬프트 캐시 설정
+USER_PROFILE_CACHE_SIZE = int(os.getenv('USER_PROFILE_CACHE_SIZE', 4096))
+# 다른 워커에서 수정된 프로필은 최대 이 시간(초) 뒤에 반영된다
+USER_PROFILE_CACHE_TTL = float(os.getenv('USER_PROFILE_CACHE_TTL', 300))
+# 가입되지 않은 username 조회 결과를 보관하는 시간 (초)
+UNKNOWN_USER_TTL = float(os.getenv('UNKNOWN_USER_TTL', 60))
+
+# 채팅 system 프롬프트 (사용자 정보 문장이 뒤에 붙는다)
+CHAT_SYSTEM_PROMPT = "- 사용자가 가지고 있는 재료를 입력 받는다.\n\
+                    - 선호하는 음식 장르, 맵기 정도 등을 고려하여 최소 4개이상의 메뉴를 추천해준다.\n\
+                    - 사용자가 메뉴를 선택하면 전체 조리과정과 소요시간을 알려준다.\n\
+                    - 과정마다 상세히 알려준다.\n"
+
+
+def build_user_info(user):
+    """사용자 정보 기반의 추가 메시지 설정"""
+    user_info = ""
+    if user:
+        if user.favorite_food:
+            user_info += f"사용자의 선호 음식은 {user.favorite_food}입니다. "
+        if user.spice_level:
+            user_info += f"사용자의 선호 매운맛 레벨은 {user.spice_level}입니다. "
+        if user.birthdate:
+            age = datetime.now().year - user.birthdate.year
+            user_info += f"사용자의 나이는 {age}세입니다. "
+    return user_info
+
+
+class UserProfileCache:
+    """user id 별로 완성된 채팅 system 프롬프트를 보관하는 캐시.
+
+    채팅 요청은 username 으로 들어오므로 username -> user id 별칭도 함께 보관한다.
+    재방문 사용자의 채팅은 DB 조회 없이 프롬프트를 얻고, 프로필이 바뀌면
+    invalidate() 로 해당 사용자의 프롬프트만 지운다.
+    """
+
+    # 별칭에 저장하는 '가입되지 않은 사용자' 표시
+    UNKNOWN = 0
+
+    def __init__(self, maxsize=USER_PROFILE_CACHE_SIZE, ttl=USER_PROFILE_CACHE_TTL):
+        self.prompts = LRUTTLCache(maxsize=maxsize, ttl=ttl)   # user id -> system 프롬프트
+        self.aliases = LRUTTLCache(maxsize=maxsize, ttl=ttl)   # username -> user id
+        self._lock = threading.Lock()
+        # 무효화 세대. DB 에서 읽는 도중 무효화되면 읽은 (이전) 값을 저장하지 않는다
+        self._generation = 0
+
+    def system_prompt(self, username):
+        if not username:
+            return CHAT_SYSTEM_PROMPT
+        user_id = self.aliases.get(username)
+        if user_id == self.UNKNOWN:
+            return CHAT_SYSTEM_PROMPT
+        if user_id is not None:
+            prompt = self.prompts.get(user_id)
+            if prompt is not None:
+                return prompt
+
+        generation = self._generation
+        user = User.query.filter_by(username=username).first()
+        if user is None:
+            self.aliases.set(username, self.UNKNOWN, ttl=UNKNOWN_USER_TTL)
+            return CHAT_SYSTEM_PROMPT
+
+        prompt = CHAT_SYSTEM_PROMPT + build_user_info(user)
+        with self._lock:
+            if generation == self._generation:
+                self.aliases.set(username, user.id)
+                self.prompts.set(user.id, prompt)
+        return prompt
+
+    def invalidate(self, user_id=None, username=None):
+        """프로필 변경 시 호출. user_id 의 프롬프트 / username 별칭을 지운다."""
+        with self._lock:
+            self._generation += 1
+            if user_id is not None:
+                self.prompts.pop(user_id)
+            if username is not None:
+                self.aliases.pop(username)
+
+    def stats(self):
+        return {'prompts': self.prompts.stats(), 'aliases': self.aliases.stats()}
+
+
+user_profiles = UserProfileCache()
+register_metrics('user_profiles', user_profiles.stats)
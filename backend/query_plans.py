@@ -0,0 +1,104 @@
+"""주요 조회 API 의 실행 계획(EXPLAIN) 회귀 검사.
+
+로컬 DB(.env 의 DB 설정)에 대해 각 라우트를 test client 로 호출하면서
+실제로 실행된 SELECT 문을 수집하고, EXPLAIN 결과에 full table scan
+(type = ALL)이 있으면 실패(exit code 1)한다.
+
+    python -m backend.query_plans
+"""
+import sys
+from datetime import datetime
+from urllib.parse import urlencode
+from sqlalchemy import event
+from .app import app
+from .extensions import db
+from .models import Recipe
+from .catalog import recipe_counts
+from .routes import encode_cursor
+
+
+# 전체 스캔이 의도된 쿼리 (캐시 재계산용 GROUP BY 등)는 검사에서 제외
+ALLOWED_FULL_SCAN = (
+    'GROUP BY rcp_set.category, rcp_set.rcp_pat2, rcp_set.rcp_way2',
+)
+
+
+def hot_requests():
+    """검사할 (이름, URL) 목록. 실제 데이터에서 카테고리 / 레시피 ID 를 고른다."""
+    sample = db.session.query(Recipe.id, Recipe.category, Recipe.rcp_pat2) \
+        .filter(Recipe.category.isnot(None), Recipe.rcp_pat2.isnot(None)).first()
+    if sample is None:
+        sample = db.session.query(Recipe.id, Recipe.category, Recipe.rcp_pat2).first()
+    if sample is None:
+        raise SystemExit('rcp_set 테이블이 비어 있습니다. 데이터를 먼저 적재하세요.')
+
+    conversation_cursor = encode_cursor({'created_at': datetime.utcnow().isoformat(), 'id': 2 ** 31 - 1})
+    # 카테고리 이름에 공백 / & 등이 들어 있을 수 있으므로 인코딩
+    filters = urlencode({'category': sample.category or '', 'subCategory': sample.rcp_pat2 or ''})
+    return [
+        ('recipes (page)', f'/api/recipes?page=2&limit=12&{filters}'),
+        ('recipes (cursor)', f'/api/recipes?after={sample.id}&limit=12&{filters}'),
+        ('recipes (nutrition)', '/api/recipes?mode=cursor&sort=kcal&max_kcal=500&limit=12'),
+        ('recipes (weight)', '/api/recipes?mode=cursor&sort=-weight&min_weight=100&limit=12'),
+        ('recipe details', f'/api/recipe/{sample.id}'),
+        ('conversations', '/api/conversations'),
+        ('conversations (cursor)', f'/api/conversations?{urlencode({"cursor": conversation_cursor})}'),
+        ('check username', '/api/check-username?username=query_plan_check'),
+    ]
+
+
+def explain(statement, parameters):
+    with db.engine.connect() as conn:
+        result = conn.exec_driver_sql('EXPLAIN ' + statement, parameters)
+        return [dict(row._mapping) for row in result]
+
+
+def check_route(client, url):
+    """라우트를 호출하고 실행된 SELECT 문 중 full scan 이 있는 것을 반환."""
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            captured.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+    failures = []
+    for statement, parameters in captured:
+        if any(allowed in statement for allowed in ALLOWED_FULL_SCAN):
+            continue
+        for row in explain(statement, parameters):
+            if row.get('type') == 'ALL':
+                failures.append((statement, row))
+    return response.status_code, len(captured), failures
+
+
+def main():
+    failed = False
+    with app.app_context():
+        # 개수 캐시를 미리 채워 두어 목록 API 에서 GROUP BY 가 실행되지 않게 함
+        recipe_counts.refresh()
+        requests_to_check = hot_requests()
+
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = 1
+
+    for name, url in requests_to_check:
+        with app.app_context():
+            status, executed, failures = check_route(client, url)
+        print(f'[{"FAIL" if failures else "OK"}] {name}: {url} (status {status}, {executed} queries)')
+        for statement, row in failures:
+            failed = True
+            print(f'    full scan on {row.get("table")}: {" ".join(statement.split())}')
+            print(f'    possible_keys={row.get("possible_keys")} rows={row.get("rows")}')
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,263 @@
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from .metrics import register_metrics
+
+
+# 업스트림별 보호 설정 (<NAME>_BREAKER_FAILURES 처럼 업스트림 이름을 앞에 붙이면 개별 설정)
+UPSTREAM_BREAKER_FAILURES = int(os.getenv('UPSTREAM_BREAKER_FAILURES', 5))         # 연속 실패 / 느린 호출 수
+UPSTREAM_BREAKER_SLOW_CALL = float(os.getenv('UPSTREAM_BREAKER_SLOW_CALL', 10.0))  # 이 시간(초) 이상이면 느린 호출
+UPSTREAM_BREAKER_RESET = float(os.getenv('UPSTREAM_BREAKER_RESET', 30.0))          # open -> half-open 대기 시간(초)
+UPSTREAM_MAX_CONCURRENCY = int(os.getenv('UPSTREAM_MAX_CONCURRENCY', 16))          # 프로세스당 동시 호출 수 (동기)
+ASYNC_UPSTREAM_MAX_CONCURRENCY = int(os.getenv('ASYNC_UPSTREAM_MAX_CONCURRENCY', 100))  # 이벤트 루프당 동시 호출 수
+UPSTREAM_BULKHEAD_WAIT = float(os.getenv('UPSTREAM_BULKHEAD_WAIT', 0.5))           # 자리가 날 때까지 기다리는 시간(초)
+# 요청 하나가 업스트림 호출(재시도 포함)에 쓸 수 있는 전체 시간(초), 0 이면 제한 없음
+REQUEST_DEADLINE = float(os.getenv('REQUEST_DEADLINE', 20.0))
+
+
+class UpstreamUnavailable(Exception):
+    """업스트림을 호출하지 않고 바로 실패한 경우 (circuit open / 동시 호출 초과 / 요청 기한 초과)."""
+
+    def __init__(self, upstream, reason):
+        super().__init__(f'{upstream} unavailable: {reason}')
+        self.upstream = upstream
+        self.reason = reason
+
+
+def upstream_setting(upstream, name, default):
+    value = os.getenv(f'{upstream.upper()}_{name}')
+    return type(default)(value) if value is not None else default
+
+
+# 요청별 기한 (Flask before_request 에서 설정, 스레드 / asyncio task 별로 분리됨)
+_deadline = contextvars.ContextVar('upstream_deadline', default=None)
+
+
+def set_deadline(seconds):
+    _deadline.set(time.monotonic() + seconds if seconds else None)
+
+
+@contextmanager
+def deadline(seconds):
+    """블록 안의 업스트림 호출 기한을 seconds 로 줄인다 (바깥 기한보다 늘어나지는 않음)."""
+    current = _deadline.get()
+    new = time.monotonic() + seconds
+    token = _deadline.set(new if current is None else min(current, new))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time():
+    """남은 기한(초). 기한이 없으면 None."""
+    current = _deadline.get()
+    return None if current is None else current - time.monotonic()
+
+
+def within_deadline(delay):
+    remaining = remaining_time()
+    return remaining is None or remaining > delay
+
+
+def init_resilience(app, seconds=REQUEST_DEADLINE):
+    @app.before_request
+    def start_upstream_deadline():
+        set_deadline(seconds)
+
+
+class CircuitBreaker:
+    """연속 실패(느린 호출 포함)가 failure_threshold 번 이어지면 open 되어 호출을 바로 거절한다.
+
+    reset_timeout 이 지나면 half-open 으로 바뀌어 probe 호출 하나만 통과시키고,
+    probe 가 성공하면 closed, 실패하면 다시 open 된다.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold=UPSTREAM_BREAKER_FAILURES, slow_call_threshold=UPSTREAM_BREAKER_SLOW_CALL,
+                 reset_timeout=UPSTREAM_BREAKER_RESET, half_open_calls=1):
+        self.failure_threshold = failure_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self.opened = 0           # open 된 횟수
+        self.short_circuited = 0  # open 상태라 거절한 호출 수
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    self.short_circuited += 1
+                    return False
+                self.state = self.HALF_OPEN
+                self._opened_at = time.monotonic()
+                self._probes = 0
+            if self.state == self.HALF_OPEN:
+                # probe 결과가 기록되지 않은 채 reset_timeout 이 지나면 다시 probe 허용
+                if self._probes >= self.half_open_calls and time.monotonic() - self._opened_at >= self.reset_timeout:
+                    self._opened_at = time.monotonic()
+                    self._probes = 0
+                if self._probes >= self.half_open_calls:
+                    self.short_circuited += 1
+                    return False
+                self._probes += 1
+            return True
+
+    def record(self, latency, failed):
+        failed = failed or latency >= self.slow_call_threshold
+        with self._lock:
+            if not failed:
+                self._failures = 0
+                self.state = self.CLOSED
+                return
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.opened += 1
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def stats(self):
+        with self._lock:
+            return {'state': self.state, 'failures': self._failures,
+                    'opened': self.opened, 'short_circuited': self.short_circuited}
+
+
+class Bulkhead:
+    """업스트림 하나의 동시 호출 수 제한. 느려진 업스트림이 워커를 모두 붙잡지 못하게 한다.
+
+    자리가 max_wait 안에 나지 않으면 기다리지 않고 UpstreamUnavailable 로 실패한다.
+    동기 호출(스레드)과 asyncio 호출(이벤트 루프)은 각각 따로 센다.
+    """
+
+    def __init__(self, name, max_concurrent=UPSTREAM_MAX_CONCURRENCY,
+                 max_concurrent_async=ASYNC_UPSTREAM_MAX_CONCURRENCY, max_wait=UPSTREAM_BULKHEAD_WAIT):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_concurrent_async = max_concurrent_async
+        self.max_wait = max_wait
+        self._semaphore = threading.BoundedSemaphore(max_concurrent)
+        self._async_semaphore = None
+        self._loop = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+
+    def _wait_time(self):
+        remaining = remaining_time()
+        return self.max_wait if remaining is None else max(0.0, min(self.max_wait, remaining))
+
+    def _enter(self, acquired):
+        with self._lock:
+            if not acquired:
+                self.rejected += 1
+            else:
+                self.in_flight += 1
+        if not acquired:
+            raise UpstreamUnavailable(self.name, 'bulkhead_full')
+
+    def _exit(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    @contextmanager
+    def acquire(self):
+        self._enter(self._semaphore.acquire(timeout=self._wait_time()))
+        try:
+            yield
+        finally:
+            self._exit()
+            self._semaphore.release()
+
+    @asynccontextmanager
+    async def acquire_async(self):
+        loop = asyncio.get_running_loop()
+        if self._async_semaphore is None or self._loop is not loop:
+            self._async_semaphore = asyncio.Semaphore(self.max_concurrent_async)
+            self._loop = loop
+        semaphore = self._async_semaphore
+        acquired = True
+        if semaphore.locked():
+            try:
+                await asyncio.wait_for(semaphore.acquire(), self._wait_time())
+            except asyncio.TimeoutError:
+                acquired = False
+        else:
+            await semaphore.acquire()  # 자리가 있으면 양보 없이 바로 획득
+        self._enter(acquired)
+        try:
+            yield
+        finally:
+            self._exit()
+            semaphore.release()
+
+    def stats(self):
+        with self._lock:
+            return {'in_flight': self.in_flight, 'rejected': self.rejected}
+
+
+class UpstreamGuard:
+    """업스트림 하나의 circuit breaker + bulkhead + 요청 기한 적용."""
+
+    def __init__(self, name):
+        self.name = name
+        self.breaker = CircuitBreaker(
+            failure_threshold=upstream_setting(name, 'BREAKER_FAILURES', UPSTREAM_BREAKER_FAILURES),
+            slow_call_threshold=upstream_setting(name, 'BREAKER_SLOW_CALL', UPSTREAM_BREAKER_SLOW_CALL),
+            reset_timeout=upstream_setting(name, 'BREAKER_RESET', UPSTREAM_BREAKER_RESET),
+        )
+        self.bulkhead = Bulkhead(
+            name,
+            max_concurrent=upstream_setting(name, 'MAX_CONCURRENCY', UPSTREAM_MAX_CONCURRENCY),
+            max_concurrent_async=upstream_setting(name, 'ASYNC_MAX_CONCURRENCY', ASYNC_UPSTREAM_MAX_CONCURRENCY),
+        )
+        self.deadline_exceeded = 0
+
+    def before_call(self, timeout):
+        """호출 직전 확인. 호출할 수 없으면 UpstreamUnavailable, 가능하면 기한에 맞춘 (connect, read) 타임아웃."""
+        connect_timeout, read_timeout = timeout
+        remaining = remaining_time()
+        if remaining is not None and remaining <= 0:
+            self.deadline_exceeded += 1
+            raise UpstreamUnavailable(self.name, 'deadline_exceeded')
+        if not self.breaker.allow():
+            raise UpstreamUnavailable(self.name, 'circuit_open')
+        if remaining is None:
+            return connect_timeout, read_timeout
+        return min(connect_timeout, remaining), min(read_timeout, remaining)
+
+    def record(self, latency, failed):
+        self.breaker.record(latency, failed)
+
+    def stats(self):
+        return {**self.breaker.stats(), **self.bulkhead.stats(), 'deadline_exceeded': self.deadline_exceeded}
+
+
+class UpstreamGuards:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._guards = {}
+
+    def get(self, upstream):
+        with self._lock:
+            if upstream not in self._guards:
+                self._guards[upstream] = UpstreamGuard(upstream)
+            return self._guards[upstream]
+
+    def stats(self):
+        with self._lock:
+            guards = dict(self._guards)
+        return {name: guard.stats() for name, guard in guards.items()}
+
+
+upstream_guards = UpstreamGuards()
+register_metrics('resilience', upstream_guards.stats)
@@ -0,0 +1,154 @@
+"""채팅 메시지에 맞는 카탈로그(rcp_set) 레시피 후보 검색.
+
+메시지에서 찾은 재료로 재료 색인을, 재료가 없으면 이름 검색 색인을 조회해 상위 후보를 고른다.
+후보는 Clova 프롬프트에 넣어 우리 서비스에서 보여 줄 수 있는 레시피 위주로 답하게 하고,
+재료 외에 다른 요청이 없는 단순한 메시지이고 후보가 충분히 잘 맞으면 Clova 없이 바로 답한다.
+"""
+import os
+import re
+from collections import namedtuple
+from .extensions import db
+from .models import Recipe
+from .ingredients import ingredient_index
+from .search import search_index
+
+
+RETRIEVAL_TOP_K = int(os.getenv('RETRIEVAL_TOP_K', 5))
+# 후보가 있을 때 Clova 생성 길이 (후보 없이 처음부터 메뉴를 만들 때는 400)
+RETRIEVAL_MAX_TOKENS = int(os.getenv('RETRIEVAL_MAX_TOKENS', 250))
+# 바로 답하는 조건: 가장 잘 맞는 후보의 재료 coverage 와 최소 후보 수
+RETRIEVAL_CONFIDENT_COVERAGE = float(os.getenv('RETRIEVAL_CONFIDENT_COVERAGE', 0.5))
+RETRIEVAL_MIN_CANDIDATES = int(os.getenv('RETRIEVAL_MIN_CANDIDATES', 3))
+# 프롬프트에 넣는 후보별 부족한 재료 수
+PROMPT_MISSING_ITEMS = 5
+
+# 재료를 말할 때 함께 쓰는 요청 표현 ('계란이랑 양파 있어요, 뭐 만들까요?')
+# 이 밖의 단어(선호 / 조건 / 질문)가 있으면 Clova 에 맡긴다
+_FILLER_RE = re.compile(
+    r'^(?:있|없|뭐|뭘|무엇|무슨|만들|만드|추천|알려|해줘|해주|할까|요리|음식|메뉴|레시피|냉장고|재료|가지고|어떤|먹|남은|남았)'
+)
+_FILLER_WORDS = {'좀', '수', '거', '것', '게', '법', '방법', '지금', '집에', '저', '제가', '나', '내가', '오늘', '하나', '그리고', '또'}
+# 답변에서 레시피 이름 뒤에 바로 붙을 수 있는 조사 ('김치찌개를', '계란말이와')
+_NAME_PARTICLES = ('으로', '이랑', '이나', '을', '를', '이', '가', '은', '는', '과', '와', '도', '로', '나', '랑', '의', '에', '만')
+_WORD_CHAR = r'[가-힣A-Za-z0-9]'
+# 프롬프트 / 답변에서 후보 레시피 이름 뒤에 붙는 ID 표시 ('김치찌개 [#12]')
+_ID_MARKER_RE = re.compile(r'[ \t]*\[#(\d+)\]')
+# 스트리밍 토큰 끝에서 아직 끝나지 않은 ID 표시 (다음 토큰과 합쳐서 판단)
+_PARTIAL_MARKER_RE = re.compile(r'[ \t]*(?:\[(?:#\d*)?)?$')
+
+Candidate = namedtuple('Candidate', 'id name matched missing coverage')
+
+
+def is_filler(word):
+    return word in _FILLER_WORDS or bool(_FILLER_RE.match(word))
+
+
+def retrieve_recipes(message, limit=RETRIEVAL_TOP_K):
+    """메시지에 맞는 레시피 후보와 Clova 없이 바로 답해도 되는지 여부. (candidates, items, confident)"""
+    items, other_words = ingredient_index.parse_message(message)
+    candidates = []
+    if items:
+        matches = ingredient_index.search(items, limit=limit)
+        ids = [m[0] for m in matches]
+        names = dict(db.session.query(Recipe.id, Recipe.rcp_nm).filter(Recipe.id.in_(ids))) if ids else {}
+        candidates = [Candidate(recipe_id, names[recipe_id], matched, missing, coverage)
+                      for recipe_id, overlap, coverage, matched, missing in matches if recipe_id in names]
+    elif message and message.strip():
+        # 재료가 없는 메시지('김치찌개 먹고 싶어')는 레시피 이름 / 해시태그 검색
+        candidates = [Candidate(recipe_id, name, [], [], 0.0)
+                      for recipe_id, name, image, score in search_index.search(message, limit=limit)]
+
+    confident = (
+        bool(items)
+        and not [word for word in other_words if not is_filler(word)]
+        and len(candidates) >= RETRIEVAL_MIN_CANDIDATES
+        and candidates[0].coverage >= RETRIEVAL_CONFIDENT_COVERAGE
+    )
+    return candidates, items, confident
+
+
+def candidates_prompt(candidates):
+    """system 프롬프트 뒤에 붙이는 레시피 후보 목록."""
+    lines = ["\n우리 서비스에서 바로 보여 줄 수 있는 레시피 후보입니다. "
+             "사용자 상황에 맞으면 이 후보 중에서 이름을 그대로 써서 추천하고, "
+             "추천한 레시피 이름 바로 뒤에 [#번호] 표시를 그대로 붙여 주세요. 짧게 답해 주세요."]
+    for candidate in candidates:
+        if candidate.matched:
+            missing = ', '.join(candidate.missing[:PROMPT_MISSING_ITEMS]) or '없음'
+            lines.append(f"- {candidate.name} [#{candidate.id}] "
+                         f"(있는 재료: {', '.join(candidate.matched)} / 더 필요한 재료: {missing})")
+        else:
+            lines.append(f"- {candidate.name} [#{candidate.id}]")
+    return '\n'.join(lines)
+
+
+def catalog_answer(candidates, items, unavailable=False):
+    """후보 레시피로 만든 답변 (Clova 호출 없음)."""
+    numbered = []
+    for i, candidate in enumerate(candidates, 1):
+        if candidate.missing:
+            numbered.append(f"{i}. {candidate.name} (더 필요한 재료: {', '.join(candidate.missing[:3])})")
+        else:
+            numbered.append(f"{i}. {candidate.name}")
+    prefix = "지금은 AI 추천을 사용할 수 없어 " if unavailable else ""
+    subject = f"{', '.join(items)}(으)로" if items else "말씀하신 메뉴와 비슷한"
+    return f"{prefix}{subject} 만들 수 있는 레시피를 찾아 드렸어요. {' '.join(numbered)}"
+
+
+def name_pattern(name):
+    """답변에서 레시피 이름 전체를 찾는 정규식 (이름 안의 공백 차이는 무시).
+
+    이름 앞뒤가 다른 글자로 이어지면 다른 메뉴의 일부로 본다. '김치' 는 '김치찌개' 안에서 찾지 않고
+    '김치를' 처럼 조사가 붙은 경우만 허용한다.
+    """
+    body = r'\s*'.join(re.escape(char) for char in name if not char.isspace())
+    particles = '|'.join(_NAME_PARTICLES)
+    return re.compile(rf'(?<!{_WORD_CHAR}){body}(?=(?:{particles})?(?!{_WORD_CHAR}))')
+
+
+def strip_recipe_ids(answer):
+    """사용자에게 보여 주기 전에 답변에서 [#ID] 표시를 지운다."""
+    return _ID_MARKER_RE.sub('', answer or '')
+
+
+class RecipeIdStripper:
+    """스트리밍 토큰에서 [#ID] 표시를 지운다. 토큰 경계에 걸친 표시는 다음 토큰까지 보류한다."""
+
+    def __init__(self):
+        self._pending = ''
+
+    def feed(self, text):
+        text = strip_recipe_ids(self._pending + text)
+        cut = _PARTIAL_MARKER_RE.search(text).start()
+        self._pending = text[cut:]
+        return text[:cut]
+
+    def flush(self):
+        text, self._pending = self._pending, ''
+        return text
+
+
+def linked_recipe_ids(answer, candidates):
+    """답변에 나온 후보 레시피 ID (답변에 나온 순서).
+
+    답변의 [#ID] 표시 중 후보에 있는 ID 를 쓰고, 표시가 없으면(표시를 빠뜨린 답변,
+    표시를 넣기 전에 캐시된 답변) 이름 전체가 일치하는 후보를 연결한다.
+    """
+    answer = answer or ''
+    candidate_ids = {candidate.id for candidate in candidates}
+    marked = []
+    for match in _ID_MARKER_RE.finditer(answer):
+        recipe_id = int(match.group(1))
+        if recipe_id in candidate_ids and recipe_id not in marked:
+            marked.append(recipe_id)
+    if marked:
+        return marked
+
+    positions = []
+    for candidate in candidates:
+        if not candidate.name or not candidate.name.strip():
+            continue
+        match = name_pattern(candidate.name).search(answer)
+        if match:
+            positions.append((match.start(), candidate.id))
+    return [recipe_id for position, recipe_id in sorted(positions)]
@@ -1,24 +1,53 @@
-from flask import request, jsonify, session, send_file
-from .models import User, Recipe, Conversation
+from flask import request, jsonify, session, send_file, stream_with_context
+from .models import User, Recipe, RecipeStep, Conversation
 from .extensions import db
+from .catalog import filtered_recipe_counts, recipe_counts, recipe_detail_cache
+from .metrics import metrics_allowed, metrics_snapshot
+from .nutrition import NUTRITION_PARAMS
+from .ingredients import ingredient_index
+from .search import search_index
+from .similar import similar_recipes
+from .snapshot import catalog_snapshot
+from .http_client import http_client, async_http_client
+from .chat_cache import CachingCompletionExecutor, chat_response_cache
+from .singleflight import SingleFlight, flight_key
+from .cache import LRUTTLCache
+from .resilience import UpstreamUnavailable
+from .profiles import user_profiles
+from .summary_queue import SummaryError, display_summary, new_conversation, summary_queue
+from .chat_context import context_messages, record_exchange, request_chat_session, session_transcript
+from .retrieval import (
+    RETRIEVAL_MAX_TOKENS, RecipeIdStripper, candidates_prompt, catalog_answer, linked_recipe_ids,
+    retrieve_recipes, strip_recipe_ids,
+)
+from sqlalchemy import tuple_
+from sqlalchemy.orm import load_only
 from sqlalchemy.exc import SQLAlchemyError
 from datetime import timedelta
 from dotenv import load_dotenv
 import requests
 import json
 import os
+import base64
+import binascii
+import hashlib
+import itertools
 import re
 from io import BytesIO
 from datetime import datetime
 import subprocess
 from werkzeug.utils import secure_filename
-import urllib.request
 
 
 
 # 환경 변수 로드
 load_dotenv()
 
+# Clova Studio 호스트 (테스트 시 backend/stubs/naver_stub.py 주소로 변경 가능)
+CLOVA_HOST = os.getenv('CLOVA_HOST', 'https://clovastudio.stream.ntruss.com')
+# Naver Cloud API 호스트 (요약 / 음성 인식 / 음성 합성 / 데이터랩)
+NAVER_API_HOST = os.getenv('NAVER_API_HOST', 'https://naveropenapi.apigw.ntruss.com')
+
 
 # Clova X API Executor class
 class CompletionExecutor:
@@ -28,17 +57,21 @@ class CompletionExecutor:
         self._api_key_primary_val = api_key_primary_val
         self._request_id = request_id
 
-    def execute(self, completion_request):
-        headers = {
+    @property
+    def url(self):
+        return self._host + '/testapp/v1/chat-completions/HCX-DASH-001'
+
+    def headers(self, accept='application/json'):
+        return {
             'X-NCP-CLOVASTUDIO-API-KEY': self._api_key,
             'X-NCP-APIGW-API-KEY': self._api_key_primary_val,
             'X-NCP-CLOVASTUDIO-REQUEST-ID': self._request_id,
             'Content-Type': 'application/json; charset=utf-8',
-            # 'Accept': 'text/event-stream'
-            'Accept': 'application/json'
+            'Accept': accept
         }
-    
-        response = requests.post(self._host + '/testapp/v1/chat-completions/HCX-DASH-001', headers=headers, json=completion_request)
+
+    def execute(self, completion_request):
+        response = http_client.post('clova', self.url, headers=self.headers(), json=completion_request)
          # Collect each line of the streamed response
         # 버퍼를 초기화하여 응답 데이터를 쌓기
         # 바로 JSON 파싱 시도
@@ -48,16 +81,76 @@ class CompletionExecutor:
         except json.JSONDecodeError:
             # JSON 파싱 실패 시 에러 메시지 반환
             return {"error": "Failed to parse JSON from response", "raw_data": response.text}
+
+    async def execute_async(self, completion_request):
+        """execute() 의 asyncio 버전 (ASGI 모드에서 사용)."""
+        response = await async_http_client.post('clova', self.url, headers=self.headers(), json=completion_request)
+        try:
+            return response.json()
+        except json.JSONDecodeError:
+            return {"error": "Failed to parse JSON from response", "raw_data": response.text}
+
+    def execute_stream(self, completion_request):
+        """스트리밍 응답을 (event, data) 로 하나씩 반환하는 generator.
+
+        Clova 는 event: token 으로 토큰을, event: result 로 전체 답변을 보낸다.
+        호출 측이 다음 이벤트를 요청할 때만 소켓에서 읽으므로 버퍼가 쌓이지 않는다.
+        """
+        with http_client.post('clova', self.url, headers=self.headers('text/event-stream'),
+                              json=completion_request, stream=True) as response:
+            if response.status_code != 200:
+                yield 'error', {"status_code": response.status_code, "raw_data": response.text}
+                return
+            yield from parse_sse(response.iter_lines())
         
         
+def make_completion_executor():
+    return CompletionExecutor(
+        host=CLOVA_HOST,
+        api_key=os.getenv('CLOVA_X_API_KEY'),
+        api_key_primary_val=os.getenv('CLOVA_X_API_KEY_PRIMARY_VAL'),
+        request_id='cf44e176ce2641a683767d7093e7476a'
+    )
+
+
+def parse_sse(lines):
+    """Server-Sent Events 줄 단위 입력을 (event, data) 로 파싱. data 는 JSON 이면 dict."""
+    event, data_lines = 'message', []
+    for line in itertools.chain(lines, ['']):  # 끝에 빈 줄을 붙여 마지막 이벤트도 처리
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if not line:
+            # 빈 줄에서 이벤트 하나가 끝남
+            if data_lines:
+                data = '\n'.join(data_lines)
+                try:
+                    yield event, json.loads(data)
+                except json.JSONDecodeError:
+                    yield event, {"raw_data": data}
+            event, data_lines = 'message', []
+        elif line.startswith(':'):
+            continue  # 주석 / keep-alive
+        else:
+            field, _, value = line.partition(':')
+            value = value[1:] if value.startswith(' ') else value
+            if field == 'event':
+                event = value
+            elif field == 'data':
+                data_lines.append(value)
+
+
+def format_sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
 class SummaryExecutor:
     def __init__(self):
-        self.host = "https://naveropenapi.apigw.ntruss.com"
+        self.host = NAVER_API_HOST
         self.api_url = "/text-summary/v1/summarize"
         self.client_id = os.getenv("NAVER_CLIENT_ID")
         self.client_secret = os.getenv("NAVER_CLIENT_SECRET")
 
-    def summarize_text(self, content):
+    def request_args(self, content):
         headers = {
             "X-NCP-APIGW-API-KEY-ID": self.client_id,
             "X-NCP-APIGW-API-KEY": self.client_secret,
@@ -76,25 +169,265 @@ class SummaryExecutor:
             }
         }
 
-        response = requests.post(
-            self.host + self.api_url,
-            headers=headers,
-            json=payload
-        )
+        return {'url': self.host + self.api_url, 'headers': headers, 'json': payload}
+
+    def summarize(self, content):
+        """요약 텍스트 반환. 실패하면 SummaryError (일시적인 오류면 retryable)."""
+        try:
+            response = http_client.post('summary', idempotent=True, **self.request_args(content))
+        except UpstreamUnavailable as e:
+            raise SummaryError(str(e)) from e
+        except requests.exceptions.RequestException as e:
+            raise SummaryError(f"request failed: {e}") from e
 
         # 응답 코드 확인 및 요약 텍스트 반환
         if response.status_code == 200:
             return response.json().get("summary", "요약 실패")
-        else:
-            # 에러 코드와 에러 메시지 출력
-            print(f"Error: {response.status_code}, Response: {response.text}")
-            return f"Error: {response.status_code}"
-        
+        # 에러 코드와 에러 메시지 출력
+        print(f"Error: {response.status_code}, Response: {response.text}")
+        raise SummaryError(f"status {response.status_code}",
+                           retryable=response.status_code >= 500 or response.status_code == 429)
+
+
+def naver_headers(content_type, client_id=None, client_secret=None):
+    return {
+        "X-NCP-APIGW-API-KEY-ID": client_id or os.getenv("NAVER_CLIENT_ID"),
+        "X-NCP-APIGW-API-KEY": client_secret or os.getenv("NAVER_CLIENT_SECRET"),
+        "Content-Type": content_type,
+    }
+
+
+# 네이버 음성 인식(STT) 요청 인자
+def stt_request_args(audio_data):
+    return {
+        'url': NAVER_API_HOST + "/recog/v1/stt?lang=Kor",  # 언어 코드 추가
+        'headers': naver_headers("application/octet-stream"),
+        'data': audio_data,
+    }
+
+
+# 네이버 음성 합성(TTS) 요청 인자
+def tts_request_args(text):
+    payload = {
+        "speaker": "jinho",  # TTS 목소리 설정 (mijin: 여성, jinho: 남성 등)
+        "speed": "2",        # 말하기 속도 조절 (-5 ~ 5)
+        "text": text,
+    }
+    return {
+        'url': NAVER_API_HOST + "/tts-premium/v1/tts",
+        'headers': naver_headers("application/x-www-form-urlencoded"),
+        'data': payload,
+    }
+
+
+# 네이버 데이터랩 검색어 트렌드 요청 인자
+def search_trend_request_args(keyword_groups, start_date="2024-10-01", end_date="2024-11-01", time_unit="month", ages=None, gender=None):
+    headers = naver_headers("application/json", os.getenv("NAVER_TREND_CLIENT_ID"), os.getenv("NAVER_TREND_CLIENT_SECRET"))
+    headers["Cache-Control"] = "no-cache"   # 캐시 비활성화
+    headers["Pragma"] = "no-cache"          # 추가적인 캐시 비활성화
+    body = json.dumps({
+        "startDate": start_date,
+        "endDate": end_date,
+        "timeUnit": time_unit,
+        "keywordGroups": keyword_groups,
+        "gender": gender or "",
+        "ages": ages or []
+    })
+    return {'url': NAVER_API_HOST + "/datalab/v1/search", 'headers': headers, 'data': body.encode("utf-8")}
+
+
+def parse_keywords(input_text):
+    keywords = [kw.strip() for kw in input_text.split(',')]
+    keyword_groups = [{"groupName": kw, "keywords": [kw]} for kw in keywords]
+    return keyword_groups
+
+
+def search_trend_params(data):
+    """/api/search-trend 요청 본문 -> search_trend_request_args 인자."""
+    return {
+        'keyword_groups': parse_keywords(data.get("keywords", "")),
+        'start_date': data.get("start_date", (datetime.today() - timedelta(days=30)).strftime("%Y-%m-%d")),
+        'end_date': data.get("end_date", datetime.today().strftime("%Y-%m-%d")),
+        'time_unit': data.get("time_unit", "month"),
+        'ages': data.get("ages", []),
+        'gender': data.get("gender", ""),
+    }
+
+
+def chat_content(response_data):
+    return response_data.get("result", {}).get("message", {}).get("content", "")
+
+
+def build_chat_request(data, chat_session=None, candidates=None):
+    """채팅 요청 본문과 사용자 정보로 Clova X completion 요청 데이터를 생성.
+
+    chat_session 이 있으면 서버에 저장된 이전 대화(요약 + 최근 턴)를 토큰 예산 안에서 함께 보낸다.
+    candidates(카탈로그 레시피 후보)가 있으면 프롬프트에 넣고 생성 길이를 줄인다.
+    """
+    user_message = data.get('message')
+    username = data.get('username')  # Get the username from the request
+
+    # 사용자 정보가 반영된 system 프롬프트 (user id 별 캐시, 재방문 사용자는 DB 조회 없음)
+    system_prompt = user_profiles.system_prompt(username)
+
+    history = []
+    if chat_session is not None:
+        summary, history = context_messages(chat_session, user_message)
+        if summary:
+            system_prompt += f"\n이전 대화 요약:\n{summary}"
+    if candidates:
+        system_prompt += candidates_prompt(candidates)
+
+    preset_text = [
+        {
+            "role": "system",
+            "content": system_prompt
+        },
+        *history,
+        {
+            "role": "user",
+            "content": user_message
+        }
+    ]
+
+    return {
+        'messages': preset_text,
+        'topP': 0.8,
+        'topK': 0,
+        'maxTokens': RETRIEVAL_MAX_TOKENS if candidates else 400,
+        'temperature': 0.5,
+        'repeatPenalty': 6.5,
+        'stopBefore': [],
+        'includeAiFilters': True,
+        'seed': 0
+    }
+
+
+# 데이터랩 장애 시 대신 반환하는 마지막 정상 트렌드 결과의 보관 시간(초)
+TREND_FALLBACK_TTL = float(os.getenv('TREND_FALLBACK_TTL', 6 * 3600))
+
+
+# 같은 요청이 동시에 들어오면 업스트림(Clova / Naver) 호출 한 번으로 합침
+chat_flight = SingleFlight('chat')
+tts_flight = SingleFlight('tts')
+search_trend_flight = SingleFlight('search_trend')
+
+# Clova X Executor 는 한 번만 생성 (커넥션은 http_client 풀에서 재사용)
+# 같은 메시지 + 프로필 + 파라미터 요청은 응답 캐시에서 반환
+completion_executor = CachingCompletionExecutor(make_completion_executor(), chat_response_cache, chat_flight)
+
+
+def fallback_chat_answer(request_data, candidates, items):
+    """Clova 를 쓸 수 없을 때(circuit open, 타임아웃, 오류 응답)의 (답변, 출처, 레시피 ID).
+
+    같은 프로필 / 대화에 대해 캐시된 답변 -> 카탈로그 후보 목록 순으로 찾고, 둘 다 없으면 (None, None, []).
+    """
+    cached = completion_executor.fallback(request_data)
+    if cached is not None:
+        answer = chat_content(cached)
+        return strip_recipe_ids(answer), 'cache', linked_recipe_ids(answer, candidates)
+    if candidates:
+        return catalog_answer(candidates, items, unavailable=True), 'catalog', [c.id for c in candidates]
+    return None, None, []
+
+
+def fetch_tts_audio(text):
+    """TTS 음성(mp3 bytes). 같은 문장을 동시에 요청하면 업스트림 호출 한 번으로 합친다."""
+    def fetch():
+        response = http_client.post('tts', idempotent=True, **tts_request_args(text))
+        response.raise_for_status()  # 200 OK가 아닐 경우 예외 발생
+        return response.content
+    return tts_flight.do(flight_key(tts_request_args(text)['data']), fetch)
+
+
+async def fetch_tts_audio_async(text):
+    async def fetch():
+        response = await async_http_client.post('tts', idempotent=True, **tts_request_args(text))
+        response.raise_for_status()
+        return response.content
+    return await tts_flight.do_async(flight_key(tts_request_args(text)['data']), fetch)
+
+
+# 키워드 / 기간 조합별 마지막 정상 트렌드 결과 (데이터랩 장애 시 대신 반환)
+search_trend_fallback = LRUTTLCache(maxsize=1024, ttl=TREND_FALLBACK_TTL)
+
+
+def trend_fallback(key, error):
+    print("Exception:", str(error))
+    cached = search_trend_fallback.get(key)
+    if cached is not None:
+        return {**cached, "stale": True}
+    return {"error": str(error)}
+
+
+def get_search_trend(keyword_groups, start_date="2024-10-01", end_date="2024-11-01", time_unit="month", ages=None, gender=None):
+    request_args = search_trend_request_args(keyword_groups, start_date, end_date, time_unit, ages, gender)
+    key = flight_key(request_args['data'])
+
+    def fetch():
+        try:
+            response = http_client.post('datalab', idempotent=True, **request_args)
+            response.raise_for_status()
+            response_data = response.json()
+        except Exception as e:
+            return trend_fallback(key, e)
+        search_trend_fallback.set(key, response_data)
+        return response_data
+    # 같은 키워드 / 기간 조합의 동시 요청은 한 번만 호출
+    return search_trend_flight.do(key, fetch)
+
+
+async def get_search_trend_async(keyword_groups, start_date="2024-10-01", end_date="2024-11-01", time_unit="month", ages=None, gender=None):
+    request_args = search_trend_request_args(keyword_groups, start_date, end_date, time_unit, ages, gender)
+    key = flight_key(request_args['data'])
+
+    async def fetch():
+        try:
+            response = await async_http_client.post('datalab', idempotent=True, **request_args)
+            response.raise_for_status()
+            response_data = response.json()
+        except Exception as e:
+            return trend_fallback(key, e)
+        search_trend_fallback.set(key, response_data)
+        return response_data
+    return await search_trend_flight.do_async(key, fetch)
+
+
+# /api/recipes 페이지 크기 최대값
+RECIPE_PAGE_MAX = 100
+
+# /api/recipes/batch 한 번에 조회할 수 있는 최대 레시피 수
+RECIPE_BATCH_LIMIT = int(os.getenv('RECIPE_BATCH_LIMIT', 50))
+
+# /api/conversations 페이지 크기 (기본값 / 최대값)
+CONVERSATION_PAGE_SIZE = int(os.getenv('CONVERSATION_PAGE_SIZE', 20))
+CONVERSATION_PAGE_MAX = 100
+# /api/conversations/export 에서 DB 커서로 한 번에 가져오는 행 수
+CONVERSATION_EXPORT_BATCH = int(os.getenv('CONVERSATION_EXPORT_BATCH', 200))
+
+
+# 커서 토큰 인코딩/디코딩 (클라이언트에는 불투명한 문자열로 전달)
+def encode_cursor(values):
+    raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    padded = token + '=' * (-len(token) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (binascii.Error, UnicodeError, json.JSONDecodeError) as e:
+        raise ValueError('Invalid cursor') from e
+    if not isinstance(values, dict):
+        raise ValueError('Invalid cursor')
+    return values
+
 
 # Register Flask routes
 def register_routes(app):
     # Session timeout settings
     app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(minutes=30)
+
     
     @app.route('/api/check-username', methods=['GET'])
     def check_username():
@@ -178,6 +511,7 @@ def register_routes(app):
 
         try:
             db.session.commit()
+            user_profiles.invalidate(username=username)  # 가입 전 채팅으로 남은 '없는 사용자' 별칭 제거
             print("User registered successfully")
             return jsonify({'message': 'User registered successfully'}), 201
         except SQLAlchemyError as e:
@@ -223,11 +557,8 @@ def register_routes(app):
 
     @app.route('/api/recipes', methods=['GET'])
     def get_recipes():
-        page = int(request.args.get('page', 1))
-        size = int(request.args.get('limit', 12))
         main_category = request.args.get('category', None)
         sub_category = request.args.get('subCategory', None)
-        offset = (page - 1) * size
 
         query = Recipe.query
         if main_category:
@@ -235,10 +566,119 @@ def register_routes(app):
         if sub_category:
             query = query.filter_by(rcp_pat2=sub_category)  # 서브 카테고리 필터링
 
-        # recipes = query.offset(offset).limit(size).all()
-        recipes = query.with_entities(Recipe.id, Recipe.rcp_nm, Recipe.att_file_no_main).offset(offset).limit(size).all()
+        # 영양 정보 범위 필터 (?max_kcal=500&min_protein=20 ...), DB 에서 처리
+        nutrition_filtered = False
+        nutrition_filters = []  # 개수 캐시 키
+        try:
+            size = int(request.args.get('limit', 12))
+            page = int(request.args.get('page', 1))
+        except ValueError:
+            return jsonify({'error': 'Invalid limit or page'}), 400
+        if not 1 <= size <= RECIPE_PAGE_MAX or page < 1:
+            return jsonify({'error': f'limit must be between 1 and {RECIPE_PAGE_MAX} and page must be positive'}), 400
+        try:
+            for param, column_name in NUTRITION_PARAMS.items():
+                column = getattr(Recipe, column_name)
+                if request.args.get(f'min_{param}'):
+                    value = float(request.args[f'min_{param}'])
+                    query = query.filter(column >= value)
+                    nutrition_filters.append((f'min_{param}', value))
+                    nutrition_filtered = True
+                if request.args.get(f'max_{param}'):
+                    value = float(request.args[f'max_{param}'])
+                    query = query.filter(column <= value)
+                    nutrition_filters.append((f'max_{param}', value))
+                    nutrition_filtered = True
+        except ValueError:
+            return jsonify({'error': 'Invalid nutrition filter'}), 400
+
+        # 정렬 (?sort=kcal 오름차순, ?sort=-kcal 내림차순). 값이 없는 레시피는 제외
+        sort = request.args.get('sort', '')
+        descending = sort.startswith('-')
+        sort_name = NUTRITION_PARAMS.get(sort.lstrip('-'))
+        if sort and sort_name is None:
+            return jsonify({'error': 'Invalid sort'}), 400
+        sort_column = getattr(Recipe, sort_name) if sort_name else None
+        if sort_column is not None:
+            query = query.filter(sort_column.isnot(None))
+            order_by = (sort_column.desc(), Recipe.id.desc()) if descending else (sort_column, Recipe.id)
+        else:
+            order_by = (Recipe.id,)
+
+        # 커서 모드: ?after=<id> 또는 ?cursor=<token> (첫 페이지는 ?mode=cursor)
+        # (정렬 값, id) 기준 keyset 페이지네이션이라 OFFSET 스캔과 COUNT 쿼리가 필요 없음
+        cursor_mode = request.args.get('mode') == 'cursor' or 'after' in request.args or 'cursor' in request.args
+        if cursor_mode:
+            try:
+                if request.args.get('cursor'):
+                    position = decode_cursor(request.args['cursor'])
+                    if position.get('sort', '') != sort:
+                        raise ValueError('Cursor was issued for a different sort')
+                    after_id = int(position['id'])
+                    after_value = float(position['value']) if sort_column is not None else None
+                else:
+                    if sort_column is not None and request.args.get('after'):
+                        raise ValueError('Use cursor tokens with sort')
+                    after_id = int(request.args.get('after', 0))
+                    after_value = None
+            except (ValueError, KeyError, TypeError):
+                return jsonify({'error': 'Invalid cursor'}), 400
+
+        # 스냅샷 모드: 카테고리 필터만 있는 목록은 DB 대신 mmap 스냅샷에서 조회
+        snapshot = catalog_snapshot.current()
+        if snapshot is not None and not nutrition_filtered and sort_column is None:
+            if cursor_mode:
+                rows, has_more = snapshot.list_after(main_category, sub_category, after_id, size)
+                return jsonify({
+                    "recipes": rows,
+                    "next_cursor": encode_cursor({"id": rows[-1]['id']}) if has_more else None
+                })
+            rows, total_items = snapshot.list_page(main_category, sub_category, (page - 1) * size, size)
+            return jsonify({"recipes": rows, "total_pages": (total_items + size - 1) // size})
+
+        columns = (Recipe.id, Recipe.rcp_nm, Recipe.att_file_no_main)
+
+        if cursor_mode:
+            if sort_column is None:
+                query = query.filter(Recipe.id > after_id)
+            elif after_value is not None:
+                position = tuple_(sort_column, Recipe.id)
+                query = query.filter(position < (after_value, after_id) if descending
+                                     else position > (after_value, after_id))
+
+            # 다음 페이지 존재 여부 확인을 위해 한 건 더 가져옴
+            rows = query.with_entities(*columns, *(sort_column,) if sort_column is not None else ()) \
+                .order_by(*order_by).limit(size + 1).all()
+            has_more = len(rows) > size
+            rows = rows[:size]
+
+            next_cursor = None
+            if has_more:
+                position = {"id": rows[-1].id}
+                if sort_column is not None:
+                    position.update(sort=sort, value=rows[-1][3])
+                next_cursor = encode_cursor(position)
 
-        total_items = query.count()
+            return jsonify({
+                "recipes": [{"id": r.id, "rcp_nm": r.rcp_nm, "att_file_no_main": r.att_file_no_main} for r in rows],
+                "next_cursor": next_cursor
+            })
+
+        offset = (page - 1) * size
+
+        # recipes = query.offset(offset).limit(size).all()
+        recipes = query.with_entities(*columns).order_by(*order_by).offset(offset).limit(size).all()
+
+        # 카테고리 필터만 있으면 개수는 캐시에서 조회 (rcp_set 변경 시에만 다시 계산)
+        # 영양 정보 필터 / 정렬이 있으면 조건별로 COUNT 결과를 캐시 (카탈로그 버전이 바뀌면 비워짐)
+        if nutrition_filtered or sort_column is not None:
+            count_key = (main_category or None, sub_category or None, tuple(nutrition_filters), sort_name)
+            total_items = filtered_recipe_counts.get(count_key)
+            if total_items is None:
+                total_items = query.count()
+                filtered_recipe_counts.set(count_key, total_items)
+        else:
+            total_items = recipe_counts.count(main_category, sub_category)
 
         result = {
             "recipes": [{"id": r.id, "rcp_nm": r.rcp_nm, "att_file_no_main": r.att_file_no_main} for r in recipes],
@@ -248,48 +688,207 @@ def register_routes(app):
         return jsonify(result)
 
 
+    # 카테고리 / 요리 종류 / 조리 방법별 레시피 개수 (필터 적용 가능)
+    @app.route('/api/recipes/facets', methods=['GET'])
+    def get_recipe_facets():
+        return jsonify(recipe_counts.facets(
+            category=request.args.get('category'),
+            rcp_pat2=request.args.get('subCategory'),
+            rcp_way2=request.args.get('way')
+        ))
+
+
+
+
+    # 레시피 이름 / 해시태그 / 재료 검색 (?q=김치찌개&limit=20)
+    @app.route('/api/recipes/search', methods=['GET'])
+    def search_recipes():
+        keyword = request.args.get('q', '').strip()
+        if not keyword:
+            return jsonify({'error': 'Query is required'}), 400
+        try:
+            limit = min(int(request.args.get('limit', 20)), 100)
+        except ValueError:
+            return jsonify({'error': 'Invalid limit'}), 400
+
+        results = search_index.search(keyword, limit=limit)
+        return jsonify({
+            'recipes': [
+                {'id': recipe_id, 'rcp_nm': name, 'att_file_no_main': image, 'score': round(score, 4)}
+                for recipe_id, name, image, score in results
+            ]
+        })
+
+
+    # 보유 재료로 만들 수 있는 레시피 추천
+    # GET ?items=계란,양파&limit=20 또는 POST {"ingredients": ["계란", "양파"], "limit": 20}
+    @app.route('/api/recipes/by-ingredients', methods=['GET', 'POST'])
+    def get_recipes_by_ingredients():
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
+            if not isinstance(data, dict):
+                return jsonify({'error': 'JSON object body is required'}), 400
+            items = data.get('ingredients', [])
+            limit = data.get('limit', 20)
+        else:
+            items = request.args.get('items', '').split(',')
+            limit = request.args.get('limit', 20)
+        try:
+            limit = min(int(limit), 100)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Invalid limit'}), 400
+        if not isinstance(items, list) or not any(isinstance(i, str) and i.strip() for i in items):
+            return jsonify({'error': 'Ingredients are required'}), 400
+
+        matches = ingredient_index.search([i for i in items if isinstance(i, str)], limit=limit)
+        ids = [m[0] for m in matches]
+        recipes = {r.id: r for r in db.session.query(Recipe.id, Recipe.rcp_nm, Recipe.att_file_no_main)
+                   .filter(Recipe.id.in_(ids))} if ids else {}
+
+        return jsonify({
+            'recipes': [
+                {
+                    'id': recipe_id,
+                    'rcp_nm': recipes[recipe_id].rcp_nm,
+                    'att_file_no_main': recipes[recipe_id].att_file_no_main,
+                    'overlap': overlap,
+                    'coverage': round(coverage, 3),
+                    'matched': matched,
+                    'missing': missing
+                } for recipe_id, overlap, coverage, matched, missing in matches if recipe_id in recipes
+            ]
+        })
+
+
+    def build_recipe_details(recipe_ids):
+        """레시피 ID 목록의 상세 정보를 IN 쿼리 두 번(레시피, 조리 단계)으로 생성. {id: payload}"""
+        # 스냅샷 모드에서는 DB 조회 없이 mmap 스냅샷에서 읽음
+        snapshot = catalog_snapshot.current()
+        if snapshot is not None:
+            details = {recipe_id: snapshot.get(recipe_id) for recipe_id in recipe_ids}
+            return {recipe_id: detail for recipe_id, detail in details.items() if detail is not None}
+
+        # 상세 화면에 필요한 컬럼만 조회 (manual01~20 컬럼은 읽지 않음)
+        recipes = db.session.query(
+            Recipe.id, Recipe.rcp_nm, Recipe.att_file_no_main, Recipe.rcp_parts_dtls, Recipe.rcp_na_tip
+        ).filter(Recipe.id.in_(recipe_ids)).all()
+        if not recipes:
+            return {}
+
+        # 비어 있지 않은 조리 단계만 (recipe_id, step_no) 인덱스로 한 번에 조회
+        steps = {}
+        for step in RecipeStep.query.filter(RecipeStep.recipe_id.in_([r.id for r in recipes])) \
+                .order_by(RecipeStep.recipe_id, RecipeStep.step_no):
+            steps.setdefault(step.recipe_id, []).append(step.to_dict())
+
+        return {
+            recipe.id: {
+                'id': recipe.id,
+                'name': recipe.rcp_nm,
+                'main_image': recipe.att_file_no_main,  # 메인 이미지 추가
+                'ingredients': recipe.rcp_parts_dtls,   # 재료 정보 추가
+                'tip': recipe.rcp_na_tip,               # 요리 팁 정보 추가
+                'steps': steps.get(recipe.id, [])
+            } for recipe in recipes
+        }
+
+
+    def cached_recipe_details(recipe_ids):
+        """직렬화된 상세 응답 (body, etag) 을 캐시에서 찾고, 없는 것만 한 번에 생성. {id: (body, etag)}"""
+        # 스냅샷 파일이 바뀌었으면 캐시를 읽기 전에 다시 열면서 상세 캐시를 비움
+        catalog_snapshot.current()
+        found = {}
+        missing = []
+        for recipe_id in recipe_ids:
+            cached = recipe_detail_cache.get(recipe_id)
+            if cached is None:
+                missing.append(recipe_id)
+            else:
+                found[recipe_id] = cached
+
+        if missing:
+            for recipe_id, result in build_recipe_details(missing).items():
+                body = app.json.dumps(result).encode('utf-8')
+                found[recipe_id] = (body, hashlib.sha256(body).hexdigest()[:32])
+                recipe_detail_cache.set(recipe_id, found[recipe_id])
+        return found
 
 
     @app.route('/api/recipe/<int:recipe_id>', methods=['GET'])
     def get_recipe_details(recipe_id):
-        recipe = Recipe.query.get(recipe_id)
-        if not recipe:
+        # 직렬화된 응답과 ETag 를 캐시 (레시피는 데이터 적재 전까지 바뀌지 않음)
+        cached = cached_recipe_details([recipe_id]).get(recipe_id)
+        if cached is None:
             return jsonify({'error': 'Recipe not found'}), 404
 
-        # recipe 데이터를 딕셔너리 형태로 변환
-        recipe_data = recipe.to_dict()
+        body, etag = cached
+        response = app.response_class(body, mimetype='application/json')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'  # 매번 If-None-Match 로 재검증
+        # If-None-Match 가 일치하면 304 Not Modified
+        return response.make_conditional(request)
 
-        # 단계별 조리 과정과 이미지 확인을 위한 디버깅
-        steps = []
-        for i in range(1, 21):
-            manual_key = f'manual{i:02}'
-            manual_img_key = f'manual_img{i:02}'
 
-            # 각 필드에 접근하여 값을 확인합니다.
-            manual = recipe_data.get(manual_key)
-            manual_img = recipe_data.get(manual_img_key)
+    # 비슷한 레시피 (python -m backend.similar build 로 미리 계산된 이웃 목록)
+    @app.route('/api/recipe/<int:recipe_id>/similar', methods=['GET'])
+    def get_similar_recipes(recipe_id):
+        try:
+            limit = min(int(request.args.get('limit', 10)), 50)
+        except ValueError:
+            return jsonify({'error': 'Invalid limit'}), 400
 
-            # manual 값이 유효한 경우에만 추가
-            if manual and manual.strip():
-                step_data = {
-                    'step': i,
-                    'description': manual.strip(),
-                }
-                # 이미지가 있을 경우 추가
-                if manual_img and manual_img.strip():
-                    step_data['image'] = manual_img.strip()
-                steps.append(step_data)
+        neighbors = similar_recipes.get(recipe_id, limit=limit)
+        if neighbors is None:
+            return jsonify({'error': 'Similar recipes are not built yet'}), 503
 
-        result = {
-            'id': recipe.id,
-            'name': recipe.rcp_nm,
-            'main_image': recipe.att_file_no_main,  # 메인 이미지 추가
-            'ingredients': recipe.rcp_parts_dtls,   # 재료 정보 추가
-            'tip': recipe.rcp_na_tip,               # 요리 팁 정보 추가
-            'steps': steps
-        }
-        
-        return jsonify(result)
+        ids = [n for n, _ in neighbors]
+        recipes = {r.id: r for r in db.session.query(Recipe.id, Recipe.rcp_nm, Recipe.att_file_no_main)
+                   .filter(Recipe.id.in_(ids))} if ids else {}
+        return jsonify({
+            'recipes': [
+                {
+                    'id': neighbor_id,
+                    'rcp_nm': recipes[neighbor_id].rcp_nm,
+                    'att_file_no_main': recipes[neighbor_id].att_file_no_main,
+                    'score': round(score, 4)
+                } for neighbor_id, score in neighbors if neighbor_id in recipes  # 이후 삭제된 레시피 제외
+            ]
+        })
+
+
+    # 여러 레시피 상세를 한 번에 조회 (요청 순서 유지)
+    # GET ?ids=1,2,3 또는 POST {"ids": [1, 2, 3]}
+    @app.route('/api/recipes/batch', methods=['GET', 'POST'])
+    def get_recipe_details_batch():
+        try:
+            if request.method == 'POST':
+                data = request.get_json(silent=True) or {}
+                if not isinstance(data, dict):
+                    return jsonify({'error': 'JSON object body is required'}), 400
+                raw_ids = data.get('ids', [])
+                if not isinstance(raw_ids, list):
+                    return jsonify({'error': 'Invalid ids'}), 400
+            else:
+                raw_ids = [i for i in request.args.get('ids', '').split(',') if i.strip()]
+            recipe_ids = list(dict.fromkeys(int(i) for i in raw_ids))  # 중복 제거, 순서 유지
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Invalid ids'}), 400
+        if not recipe_ids:
+            return jsonify({'error': 'ids are required'}), 400
+        if len(recipe_ids) > RECIPE_BATCH_LIMIT:
+            return jsonify({'error': f'At most {RECIPE_BATCH_LIMIT} ids are allowed'}), 400
+
+        details = cached_recipe_details(recipe_ids)
+
+        # 캐시된 상세 JSON 을 다시 파싱하지 않고 그대로 이어 붙여 응답 생성
+        body = b''.join((
+            b'{"recipes":[',
+            b','.join(details[i][0] for i in recipe_ids if i in details),
+            b'],"missing":',
+            app.json.dumps([i for i in recipe_ids if i not in details]).encode('utf-8'),
+            b'}'
+        ))
+        return app.response_class(body, mimetype='application/json')
 
 
 
@@ -297,64 +896,30 @@ def register_routes(app):
     
 
     # Clova X Chat Route
+    # 응답: response, session_id, recipe_ids(답변에 나온 카탈로그 레시피, /api/recipe/<id>),
+    #       source(clova / catalog / cache), Clova 장애로 대신 답했으면 fallback: true
     @app.route('/api/chat', methods=['POST'])
     def clova_x_chat():
         data = request.get_json()
-        user_message = data.get('message')
-
-        
-        username = data.get('username')  # Get the username from the request
-
-    # Retrieve user information based on username
-        user = User.query.filter_by(username=username).first()
-        
-        # 사용자 정보 기반의 추가 메시지 설정
-        user_info = ""
-        if user:
-            if user.favorite_food:
-                user_info += f"사용자의 선호 음식은 {user.favorite_food}입니다. "
-            if user.spice_level:
-                user_info += f"사용자의 선호 매운맛 레벨은 {user.spice_level}입니다. "
-            if user.birthdate:
-                age = datetime.now().year - user.birthdate.year
-                user_info += f"사용자의 나이는 {age}세입니다. "
-        
-        
-        
-        # Setup Clova X Executor
-        completion_executor = CompletionExecutor(
-            host='https://clovastudio.stream.ntruss.com',
-            api_key=os.getenv('CLOVA_X_API_KEY'),
-            api_key_primary_val=os.getenv('CLOVA_X_API_KEY_PRIMARY_VAL'),
-            request_id='cf44e176ce2641a683767d7093e7476a'
-        )
-
-        preset_text = [
-            {
-                "role": "system",
-                "content": "- 사용자가 가지고 있는 재료를 입력 받는다.\n\
-                    - 선호하는 음식 장르, 맵기 정도 등을 고려하여 최소 4개이상의 메뉴를 추천해준다.\n\
-                    - 사용자가 메뉴를 선택하면 전체 조리과정과 소요시간을 알려준다.\n\
-                    - 과정마다 상세히 알려준다.\n"
-                    + user_info
-            },
-            {
-                "role": "user",
-                "content": user_message
-            }
-        ]
-
-        request_data = {
-            'messages': preset_text,
-            'topP': 0.8,
-            'topK': 0,
-            'maxTokens': 400,
-            'temperature': 0.5,
-            'repeatPenalty': 6.5,
-            'stopBefore': [],
-            'includeAiFilters': True,
-            'seed': 0
-        }
+        chat_session = request_chat_session(data)
+        candidates, items, confident = retrieve_recipes(data.get('message'))
+
+        # 단순한 재료 메시지이고 후보가 잘 맞으면 Clova 없이 카탈로그에서 바로 답변
+        if confident:
+            answer = catalog_answer(candidates, items)
+            record_exchange(chat_session, data.get('message'), answer)
+            return jsonify({"response": answer, "session_id": chat_session.id,
+                            "recipe_ids": [c.id for c in candidates], "source": "catalog"})
+
+        request_data = build_chat_request(data, chat_session, candidates)
+
+        # Clova 장애 시 캐시된 답변 / 카탈로그 후보로 바로 응답 (대화 턴으로는 저장하지 않음)
+        def fallback_response(error_response):
+            answer, source, recipe_ids = fallback_chat_answer(request_data, candidates, items)
+            if answer is None:
+                return error_response
+            return jsonify({"response": answer, "session_id": chat_session.id,
+                            "recipe_ids": recipe_ids, "source": source, "fallback": True})
 
         try:
             response_data = completion_executor.execute(request_data)
@@ -363,20 +928,104 @@ def register_routes(app):
             print("Parsed response_data:", response_data)
 
             # Extract content, assuming response is structured correctly
-            content = response_data.get("result", {}).get("message", {}).get("content", "")
+            content = chat_content(response_data)
             
             if not content:
-                return jsonify({"response": "An error occurred while retrieving the recommended menu."}), 500
-            
-            return jsonify({"response": content})
+                return fallback_response(
+                    (jsonify({"response": "An error occurred while retrieving the recommended menu."}), 500))
+
+            recipe_ids = linked_recipe_ids(content, candidates)
+            content = strip_recipe_ids(content)
+            record_exchange(chat_session, data.get('message'), content)
+            return jsonify({"response": content, "session_id": chat_session.id,
+                            "recipe_ids": recipe_ids, "source": "clova"})
+
+        except (requests.exceptions.RequestException, UpstreamUnavailable) as e:
+            print("Error in clova_x_chat:", e)
+            return fallback_response((jsonify({"error": "The recommendation service is temporarily unavailable."}), 503))
 
         except Exception as e:
             print("Error in clova_x_chat:", e)
             return jsonify({"error": "An error occurred while processing your request."}), 500
+
+
+    # Clova X 스트리밍 채팅 (Server-Sent Events)
+    # event: token {"content": "..."} 을 생성되는 대로 보내고, 마지막에 event: done {"response": 전체 답변, ...}
+    # done 이벤트의 나머지 필드는 /api/chat 응답과 같음 (카탈로그에서 바로 답하면 done 이벤트만 보냄)
+    @app.route('/api/chat/stream', methods=['POST'])
+    def clova_x_chat_stream():
+        data = request.get_json()
+        chat_session = request_chat_session(data)
+        candidates, items, confident = retrieve_recipes(data.get('message'))
+        request_data = build_chat_request(data, chat_session, candidates)
+
+        # 토큰을 보내기 전에 Clova 가 실패하면 캐시된 답변 / 카탈로그 후보를 done 이벤트로 보냄
+        def fallback_event(error_message):
+            answer, source, recipe_ids = fallback_chat_answer(request_data, candidates, items)
+            if answer is None:
+                return format_sse('error', {'error': error_message})
+            return format_sse('done', {'response': answer, 'session_id': chat_session.id,
+                                       'recipe_ids': recipe_ids, 'source': source, 'fallback': True})
+
+        # 브라우저가 읽는 만큼만 업스트림에서 읽어 오는 generator (연결이 끊기면 업스트림도 닫힘)
+        # 끝까지 받은 답변은 대화 턴으로 저장하므로 요청 컨텍스트(DB 세션)를 유지
+        @stream_with_context
+        def generate():
+            if confident:
+                answer = catalog_answer(candidates, items)
+                record_exchange(chat_session, data.get('message'), answer)
+                yield format_sse('done', {'response': answer, 'session_id': chat_session.id,
+                                          'recipe_ids': [c.id for c in candidates], 'source': 'catalog'})
+                return
+
+            streamed = False
+            # 답변의 [#ID] 표시는 토큰으로 보내지 않음 (ID 는 done 이벤트의 recipe_ids 로 전달)
+            stripper = RecipeIdStripper()
+            try:
+                for event, payload in completion_executor.execute_stream(request_data):
+                    if event == 'token':
+                        content = stripper.feed(payload.get('message', {}).get('content', ''))
+                        if content:
+                            streamed = True
+                            yield format_sse('token', {'content': content})
+                    elif event == 'result':
+                        rest = stripper.flush()
+                        if rest:
+                            yield format_sse('token', {'content': rest})
+                        content = payload.get('message', {}).get('content', '')
+                        recipe_ids = linked_recipe_ids(content, candidates)
+                        content = strip_recipe_ids(content)
+                        if content:
+                            record_exchange(chat_session, data.get('message'), content)
+                        yield format_sse('done', {'response': content, 'session_id': chat_session.id,
+                                                  'recipe_ids': recipe_ids, 'source': 'clova'})
+                        return
+                    elif event == 'error':
+                        print("Error in clova_x_chat_stream:", payload)
+                        error_message = 'An error occurred while retrieving the recommended menu.'
+                        yield format_sse('error', {'error': error_message}) if streamed else fallback_event(error_message)
+                        return
+            except (requests.exceptions.RequestException, UpstreamUnavailable) as e:
+                print("Error in clova_x_chat_stream:", e)
+                error_message = 'An error occurred while processing your request.'
+                yield format_sse('error', {'error': error_message}) if streamed else fallback_event(error_message)
+
+        response = app.response_class(generate(), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'  # nginx 버퍼링 비활성화
+        return response
     
 
 
 
+    # 캐시 / 업스트림 모니터링 지표 (내부 구성이 드러나므로 서버 로컬 / 토큰이 있는 요청만)
+    @app.route('/api/metrics', methods=['GET'])
+    def get_metrics():
+        if not metrics_allowed(request.remote_addr, request.headers.get('Authorization')):
+            return jsonify({'error': 'Forbidden'}), 403
+        return jsonify(metrics_snapshot())
+
+
     @app.route('/api/main', methods=['GET'])
     def main_page():
         if 'user_id' in session:
@@ -405,6 +1054,7 @@ def register_routes(app):
             user.birthdate = data.get('birthdate', user.birthdate)  # 생년월일 업데이트 추가
 
             db.session.commit()
+            user_profiles.invalidate(user_id=user.id)  # 채팅 프롬프트 다시 생성
             return jsonify({'message': '수정되었습니다:)'}), 200
         else:
             return jsonify({'message': 'User not found'}), 404
@@ -423,6 +1073,7 @@ def register_routes(app):
         if user:
             user.set_password(new_password)
             db.session.commit()
+            user_profiles.invalidate(user_id=user.id)
             return jsonify({'message': 'Password changed successfully'}), 200
         else:
             return jsonify({'message': 'User not found'}), 404
@@ -440,43 +1091,131 @@ def register_routes(app):
             return jsonify({'error': 'Unauthorized'}), 401
 
         # 사용자의 메시지와 Clova X의 답변을 모두 포함
-        original_text = "\n".join([msg['message'] for msg in data.get('messages', [])])
-
-        # 요약할 텍스트가 충분한지 확인 (단어 수 제한 추가)
-        if len(original_text.split()) < 10:
-            summary_text = "대화 내용이 요약하기에 충분하지 않습니다."
+        # messages 없이 session_id 만 보내면 서버에 저장된 대화 턴을 사용
+        if data.get('messages'):
+            original_text = "\n".join([msg['message'] for msg in data.get('messages', [])])
         else:
-            # Clova Summary API를 사용하여 요약 생성
-            summary_executor = SummaryExecutor()
-            summary_text = summary_executor.summarize_text(original_text)
-            if "Error:" in summary_text:  # 요약 실패 시
-                summary_text = "요약에 실패했습니다."
-
-        # 대화 및 요약을 데이터베이스에 저장
-        conversation = Conversation(user_id=user_id, original_text=original_text, summary_text=summary_text)
+            original_text = session_transcript(data.get('session_id') or session.get('chat_session_id'), user_id)
+
+        # 원문만 저장하고 바로 응답, 요약은 백그라운드 워커가 처리 (backend/summary_queue.py)
+        # 요약하기에 너무 짧은 대화는 바로 완료 처리
+        conversation = new_conversation(user_id, original_text)
         db.session.add(conversation)
+        db.session.flush()
+        saved = {'id': conversation.id, 'summary_status': conversation.summary_status}
         db.session.commit()
+        summary_queue.notify()
 
-        return jsonify({'message': 'Conversation saved successfully'}), 200
+        return jsonify({'message': 'Conversation saved successfully', **saved}), 200
 
 
 
-    # 마이페이지에서 대화 목록 조회 API
+    # 마이페이지에서 대화 목록 조회 API (?limit=20&cursor=<token>, 최신 대화부터)
+    # (created_at, id) 기준 keyset 페이지네이션, 목록에 필요 없는 original_text 는 읽지 않음
     @app.route('/api/conversations', methods=['GET'])
     def get_conversations():
         user_id = session.get('user_id')
         if not user_id:
             return jsonify({'error': 'Unauthorized'}), 401
 
-        conversations = Conversation.query.filter_by(user_id=user_id).all()
+        try:
+            size = min(int(request.args.get('limit', CONVERSATION_PAGE_SIZE)), CONVERSATION_PAGE_MAX)
+            if size < 1:
+                raise ValueError('Invalid limit')
+        except ValueError:
+            return jsonify({'error': 'Invalid limit'}), 400
+
+        query = Conversation.query.options(load_only(
+            Conversation.id, Conversation.created_at, Conversation.summary_text, Conversation.summary_status
+        )).filter_by(user_id=user_id)
+        if request.args.get('cursor'):
+            try:
+                position = decode_cursor(request.args['cursor'])
+                after = (datetime.fromisoformat(position['created_at']), int(position['id']))
+            except (ValueError, KeyError, TypeError):
+                return jsonify({'error': 'Invalid cursor'}), 400
+            query = query.filter(tuple_(Conversation.created_at, Conversation.id) < after)
+
+        # 다음 페이지 존재 여부 확인을 위해 한 건 더 가져옴
+        conversations = query.order_by(Conversation.created_at.desc(), Conversation.id.desc()).limit(size + 1).all()
+        has_more = len(conversations) > size
+        conversations = conversations[:size]
+
+        next_cursor = None
+        if has_more:
+            last = conversations[-1]
+            next_cursor = encode_cursor({'created_at': last.created_at.isoformat(), 'id': last.id})
+
         return jsonify({
             'conversations': [
                 {
                     'id': conv.id,
                     'created_at': conv.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                    'summary_text': conv.summary_text
+                    'summary_text': display_summary(conv),
+                    'summary_status': conv.summary_status,
                 } for conv in conversations
-            ]
+            ],
+            'next_cursor': next_cursor
+        })
+
+
+
+    # 대화 기록 내보내기 (NDJSON, 한 줄에 대화 하나, id 오름차순)
+    # 서버 측 커서로 CONVERSATION_EXPORT_BATCH 행씩 읽어 바로 보내므로 대화 수와 관계없이 메모리 사용량이 일정함
+    # 연결이 끊기면 받은 마지막 id 로 ?after_id=<id> 를 보내 이어서 받음
+    @app.route('/api/conversations/export', methods=['GET'])
+    def export_conversations():
+        user_id = session.get('user_id')
+        if not user_id:
+            return jsonify({'error': 'Unauthorized'}), 401
+        try:
+            after_id = int(request.args.get('after_id', 0))
+        except ValueError:
+            return jsonify({'error': 'Invalid after_id'}), 400
+
+        rows = db.session.query(
+            Conversation.id, Conversation.created_at, Conversation.summary_text,
+            Conversation.summary_status, Conversation.original_text
+        ).filter(Conversation.user_id == user_id, Conversation.id > after_id) \
+            .order_by(Conversation.id).execution_options(yield_per=CONVERSATION_EXPORT_BATCH)
+
+        @stream_with_context
+        def generate():
+            try:
+                for row in rows:
+                    yield app.json.dumps({
+                        'id': row.id,
+                        'created_at': row.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+                        'summary': display_summary(row),
+                        'original_text': row.original_text,
+                    }) + '\n'
+            except SQLAlchemyError as e:
+                # 이미 보낸 응답은 되돌릴 수 없으므로 여기서 끊고, 클라이언트는 after_id 로 이어 받음
+                print("Error in export_conversations:", e)
+
+        response = app.response_class(generate(), mimetype='application/x-ndjson')
+        response.headers['Content-Disposition'] = 'attachment; filename=conversations.ndjson'
+        response.headers['X-Accel-Buffering'] = 'no'  # nginx 버퍼링 비활성화
+        return response
+
+
+
+    # 대화 하나의 전체 내용 (목록에서 선택했을 때만 original_text 조회)
+    @app.route('/api/conversation/<int:id>', methods=['GET'])
+    def get_conversation(id):
+        user_id = session.get('user_id')
+        if not user_id:
+            return jsonify({'error': 'Unauthorized'}), 401
+
+        conversation = Conversation.query.filter_by(id=id, user_id=user_id).first()
+        if not conversation:
+            return jsonify({'message': 'Conversation not found'}), 404
+        return jsonify({
+            'id': conversation.id,
+            'created_at': conversation.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'summary_text': display_summary(conversation),
+            'summary_status': conversation.summary_status,
+            'original_text': conversation.original_text,
         })
 
 
@@ -532,15 +1271,16 @@ def register_routes(app):
         
 
         # 네이버 API로 변환된 MP3 파일 전송
-        url = "https://naveropenapi.apigw.ntruss.com/recog/v1/stt?lang=Kor"  # 언어 코드 추가
-        headers = {
-            "X-NCP-APIGW-API-KEY-ID": os.getenv("NAVER_CLIENT_ID"),
-            "X-NCP-APIGW-API-KEY": os.getenv("NAVER_CLIENT_SECRET"),
-            "Content-Type": "application/octet-stream",
-        }
-
         with open(converted_path, 'rb') as mp3_file:
-            response = requests.post(url, headers=headers, data=mp3_file)
+            audio_data = mp3_file.read()  # 재시도 시 다시 보낼 수 있도록 bytes 로 전송
+        try:
+            response = http_client.post('stt', idempotent=True, **stt_request_args(audio_data))
+        except UpstreamUnavailable as e:
+            print("Error during STT process:", e)
+            return jsonify({"error": "Speech recognition is temporarily unavailable"}), 503
+        except requests.exceptions.RequestException as e:
+            print("Error during STT process:", e)
+            return jsonify({"error": "Failed to process audio"}), 502
 
         if response.status_code == 200:
             result_text = response.json().get("text", "")
@@ -562,25 +1302,15 @@ def register_routes(app):
         if not text:
             return jsonify({"error": "No text provided"}), 400
 
-        url = "https://naveropenapi.apigw.ntruss.com/tts-premium/v1/tts"
-        headers = {
-            "X-NCP-APIGW-API-KEY-ID": os.getenv("NAVER_CLIENT_ID"),
-            "X-NCP-APIGW-API-KEY": os.getenv("NAVER_CLIENT_SECRET"),
-            "Content-Type": "application/x-www-form-urlencoded",
-        }
-        payload = {
-            "speaker": "jinho",  # TTS 목소리 설정 (mijin: 여성, jinho: 남성 등)
-            "speed": "2",        # 말하기 속도 조절 (-5 ~ 5)
-            "text": text,
-        }
         try:
-            response = requests.post(url, headers=headers, data=payload)
-            response.raise_for_status()  # 200 OK가 아닐 경우 예외 발생
-            audio_content = response.content
+            audio_content = fetch_tts_audio(text)
 
             # 생성된 음성 파일을 반환
             return send_file(BytesIO(audio_content), mimetype="audio/mpeg")
         
+        except UpstreamUnavailable as e:
+            print(f"TTS API Error: {e}")
+            return jsonify({"error": "Text-to-speech is temporarily unavailable"}), 503
         except requests.exceptions.RequestException as e:
             print(f"TTS API Error: {e}")
             return jsonify({"error": "Failed to fetch TTS audio"}), 500
@@ -591,51 +1321,8 @@ def register_routes(app):
 
 # NAVER Trend 
 
-    def make_api_request(url, headers, body):
-        request = urllib.request.Request(url, data=body.encode("utf-8"))
-        for key, value in headers.items():
-            request.add_header(key, value)
-        try:
-            with urllib.request.urlopen(request) as response:
-                return json.loads(response.read().decode('utf-8'))
-        except Exception as e:
-            print("Exception:", str(e))
-            return {"error": str(e)}
-
-    def get_search_trend(keyword_groups, start_date="2024-10-01", end_date="2024-11-01", time_unit="month", ages=None, gender=None):
-        url = "https://naveropenapi.apigw.ntruss.com/datalab/v1/search"
-        headers = {
-            "X-NCP-APIGW-API-KEY-ID": os.getenv("NAVER_TREND_CLIENT_ID"),
-            "X-NCP-APIGW-API-KEY": os.getenv("NAVER_TREND_CLIENT_SECRET"),
-            "Content-Type": "application/json",
-            "Cache-Control": "no-cache",        # 캐시 비활성화
-            "Pragma": "no-cache"                # 추가적인 캐시 비활성화
-        }
-        body = json.dumps({
-            "startDate": start_date,
-            "endDate": end_date,
-            "timeUnit": time_unit,
-            "keywordGroups": keyword_groups,
-            "gender": gender or "",
-            "ages": ages or []
-        })
-        return make_api_request(url, headers, body)
-
-    def parse_keywords(input_text):
-        keywords = [kw.strip() for kw in input_text.split(',')]
-        keyword_groups = [{"groupName": kw, "keywords": [kw]} for kw in keywords]
-        return keyword_groups
-
     @app.route("/api/search-trend", methods=["POST"])
     def search_trend():
         data = request.get_json()
-        keywords = data.get("keywords", "")
-        start_date = data.get("start_date", (datetime.today() - timedelta(days=30)).strftime("%Y-%m-%d"))
-        end_date = data.get("end_date", datetime.today().strftime("%Y-%m-%d"))
-        time_unit = data.get("time_unit", "month")
-        ages = data.get("ages", [])
-        gender = data.get("gender", "")
-
-        keyword_groups = parse_keywords(keywords)
-        response_data = get_search_trend(keyword_groups, start_date, end_date, time_unit, ages, gender)
+        response_data = get_search_trend(**search_trend_params(data))
         return jsonify(response_data)
\ No newline at end of file
@@ -0,0 +1,241 @@
+"""레시피 이름 / 해시태그 / 재료에 대한 문자 bigram 전문 검색.
+
+MySQL 의 LIKE '%...%' 스캔 대신 메모리 역색인과 BM25 점수로 검색한다.
+색인은 디스크에 저장해 두고 서버 시작 시 불러오며, 카탈로그 버전이
+바뀐 경우에만 다시 만든다. 파일은 JSON 헤더 + 숫자 배열 바이트라서 불러올 때 코드를 실행하지 않는다.
+
+    python -m backend.search build   # 색인을 미리 만들어 저장
+"""
+import heapq
+import json
+import math
+import os
+import re
+import struct
+import sys
+import threading
+import time
+from array import array
+from .extensions import db
+from .models import Recipe
+from .catalog import current_catalog_version
+from .metrics import register_metrics
+
+
+SEARCH_INDEX_PATH = os.getenv(
+    'SEARCH_INDEX_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.search_index.bin')
+)
+INDEX_FORMAT = 2
+
+# 필드별 가중치 (이름 > 해시태그 > 재료)
+FIELD_WEIGHTS = (('rcp_nm', 3.0), ('hash_tag', 2.0), ('rcp_parts_dtls', 1.0))
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_WORD_RE = re.compile(r'[0-9a-z가-힣ㄱ-ㆎ]+')
+
+
+def tokenize(text):
+    """단어별 문자 bigram (한 글자 단어는 unigram) 목록."""
+    tokens = []
+    for word in _WORD_RE.findall((text or '').lower()):
+        if len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+class SearchIndex:
+    def __init__(self, path=SEARCH_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._data = None   # 색인 본체 (dict)
+        self.version = None
+        self.searches = 0
+        self.total_search_ms = 0.0
+
+    # 색인 구성
+    def build(self):
+        # 조회 도중 카탈로그가 바뀌면 다음 검색 때 다시 만들도록 조회 전에 버전을 읽어 둠
+        version = current_catalog_version()
+        rows = db.session.query(
+            Recipe.id, Recipe.rcp_nm, Recipe.att_file_no_main, Recipe.hash_tag, Recipe.rcp_parts_dtls
+        ).order_by(Recipe.id).all()
+
+        postings = {}  # term -> (array('I') 문서 번호, array('f') 가중 tf)
+        doc_lengths = array('f')
+        for doc_no, row in enumerate(rows):
+            term_freqs = {}
+            length = 0.0
+            for field, weight in FIELD_WEIGHTS:
+                for term in tokenize(getattr(row, field)):
+                    term_freqs[term] = term_freqs.get(term, 0.0) + weight
+                    length += weight
+            for term, tf in term_freqs.items():
+                docs, tfs = postings.setdefault(term, (array('I'), array('f')))
+                docs.append(doc_no)
+                tfs.append(tf)
+            doc_lengths.append(length)
+
+        return {
+            'format': INDEX_FORMAT,
+            'version': version,
+            'ids': array('I', (r.id for r in rows)),
+            'names': [r.rcp_nm for r in rows],
+            'images': [r.att_file_no_main for r in rows],
+            'doc_lengths': doc_lengths,
+            'avg_length': (sum(doc_lengths) / len(doc_lengths)) if rows else 0.0,
+            'postings': postings,
+        }
+
+    def save(self, data=None):
+        """색인 저장: 헤더 길이(8바이트) + JSON 헤더 + ids / doc_lengths / 전체 posting 배열 바이트."""
+        data = data or self._data
+        postings = data['postings']
+        terms = list(postings)
+        header = {
+            'format': data['format'],
+            'version': data['version'],
+            'byteorder': sys.byteorder,
+            'itemsizes': [array('I').itemsize, array('f').itemsize],
+            'names': data['names'],
+            'images': data['images'],
+            'avg_length': data['avg_length'],
+            'terms': terms,
+            'counts': [len(postings[term][0]) for term in terms],
+        }
+        header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+        docs, tfs = array('I'), array('f')
+        for term in terms:
+            docs.extend(postings[term][0])
+            tfs.extend(postings[term][1])
+
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(struct.pack('<Q', len(header_bytes)))
+            f.write(header_bytes)
+            for values in (data['ids'], data['doc_lengths'], docs, tfs):
+                values.tofile(f)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def _read_array(f, typecode, count, swap):
+        values = array(typecode)
+        values.fromfile(f, count)
+        if swap:
+            values.byteswap()
+        return values
+
+    def load(self):
+        """디스크의 색인을 불러온다. 파일이 없거나 형식이 다르면 False."""
+        try:
+            with open(self.path, 'rb') as f:
+                (header_size,) = struct.unpack('<Q', f.read(8))
+                header = json.loads(f.read(header_size).decode('utf-8'))
+                if (not isinstance(header, dict) or header.get('format') != INDEX_FORMAT
+                        or header.get('itemsizes') != [array('I').itemsize, array('f').itemsize]):
+                    return False
+                swap = header['byteorder'] != sys.byteorder
+                documents = len(header['names'])
+                ids = self._read_array(f, 'I', documents, swap)
+                doc_lengths = self._read_array(f, 'f', documents, swap)
+                total = sum(header['counts'])
+                docs = self._read_array(f, 'I', total, swap)
+                tfs = self._read_array(f, 'f', total, swap)
+        except (FileNotFoundError, EOFError, struct.error, ValueError, KeyError, TypeError):
+            return False
+
+        postings = {}
+        offset = 0
+        for term, count in zip(header['terms'], header['counts']):
+            postings[term] = (docs[offset:offset + count], tfs[offset:offset + count])
+            offset += count
+        data = {
+            'format': INDEX_FORMAT,
+            'version': header['version'],
+            'ids': ids,
+            'names': header['names'],
+            'images': header['images'],
+            'doc_lengths': doc_lengths,
+            'avg_length': header['avg_length'],
+            'postings': postings,
+        }
+        with self._lock:
+            self._data = data
+            self.version = data['version']
+        return True
+
+    def refresh(self):
+        data = self.build()
+        with self._lock:
+            self._data = data
+            self.version = data['version']
+        try:
+            self.save(data)
+        except OSError as e:
+            print(f"Search index save failed: {e}")
+
+    def _ensure_fresh(self):
+        if self._data is not None and self.version == current_catalog_version():
+            return
+        # 여러 요청이 동시에 재구성하지 않도록 한 번만 수행
+        with self._build_lock:
+            if self._data is None:
+                self.load()
+            if self._data is None or self.version != current_catalog_version():
+                self.refresh()
+
+    # 검색
+    def search(self, query, limit=20):
+        """BM25 점수 상위 limit 개를 heap 으로 선택. [(id, name, image, score), ...]"""
+        started = time.perf_counter()
+        self._ensure_fresh()
+        data = self._data
+        postings = data['postings']
+        doc_lengths = data['doc_lengths']
+        avg_length = data['avg_length'] or 1.0
+        doc_count = len(data['ids'])
+
+        scores = {}
+        for term in set(tokenize(query)):
+            entry = postings.get(term)
+            if entry is None:
+                continue
+            docs, tfs = entry
+            idf = math.log(1 + (doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_no, tf in zip(docs, tfs):
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths[doc_no] / avg_length)
+                scores[doc_no] = scores.get(doc_no, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        self.searches += 1
+        self.total_search_ms += (time.perf_counter() - started) * 1000
+        return [(data['ids'][doc_no], data['names'][doc_no], data['images'][doc_no], score)
+                for doc_no, score in top]
+
+    def stats(self):
+        data = self._data
+        return {
+            'documents': len(data['ids']) if data else 0,
+            'terms': len(data['postings']) if data else 0,
+            'searches': self.searches,
+            'avg_search_ms': round(self.total_search_ms / self.searches, 3) if self.searches else 0.0,
+        }
+
+
+search_index = SearchIndex()
+register_metrics('search_index', search_index.stats)
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] == ['build']:
+        from .app import app
+        with app.app_context():
+            started = time.perf_counter()
+            search_index.refresh()
+            print(f"Search index built in {time.perf_counter() - started:.2f}s: {search_index.stats()}")
+    else:
+        print('usage: python -m backend.search build')
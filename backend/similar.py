@@ -0,0 +1,247 @@
+"""비슷한 레시피 추천 (TF-IDF 코사인 유사도 top-k 사전 계산).
+
+레시피 이름 / 해시태그 / 재료 / 조리 방법 / 요리 종류로 TF-IDF 벡터를 만들고
+각 레시피의 상위 k 개 이웃을 미리 계산해 .npy 파일로 저장한다.
+API 는 파일을 mmap 으로 열어 레시피 ID 로 바로 이웃을 조회한다.
+
+    python -m backend.similar build
+"""
+import json
+import math
+import os
+import sys
+import threading
+import time
+import numpy as np
+from .extensions import db
+from .models import Recipe
+from .catalog import current_catalog_version
+from .ingredients import parse_ingredients
+from .search import tokenize
+from .metrics import register_metrics
+
+
+SIMILAR_DIR = os.getenv(
+    'SIMILAR_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.similar')
+)
+SIMILAR_TOP_K = int(os.getenv('SIMILAR_TOP_K', 20))
+# 유사도 계산 시 한 번에 곱할 행 수 (메모리 사용량 제한)
+SIMILAR_BLOCK_SIZE = 256
+
+
+def recipe_features(row):
+    """레시피 한 건의 (특징, 가중치) 목록."""
+    features = []
+    features.extend((f'nm:{t}', 2.0) for t in tokenize(row.rcp_nm))
+    features.extend((f'tag:{t}', 1.5) for t in tokenize(row.hash_tag))
+    features.extend((f'ing:{t}', 1.0) for t in parse_ingredients(row.rcp_parts_dtls, row.rcp_nm))
+    if row.rcp_way2:
+        features.append((f'way:{row.rcp_way2}', 1.0))
+    if row.rcp_pat2:
+        features.append((f'pat:{row.rcp_pat2}', 1.0))
+    return features
+
+
+def build_matrix(rows):
+    """TF-IDF 행렬 (행별 L2 정규화, float32). 한 레시피에만 나오는 특징은 제외."""
+    doc_features = []
+    doc_freq = {}
+    for row in rows:
+        weights = {}
+        for feature, weight in recipe_features(row):
+            weights[feature] = weights.get(feature, 0.0) + weight
+        doc_features.append(weights)
+        for feature in weights:
+            doc_freq[feature] = doc_freq.get(feature, 0) + 1
+
+    vocab = {f: i for i, f in enumerate(f for f, df in doc_freq.items() if df > 1)}
+    n = len(rows)
+    matrix = np.zeros((n, len(vocab)), dtype=np.float32)
+    for doc_no, weights in enumerate(doc_features):
+        for feature, weight in weights.items():
+            column = vocab.get(feature)
+            if column is not None:
+                idf = math.log(n / doc_freq[feature]) + 1.0
+                matrix[doc_no, column] = (1.0 + math.log(weight)) * idf
+
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+
+def top_k_neighbors(matrix, k):
+    """블록 단위 행렬 곱으로 각 행의 상위 k 개 이웃 (행 번호, 점수)."""
+    n = matrix.shape[0]
+    k = min(k, n - 1)
+    neighbors = np.zeros((n, k), dtype=np.int32)
+    scores = np.zeros((n, k), dtype=np.float16)
+    if k <= 0:
+        return neighbors, scores
+    for start in range(0, n, SIMILAR_BLOCK_SIZE):
+        block = matrix[start:start + SIMILAR_BLOCK_SIZE] @ matrix.T
+        rows = np.arange(block.shape[0])
+        block[rows, rows + start] = -np.inf  # 자기 자신 제외
+        candidates = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        candidate_scores = np.take_along_axis(block, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1)
+        neighbors[start:start + block.shape[0]] = np.take_along_axis(candidates, order, axis=1)
+        scores[start:start + block.shape[0]] = np.take_along_axis(candidate_scores, order, axis=1)
+    return neighbors, scores
+
+
+def load_rows():
+    return db.session.query(
+        Recipe.id, Recipe.rcp_nm, Recipe.hash_tag, Recipe.rcp_parts_dtls, Recipe.rcp_way2, Recipe.rcp_pat2
+    ).order_by(Recipe.id).all()
+
+
+def array_file(name, build_id):
+    """빌드별 배열 파일 이름 (build 가 없는 이전 형식은 ids.npy 등)."""
+    return f'{name}.{build_id}.npy' if build_id else f'{name}.npy'
+
+
+def read_meta(directory):
+    try:
+        with open(os.path.join(directory, 'meta.json')) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def remove_old_builds(directory, keep):
+    """현재 / 직전 빌드를 제외한 배열 파일 삭제.
+
+    삭제(unlink)는 이미 mmap 한 프로세스에 영향이 없고, 직전 빌드는 meta.json 을 읽은 직후
+    파일을 여는 프로세스를 위해 남겨 둔다.
+    """
+    for name in os.listdir(directory):
+        parts = name.split('.')
+        if len(parts) == 3 and parts[2] == 'npy' and parts[0] in ('ids', 'neighbors', 'scores') \
+                and parts[1] not in keep:
+            os.remove(os.path.join(directory, name))
+
+
+def build(rows=None, k=SIMILAR_TOP_K, directory=SIMILAR_DIR):
+    """이웃 목록을 계산해 directory 에 저장하고 단계별 소요 시간을 반환."""
+    timings = {}
+    started = time.perf_counter()
+    # 빌드 중에 카탈로그가 바뀌면 다음 확인 때 다시 빌드되도록 조회 전에 버전을 읽음
+    version = current_catalog_version()
+    if rows is None:
+        rows = load_rows()
+    timings['load'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    matrix = build_matrix(rows)
+    timings['vectorize'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    neighbor_rows, scores = top_k_neighbors(matrix, k)
+    timings['top_k'] = time.perf_counter() - started
+
+    # 행 번호 대신 레시피 ID 로 저장해 조회 시 추가 매핑이 필요 없게 함
+    ids = np.array([r.id for r in rows], dtype=np.int32)
+    os.makedirs(directory, exist_ok=True)
+    # 빌드마다 새 파일 이름으로 저장 (실행 중인 워커가 mmap 한 기존 파일을 덮어쓰면 SIGBUS 로 죽음)
+    build_id = f'{int(time.time() * 1000)}-{os.getpid()}'
+    arrays = {
+        'ids': ids,
+        'neighbors': ids[neighbor_rows] if len(ids) else neighbor_rows,
+        'scores': scores,
+    }
+    for name, array in arrays.items():
+        tmp_path = os.path.join(directory, f'{name}.{build_id}.tmp.npy')
+        np.save(tmp_path, array)
+        os.replace(tmp_path, os.path.join(directory, array_file(name, build_id)))
+    meta = {
+        'version': version,
+        'build': build_id,
+        'recipes': len(rows),
+        'features': int(matrix.shape[1]),
+        'k': int(neighbor_rows.shape[1]),
+        'built_at': time.time(),
+    }
+    # meta.json 을 마지막에 바꿔 읽는 쪽이 한 빌드의 파일만 함께 보도록 함
+    previous = read_meta(directory)
+    tmp_path = os.path.join(directory, f'meta.json.{os.getpid()}.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, os.path.join(directory, 'meta.json'))
+    remove_old_builds(directory, keep={build_id, (previous or {}).get('build')})
+    return meta, timings
+
+
+class SimilarRecipes:
+    """저장된 이웃 목록을 mmap 으로 읽어 레시피 ID 로 조회."""
+
+    RELOAD_CHECK_INTERVAL = 5.0
+
+    def __init__(self, directory=SIMILAR_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._rows = {}           # 레시피 ID -> 행 번호
+        self._neighbors = None
+        self._scores = None
+        self._meta = None
+        self._mtime = None
+        self._checked_at = 0.0
+
+    def _ensure_loaded(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.RELOAD_CHECK_INTERVAL:
+            return
+        with self._lock:
+            self._checked_at = now
+            meta_path = os.path.join(self.directory, 'meta.json')
+            try:
+                mtime = os.stat(meta_path).st_mtime_ns
+            except FileNotFoundError:
+                return
+            if mtime == self._mtime:
+                return
+            with open(meta_path) as f:
+                meta = json.load(f)
+            build_id = meta.get('build')
+            try:
+                ids = np.load(os.path.join(self.directory, array_file('ids', build_id)))
+                neighbors = np.load(os.path.join(self.directory, array_file('neighbors', build_id)), mmap_mode='r')
+                scores = np.load(os.path.join(self.directory, array_file('scores', build_id)), mmap_mode='r')
+            except FileNotFoundError as e:
+                # 다른 빌드가 방금 교체한 경우, 다음 확인 때 새 meta.json 으로 다시 읽음
+                print(f"Similar recipes load failed: {e}")
+                return
+            self._neighbors = neighbors
+            self._scores = scores
+            self._rows = {int(recipe_id): row for row, recipe_id in enumerate(ids)}
+            self._meta = meta
+            self._mtime = mtime
+
+    def get(self, recipe_id, limit=10):
+        """[(이웃 레시피 ID, 점수), ...]. 계산된 데이터가 없으면 None."""
+        self._ensure_loaded()
+        if self._meta is None:
+            return None
+        row = self._rows.get(recipe_id)
+        if row is None:
+            return []
+        return [(int(n), float(s)) for n, s in zip(self._neighbors[row, :limit], self._scores[row, :limit])]
+
+    def stats(self):
+        return self._meta or {}
+
+
+similar_recipes = SimilarRecipes()
+register_metrics('similar_recipes', similar_recipes.stats)
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] == ['build']:
+        from .app import app
+        with app.app_context():
+            meta, timings = build()
+        print(f"Similar recipes built: {meta}")
+        print('  ' + ', '.join(f'{step} {seconds:.3f}s' for step, seconds in timings.items()))
+    else:
+        print('usage: python -m backend.similar build')
@@ -0,0 +1,104 @@
+import asyncio
+import hashlib
+import json
+import threading
+from .metrics import register_metrics
+
+
+_groups = {}
+
+
+def flight_key(*parts):
+    """요청 인자로 만든 single-flight 키 (dict 는 키 순서와 무관)."""
+    raw = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """같은 키로 동시에 들어온 업스트림 호출을 한 번으로 합치는 그룹.
+
+    먼저 들어온 호출(leader)만 실제로 실행하고, 실행 중에 같은 키로 들어온
+    호출은 결과(또는 예외)를 함께 받는다. 끝난 호출의 결과는 보관하지 않는다.
+    do() 는 워커 안의 스레드끼리, do_async() 는 이벤트 루프 안의 코루틴끼리 합친다.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}     # key -> _Call
+        self._tasks = {}     # key -> asyncio.Task
+        self.calls = 0       # 실제 업스트림 호출 수
+        self.coalesced = 0   # 다른 호출에 합쳐진 수
+        _groups[name] = self
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    async def do_async(self, key, fn, *args, **kwargs):
+        task = self._tasks.get(key)
+        if task is None:
+            # 요청 하나가 취소돼도(연결 끊김) 다른 대기자에게 영향이 없도록 별도 task 로 실행
+            task = self._tasks[key] = asyncio.ensure_future(fn(*args, **kwargs))
+            task.add_done_callback(lambda t: self._task_done(key, t))
+            with self._lock:
+                self.calls += 1
+        else:
+            with self._lock:
+                self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _task_done(self, key, task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            task.exception()  # 대기자가 모두 취소된 경우에도 경고가 남지 않도록 예외를 확인 처리
+
+    def stats(self):
+        with self._lock:
+            total = self.calls + self.coalesced
+            return {
+                'calls': self.calls,
+                'coalesced': self.coalesced,
+                'coalesced_rate': round(self.coalesced / total, 4) if total else 0.0,
+                'in_flight': len(self._calls) + len(self._tasks),
+            }
+
+
+def singleflight_stats():
+    return {name: group.stats() for name, group in _groups.items()}
+
+
+register_metrics('singleflight', singleflight_stats)
@@ -0,0 +1,242 @@
+"""읽기 전용 레시피 카탈로그 스냅샷 (mmap).
+
+load_dataset/export_snapshot.py 가 rcp_set / recipe_step 을 바이너리 파일로
+내보내고, 서버는 RECIPE_SNAPSHOT_PATH 가 설정되어 있으면 목록 / 상세 조회를
+DB 대신 이 파일에서 처리한다. 파일을 mmap 으로 열기 때문에 여러 워커
+프로세스가 같은 페이지 캐시를 공유한다.
+
+파일 구조 (little-endian)
+    header   : magic(8) format(u32) count(u32) created_at(u64) version(32s)
+    ids      : u32[count]  (레시피 ID 오름차순)
+    offsets  : u64[count]  (각 레코드의 파일 내 위치)
+    records  : 문자열 6개 + 조리 단계
+               문자열 = u32 길이 + UTF-8 (길이 0xFFFFFFFF 는 None)
+               순서 = rcp_nm, att_file_no_main, rcp_parts_dtls, rcp_na_tip, category, rcp_pat2
+               조리 단계 = u16 개수 + (u16 step_no, 문자열 description, 문자열 image) 반복
+"""
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from .catalog import current_catalog_version, invalidate_recipe_cache
+from .metrics import register_metrics
+
+
+MAGIC = b'RCPSNAP\x00'
+SNAPSHOT_FORMAT = 1
+HEADER = struct.Struct('<8sIIQ32s')
+U16 = struct.Struct('<H')
+U32 = struct.Struct('<I')
+NULL_LENGTH = 0xFFFFFFFF
+
+RECORD_FIELDS = ('rcp_nm', 'att_file_no_main', 'rcp_parts_dtls', 'rcp_na_tip', 'category', 'rcp_pat2')
+
+RECIPE_SNAPSHOT_PATH = os.getenv('RECIPE_SNAPSHOT_PATH')
+
+
+def _pack_str(value):
+    if value is None:
+        return U32.pack(NULL_LENGTH)
+    data = value.encode('utf-8')
+    return U32.pack(len(data)) + data
+
+
+def write_snapshot(path, recipes, version=''):
+    """recipes: id 오름차순의 dict 목록 (RECORD_FIELDS + id + steps[(step_no, description, image)])."""
+    recipes = list(recipes)
+    count = len(recipes)
+    records_start = HEADER.size + 4 * count + 8 * count
+    records_start += -records_start % 8
+
+    ids = array('I')
+    offsets = array('Q')
+    chunks = []
+    position = records_start
+    for recipe in recipes:
+        parts = [_pack_str(recipe.get(field)) for field in RECORD_FIELDS]
+        steps = recipe.get('steps') or []
+        parts.append(U16.pack(len(steps)))
+        for step_no, description, image in steps:
+            parts.append(U16.pack(step_no) + _pack_str(description) + _pack_str(image))
+        record = b''.join(parts)
+        ids.append(recipe['id'])
+        offsets.append(position)
+        chunks.append(record)
+        position += len(record)
+
+    if ids != array('I', sorted(ids)):
+        raise ValueError('recipes must be sorted by id')
+    if sys.byteorder == 'big':
+        ids.byteswap()
+        offsets.byteswap()
+
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, SNAPSHOT_FORMAT, count, int(time.time()), str(version or '').encode('ascii')[:32]))
+        f.write(ids.tobytes())
+        f.write(offsets.tobytes())
+        f.write(b'\x00' * (records_start - f.tell()))
+        for chunk in chunks:
+            f.write(chunk)
+    # 새 파일로 교체 (기존 파일을 mmap 중인 프로세스는 이전 내용을 계속 읽음)
+    os.replace(tmp_path, path)
+
+
+class CatalogSnapshot:
+    """스냅샷 파일 하나를 mmap 으로 연 읽기 전용 카탈로그."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, file_format, count, created_at, version = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or file_format != SNAPSHOT_FORMAT:
+            raise ValueError(f'Not a recipe snapshot (format {file_format}): {path}')
+        if sys.byteorder == 'big':
+            raise ValueError('Recipe snapshots can only be read on little-endian hosts')
+        self.count = count
+        self.created_at = created_at
+        self.version = version.rstrip(b'\x00').decode('ascii') or None
+        view = memoryview(self._mm)
+        ids_start = HEADER.size
+        self._ids = view[ids_start:ids_start + 4 * count].cast('I')
+        self._offsets = view[ids_start + 4 * count:ids_start + 12 * count].cast('Q')
+
+        # (category, rcp_pat2) 조합별 레코드 번호 (ID 오름차순). 필터가 없는 경우(None)도 포함
+        groups = {}
+        for row in range(count):
+            category, rcp_pat2 = self._read_fields(row, 4, 6)
+            # category / rcp_pat2 가 NULL 이면 키가 겹치므로 한 그룹에 한 번만 넣음
+            for key in {(None, None), (category, None), (None, rcp_pat2), (category, rcp_pat2)}:
+                groups.setdefault(key, array('I')).append(row)
+        self._groups = groups
+
+    def _read_str(self, position):
+        length = U32.unpack_from(self._mm, position)[0]
+        position += 4
+        if length == NULL_LENGTH:
+            return None, position
+        return self._mm[position:position + length].decode('utf-8'), position + length
+
+    def _read_fields(self, row, start, stop):
+        """레코드의 start~stop 번째 문자열 필드."""
+        position = self._offsets[row]
+        values = []
+        for i in range(stop):
+            value, position = self._read_str(position)
+            if i >= start:
+                values.append(value)
+        return values
+
+    def _row(self, recipe_id):
+        row = bisect_left(self._ids, recipe_id)
+        if row < self.count and self._ids[row] == recipe_id:
+            return row
+        return None
+
+    def _summary(self, row):
+        rcp_nm, att_file_no_main = self._read_fields(row, 0, 2)
+        return {'id': self._ids[row], 'rcp_nm': rcp_nm, 'att_file_no_main': att_file_no_main}
+
+    def get(self, recipe_id):
+        """get_recipe_details 와 같은 형태의 상세 정보 (없으면 None)."""
+        row = self._row(recipe_id)
+        if row is None:
+            return None
+        position = self._offsets[row]
+        fields = {}
+        for field in RECORD_FIELDS:
+            fields[field], position = self._read_str(position)
+        step_count = U16.unpack_from(self._mm, position)[0]
+        position += 2
+        steps = []
+        for _ in range(step_count):
+            step_no = U16.unpack_from(self._mm, position)[0]
+            description, position = self._read_str(position + 2)
+            image, position = self._read_str(position)
+            step = {'step': step_no, 'description': description}
+            if image:
+                step['image'] = image
+            steps.append(step)
+        return {
+            'id': recipe_id,
+            'name': fields['rcp_nm'],
+            'main_image': fields['att_file_no_main'],
+            'ingredients': fields['rcp_parts_dtls'],
+            'tip': fields['rcp_na_tip'],
+            'steps': steps
+        }
+
+    def count_of(self, category=None, rcp_pat2=None):
+        return len(self._groups.get((category or None, rcp_pat2 or None), ()))
+
+    def list_page(self, category, rcp_pat2, offset, size):
+        rows = self._groups.get((category or None, rcp_pat2 or None), ())
+        return [self._summary(row) for row in rows[offset:offset + size]], len(rows)
+
+    def list_after(self, category, rcp_pat2, after_id, size):
+        """after_id 다음 레코드 size 개와 다음 페이지 존재 여부."""
+        rows = self._groups.get((category or None, rcp_pat2 or None), array('I'))
+        start = bisect_right(rows, after_id, key=lambda row: self._ids[row])
+        page = rows[start:start + size + 1]
+        return [self._summary(row) for row in page[:size]], len(page) > size
+
+
+class SnapshotManager:
+    """RECIPE_SNAPSHOT_PATH 파일이 바뀌면(mtime) 다시 여는 스냅샷 핸들.
+
+    스냅샷의 카탈로그 버전이 현재 버전과 다르면 사용하지 않는다 (DB 조회로 대체).
+    """
+
+    CHECK_INTERVAL = 2.0
+
+    def __init__(self, path=RECIPE_SNAPSHOT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._mtime = None
+        self._checked_at = 0.0
+
+    def current(self):
+        """사용 가능한 스냅샷 (스냅샷 모드가 아니거나 파일이 없으면 None)."""
+        if not self.path:
+            return None
+        now = time.monotonic()
+        if now - self._checked_at >= self.CHECK_INTERVAL:
+            with self._lock:
+                self._checked_at = now
+                try:
+                    mtime = os.stat(self.path).st_mtime_ns
+                except FileNotFoundError:
+                    if self._snapshot is not None:
+                        invalidate_recipe_cache()
+                    self._snapshot, self._mtime = None, None
+                    return None
+                if mtime != self._mtime:
+                    try:
+                        self._snapshot = CatalogSnapshot(self.path)
+                        self._mtime = mtime
+                        # 스냅샷을 다시 만들면 카탈로그 버전이 그대로여도 상세 응답 / ETag 캐시를 비움
+                        invalidate_recipe_cache()
+                    except (OSError, ValueError, struct.error) as e:
+                        print(f"Recipe snapshot load failed: {e}")
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version != current_catalog_version():
+            # 로더가 카탈로그를 바꾼 뒤 스냅샷을 다시 내보내기 전까지는 DB 에서 조회
+            return None
+        return snapshot
+
+    def stats(self):
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {'enabled': bool(self.path), 'loaded': False}
+        return {'enabled': True, 'loaded': True, 'recipes': snapshot.count,
+                'version': snapshot.version, 'created_at': snapshot.created_at,
+                'stale': snapshot.version != current_catalog_version()}
+
+
+catalog_snapshot = SnapshotManager()
+register_metrics('catalog_snapshot', catalog_snapshot.stats)
@@ -0,0 +1,230 @@
+"""로컬 테스트용 Naver / Clova API 스텁 서버.
+
+Clova X chat-completions 를 흉내 내며, Accept: text/event-stream 요청에는
+토큰을 token_delay 간격으로 하나씩 SSE 로 보낸다.
+요약 / 음성 인식 / 음성 합성 / 데이터랩 API 도 response_delay 후 고정 응답을 반환한다.
+
+장애 주입: fault_paths(경로 접두사, 비우면 전체) 요청에 대해 failure_rate 비율은 503,
+drop_rate 비율은 응답 없이 연결 종료, slow_rate 비율은 slow_delay 만큼 더 지연한다.
+실행 중에는 POST /__faults {"failure_rate": 1, "fault_paths": ["/tts-premium"]} 로 바꾼다.
+
+    python -m backend.stubs.naver_stub --port 8900 --token-delay 0.05
+    python -m backend.stubs.naver_stub --port 8900 --slow-rate 1 --slow-delay 30 --fault-path /tts-premium
+    CLOVA_HOST=http://127.0.0.1:8900 NAVER_API_HOST=http://127.0.0.1:8900 flask --app backend.app run
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+DEFAULT_ANSWER = (
+    "계란과 양파로 만들 수 있는 메뉴를 추천해 드릴게요. "
+    "1. 양파 계란덮밥 2. 계란말이 3. 양파 계란국 4. 양파 스크램블 에그"
+)
+DEFAULT_SUMMARY = "계란과 양파로 만들 수 있는 메뉴를 추천받았습니다."
+DEFAULT_TRANSCRIPT = "계란이랑 양파가 있어"
+# mp3 프레임 헤더 + 무음 데이터
+DEFAULT_AUDIO = b'\xff\xfb\x90\x64' + b'\x00' * 4096
+
+
+class StubConfig:
+    FAULT_FIELDS = ('failure_rate', 'drop_rate', 'slow_rate', 'slow_delay', 'fault_paths')
+
+    def __init__(self, answer=DEFAULT_ANSWER, token_delay=0.05, response_delay=0.0, token_size=2,
+                 failure_rate=0.0, drop_rate=0.0, slow_rate=0.0, slow_delay=0.0, fault_paths=()):
+        self.answer = answer
+        self.token_delay = token_delay        # 스트리밍 토큰 사이 지연 (초)
+        self.response_delay = response_delay  # 첫 응답 전 지연 (초)
+        self.token_size = token_size          # 토큰 하나의 글자 수
+        self.failure_rate = failure_rate      # 503 으로 응답하는 비율
+        self.drop_rate = drop_rate            # 응답 없이 연결을 끊는 비율
+        self.slow_rate = slow_rate            # slow_delay 만큼 더 지연하는 비율
+        self.slow_delay = slow_delay
+        self.fault_paths = list(fault_paths)  # 장애를 주입할 경로 접두사 (비우면 전체)
+
+    def tokens(self):
+        return [self.answer[i:i + self.token_size] for i in range(0, len(self.answer), self.token_size)]
+
+    def faults(self):
+        return {name: getattr(self, name) for name in self.FAULT_FIELDS}
+
+    def set_faults(self, **faults):
+        for name, value in faults.items():
+            if name in self.FAULT_FIELDS:
+                setattr(self, name, list(value) if name == 'fault_paths' else float(value))
+
+    def fault_for(self, path):
+        """이번 요청에 주입할 장애: 'fail' / 'drop' / 'slow' / None."""
+        if self.fault_paths and not any(path.startswith(prefix) for prefix in self.fault_paths):
+            return None
+        roll = random.random()
+        if roll < self.failure_rate:
+            return 'fail'
+        if roll < self.failure_rate + self.drop_rate:
+            return 'drop'
+        if random.random() < self.slow_rate:
+            return 'slow'
+        return None
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True  # 헤더 / 본문을 나눠 쓸 때 delayed ACK 로 40ms 씩 지연되는 것 방지
+    config = StubConfig()
+
+    def log_message(self, format, *args):
+        pass
+
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # 클라이언트가 연결을 먼저 끊은 경우
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, data):
+        self.wfile.write(f'{len(data):x}\r\n'.encode('ascii') + data + b'\r\n')
+        self.wfile.flush()
+
+    def _send_bytes(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/__faults':
+            self._send_json(200, self.config.faults())
+        else:
+            self._send_json(404, {'error': f'No stub for {self.path}'})
+
+    def inject_fault(self):
+        """장애를 주입해 응답을 끝냈으면 True."""
+        fault = self.config.fault_for(self.path)
+        if fault == 'fail':
+            self._send_json(503, {'error': 'Injected failure'})
+            return True
+        if fault == 'drop':
+            self.close_connection = True
+            return True
+        if fault == 'slow':
+            time.sleep(self.config.slow_delay)
+        return False
+
+    def do_POST(self):
+        body = self._read_body()
+        if self.path == '/__faults':
+            self.config.set_faults(**json.loads(body or b'{}'))
+            self._send_json(200, self.config.faults())
+            return
+        if self.inject_fault():
+            return
+        if self.path.startswith('/testapp/v1/chat-completions/'):
+            self.chat_completion()
+            return
+        if self.config.response_delay:
+            time.sleep(self.config.response_delay)
+        if self.path.startswith('/text-summary/v1/summarize'):
+            self._send_json(200, {'summary': DEFAULT_SUMMARY})
+        elif self.path.startswith('/recog/v1/stt'):
+            self._send_json(200, {'text': DEFAULT_TRANSCRIPT})
+        elif self.path.startswith('/tts-premium/v1/tts'):
+            self._send_bytes(200, 'audio/mpeg', DEFAULT_AUDIO)
+        elif self.path.startswith('/datalab/v1/search'):
+            self.search_trend(body)
+        else:
+            self._send_json(404, {'error': f'No stub for {self.path}'})
+
+    def search_trend(self, body):
+        request = json.loads(body or b'{}')
+        results = [
+            {'title': group.get('groupName'), 'keywords': group.get('keywords', []),
+             'data': [{'period': request.get('startDate'), 'ratio': 100.0 / (i + 1)}]}
+            for i, group in enumerate(request.get('keywordGroups', []))
+        ]
+        self._send_json(200, {'startDate': request.get('startDate'), 'endDate': request.get('endDate'),
+                              'timeUnit': request.get('timeUnit'), 'results': results})
+
+    def chat_completion(self):
+        config = self.config
+        if config.response_delay:
+            time.sleep(config.response_delay)
+        message = {'role': 'assistant', 'content': config.answer}
+
+        if 'text/event-stream' not in self.headers.get('Accept', ''):
+            self._send_json(200, {'status': {'code': '20000', 'message': 'OK'},
+                                  'result': {'message': message, 'stopReason': 'stop_before'}})
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        try:
+            for i, token in enumerate(config.tokens()):
+                data = json.dumps({'message': {'role': 'assistant', 'content': token}, 'index': i},
+                                  ensure_ascii=False)
+                self._write_chunk(f'id: {i}\nevent: token\ndata: {data}\n\n'.encode('utf-8'))
+                time.sleep(config.token_delay)
+            data = json.dumps({'message': message, 'stopReason': 'stop_before'}, ensure_ascii=False)
+            self._write_chunk(f'event: result\ndata: {data}\n\n'.encode('utf-8'))
+            self.wfile.write(b'0\r\n\r\n')
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # 클라이언트가 스트림을 중간에 닫은 경우
+            self.close_connection = True
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # 부하 테스트에서 동시 연결 수백 개를 받을 수 있도록
+
+
+def start_stub_server(host='127.0.0.1', port=0, **config):
+    """백그라운드 스레드에서 스텁 서버 실행. (server, base_url) 반환, 종료는 server.shutdown()."""
+    handler = type('ConfiguredStubHandler', (StubHandler,), {'config': StubConfig(**config)})
+    server = StubServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Naver / Clova API stub server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--token-delay', type=float, default=0.05)
+    parser.add_argument('--response-delay', type=float, default=0.0)
+    parser.add_argument('--answer', default=DEFAULT_ANSWER)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--drop-rate', type=float, default=0.0)
+    parser.add_argument('--slow-rate', type=float, default=0.0)
+    parser.add_argument('--slow-delay', type=float, default=0.0)
+    parser.add_argument('--fault-path', action='append', default=[], help='path prefix to inject faults into')
+    args = parser.parse_args()
+
+    handler = type('ConfiguredStubHandler', (StubHandler,), {'config': StubConfig(
+        answer=args.answer, token_delay=args.token_delay, response_delay=args.response_delay,
+        failure_rate=args.failure_rate, drop_rate=args.drop_rate, slow_rate=args.slow_rate,
+        slow_delay=args.slow_delay, fault_paths=args.fault_path)})
+    server = StubServer((args.host, args.port), handler)
+    print(f'Naver stub listening on http://{args.host}:{args.port}')
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,220 @@
+"""저장된 대화(Conversation)의 백그라운드 요약 큐.
+
+/api/save-conversation 은 원문만 저장하고(summary_status='pending') 바로 응답한다.
+워커 스레드가 대기 중인 행을 하나씩 가져가(running) Naver 요약 API 를 호출하고,
+실패하면 지수 백오프로 다시 시도하며 SUMMARY_MAX_ATTEMPTS 번 실패하면 failed 로 둔다.
+큐는 conversation 테이블 자체라서 별도 브로커가 필요 없고, 작업을 가져갈 때 조건부
+UPDATE 로 선점하므로 여러 프로세스의 워커가 같은 행을 동시에 처리하지 않는다.
+running 상태에서 워커가 죽은 행은 임대 시간(SUMMARY_LEASE)이 지나면 다시 처리된다.
+
+앱 프로세스 안에서는 첫 요청 때 SUMMARY_WORKERS 개의 스레드가 시작되고,
+SUMMARY_WORKERS=0 으로 두면 별도 프로세스에서만 처리할 수 있다.
+
+    python -m backend.summary_queue   # 별도 워커 프로세스
+"""
+import os
+import random
+import threading
+from datetime import datetime, timedelta
+from .extensions import db
+from .models import Conversation
+from .metrics import register_metrics
+
+
+SUMMARY_WORKERS = int(os.getenv('SUMMARY_WORKERS', 2))
+SUMMARY_MAX_ATTEMPTS = int(os.getenv('SUMMARY_MAX_ATTEMPTS', 5))
+SUMMARY_BACKOFF_BASE = float(os.getenv('SUMMARY_BACKOFF_BASE', 10))    # 첫 재시도 대기 시간(초)
+SUMMARY_BACKOFF_MAX = float(os.getenv('SUMMARY_BACKOFF_MAX', 600))
+SUMMARY_LEASE = float(os.getenv('SUMMARY_LEASE', 120))                 # running 행을 다른 워커가 가져가기까지의 시간(초)
+SUMMARY_POLL_INTERVAL = float(os.getenv('SUMMARY_POLL_INTERVAL', 5))   # 할 일이 없을 때 다시 확인하는 주기(초)
+# 요약하기에 너무 짧은 대화의 기준 (단어 수)
+SUMMARY_MIN_WORDS = 10
+
+PENDING, RUNNING, DONE, FAILED = 'pending', 'running', 'done', 'failed'
+SUMMARY_TOO_SHORT = "대화 내용이 요약하기에 충분하지 않습니다."
+SUMMARY_FAILED = "요약에 실패했습니다."
+SUMMARY_IN_PROGRESS = "요약 중입니다."
+
+
+class SummaryError(Exception):
+    """요약 API 호출 실패. retryable 이면 나중에 다시 시도한다."""
+
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def new_conversation(user_id, original_text):
+    """요약 대기 상태의 대화. 너무 짧은 대화는 요약 없이 바로 완료 처리한다."""
+    if len(original_text.split()) < SUMMARY_MIN_WORDS:
+        return Conversation(user_id=user_id, original_text=original_text,
+                            summary_text=SUMMARY_TOO_SHORT, summary_status=DONE)
+    return Conversation(user_id=user_id, original_text=original_text, summary_status=PENDING,
+                        summary_next_attempt_at=utcnow_seconds())
+
+
+def utcnow_seconds():
+    """초 단위로 자른 현재 UTC 시각 (summary_next_attempt_at 은 MySQL 에서 초 단위 DATETIME)."""
+    return datetime.utcnow().replace(microsecond=0)
+
+
+def display_summary(conversation):
+    """목록에 보여 줄 요약. 아직 요약 중이면 안내 문구."""
+    if conversation.summary_status in (PENDING, RUNNING):
+        return SUMMARY_IN_PROGRESS
+    return conversation.summary_text
+
+
+def backoff(attempts):
+    # full jitter: 0 ~ min(최대값, 기본값 * 2^(시도 횟수 - 1))
+    return random.uniform(0, min(SUMMARY_BACKOFF_MAX, SUMMARY_BACKOFF_BASE * (2 ** (attempts - 1))))
+
+
+class SummaryQueue:
+    def __init__(self, workers=SUMMARY_WORKERS):
+        self.workers = workers
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._summarize = None
+        self.succeeded = 0
+        self.retried = 0
+        self.failed = 0
+        self.lost_claims = 0  # 다른 워커가 먼저 가져간 경우
+
+    @property
+    def summarize(self):
+        # routes 가 이 모듈을 import 하므로 요약 API 는 처음 쓸 때 가져온다
+        if self._summarize is None:
+            from .routes import SummaryExecutor
+            self._summarize = SummaryExecutor().summarize
+        return self._summarize
+
+    def start(self, app, workers=None):
+        """워커 스레드 시작 (프로세스당 한 번)."""
+        workers = self.workers if workers is None else workers
+        with self._lock:
+            if self._threads or workers <= 0:
+                return
+            for i in range(workers):
+                thread = threading.Thread(target=self.run_forever, args=(app,), name=f'summary-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def notify(self):
+        """새 작업이 생겼음을 워커에 알림 (폴링 주기를 기다리지 않고 바로 처리)."""
+        self._wake.set()
+
+    def run_forever(self, app):
+        while True:
+            with app.app_context():
+                try:
+                    worked = self.run_once()
+                except Exception as e:
+                    # 어떤 오류에도 워커 스레드는 계속 돈다 (처리 중이던 행은 임대가 끝나면 다시 처리됨)
+                    db.session.rollback()
+                    print(f"Summary queue error: {e!r}")
+                    worked = False
+                finally:
+                    db.session.remove()
+            if not worked:
+                self._wake.wait(SUMMARY_POLL_INTERVAL)
+                self._wake.clear()
+
+    def claim(self):
+        """처리할 대화 하나를 running 으로 선점. (id, 시도 횟수, 임대 만료 시각) 또는 None."""
+        # MySQL DATETIME 은 초 단위라 마이크로초를 버려야 저장된 임대 시각과 그대로 비교할 수 있음
+        now = utcnow_seconds()
+        while True:
+            row = db.session.query(Conversation.id, Conversation.summary_status,
+                                   Conversation.summary_next_attempt_at, Conversation.summary_attempts) \
+                .filter(Conversation.summary_status.in_((PENDING, RUNNING)),
+                        Conversation.summary_next_attempt_at <= now) \
+                .order_by(Conversation.summary_next_attempt_at, Conversation.id).first()
+            if row is None:
+                db.session.commit()
+                return None
+
+            # 조회한 상태 그대로일 때만 가져감 (다른 워커 / 프로세스와 경쟁해도 한 곳만 성공)
+            lease_until = now + timedelta(seconds=SUMMARY_LEASE)
+            claimed = Conversation.query.filter_by(
+                id=row.id, summary_status=row.summary_status, summary_next_attempt_at=row.summary_next_attempt_at
+            ).update({
+                'summary_status': RUNNING,
+                'summary_next_attempt_at': lease_until,
+                'summary_attempts': Conversation.summary_attempts + 1,
+            }, synchronize_session=False)
+            db.session.commit()
+            if claimed == 1:
+                return row.id, row.summary_attempts + 1, lease_until
+            with self._lock:
+                self.lost_claims += 1
+
+    def run_once(self):
+        """대기 중인 대화 하나를 요약. 처리한 작업이 있으면 True."""
+        job = self.claim()
+        if job is None:
+            return False
+        conversation_id, attempts, lease_until = job
+
+        values = {'summary_next_attempt_at': None, 'summary_error': None}
+        try:
+            if attempts > SUMMARY_MAX_ATTEMPTS:
+                # 처리 중에 워커가 죽어 임대가 끝난 행이 계속 다시 잡히는 경우
+                raise SummaryError('lease expired too many times', retryable=False)
+            text = db.session.query(Conversation.original_text).filter_by(id=conversation_id).scalar()
+            db.session.commit()
+            values.update(summary_text=self.summarize(text), summary_status=DONE)
+            outcome = 'succeeded'
+        except Exception as e:
+            # SummaryError 가 아닌 예외(응답 파싱 / 원문 복원 실패 등)도 재시도 대상, 횟수는 SUMMARY_MAX_ATTEMPTS 로 제한
+            db.session.rollback()
+            retryable = e.retryable if isinstance(e, SummaryError) else True
+            values['summary_error'] = (str(e) if isinstance(e, SummaryError) else repr(e))[:255]
+            if retryable and attempts < SUMMARY_MAX_ATTEMPTS:
+                values.update(summary_status=PENDING,
+                              summary_next_attempt_at=utcnow_seconds() + timedelta(seconds=backoff(attempts)))
+                outcome = 'retried'
+            else:
+                values.update(summary_text=SUMMARY_FAILED, summary_status=FAILED)
+                outcome = 'failed'
+            print(f"Summary failed for conversation {conversation_id} (attempt {attempts}): {e!r}")
+
+        # 임대 시간이 지나 다른 워커가 가져간 경우에는 결과를 덮어쓰지 않음
+        Conversation.query.filter_by(
+            id=conversation_id, summary_status=RUNNING, summary_next_attempt_at=lease_until
+        ).update(values, synchronize_session=False)
+        db.session.commit()
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': len(self._threads),
+                'succeeded': self.succeeded,
+                'retried': self.retried,
+                'failed': self.failed,
+                'lost_claims': self.lost_claims,
+            }
+
+
+summary_queue = SummaryQueue()
+register_metrics('summary_queue', summary_queue.stats)
+
+
+def init_summary_queue(app):
+    """첫 요청 때 워커 스레드를 시작 (flask db 같은 CLI 명령에서는 시작하지 않음)."""
+    @app.before_request
+    def start_summary_workers():
+        summary_queue.start(app)
+
+
+if __name__ == '__main__':
+    from backend.app import app
+    workers = max(1, SUMMARY_WORKERS)
+    print(f"Summary workers: {workers}")
+    summary_queue.start(app, workers)
+    for thread in summary_queue._threads:
+        thread.join()
@@ -0,0 +1,262 @@
+"""긴 텍스트 컬럼(대화 원문) 압축 저장.
+
+CompressedText 컬럼은 str 을 압축한 bytes(BLOB)로 저장하고 읽을 때 다시 str 로 돌려준다.
+저장 형식은 첫 바이트로 구분하므로 압축 방식을 바꿔도 기존 값을 그대로 읽을 수 있다.
+
+    0x00 + UTF-8 원문   (TEXT_COMPRESS_MIN_SIZE 미만이거나 압축해도 줄지 않는 경우)
+    0x01 + zlib
+    0x02 + zstd 프레임  (사전을 쓴 경우 프레임 헤더에 사전 ID 가 들어감)
+
+zstd 는 zstandard 가 설치되어 있을 때만 사용한다. 한국어 레시피 대화는 짧고 비슷한
+표현이 반복되므로, 저장된 대화로 학습한 사전(TEXT_DICT_DIR/<dict_id>.zdict)이 있으면
+새 값은 최신 사전으로 압축한다. 사전 파일은 저장된 값을 읽는 데 필요하므로 모든 서버에
+함께 배포하고, 예전 사전도 지우지 않아야 한다.
+
+    python -m backend.text_compression train       # 저장된 대화로 zstd 사전 학습
+    python -m backend.text_compression recompress  # 기존 행을 현재 설정으로 다시 압축
+"""
+import os
+import sys
+import threading
+import time
+import zlib
+from sqlalchemy import LargeBinary, text
+from sqlalchemy.dialects import mysql
+from sqlalchemy.types import TypeDecorator
+from .metrics import register_metrics
+
+# zstandard 는 설치되어 있을 때만 사용
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+TEXT_COMPRESSION = os.getenv('TEXT_COMPRESSION', 'zstd' if zstandard is not None else 'zlib')  # zstd / zlib / none
+TEXT_ZLIB_LEVEL = int(os.getenv('TEXT_ZLIB_LEVEL', 6))
+TEXT_ZSTD_LEVEL = int(os.getenv('TEXT_ZSTD_LEVEL', 6))
+# 이 크기(bytes) 미만의 텍스트는 압축하지 않음
+TEXT_COMPRESS_MIN_SIZE = int(os.getenv('TEXT_COMPRESS_MIN_SIZE', 64))
+TEXT_DICT_DIR = os.getenv(
+    'TEXT_DICT_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.text_dicts')
+)
+TEXT_DICT_SIZE = int(os.getenv('TEXT_DICT_SIZE', 32 * 1024))
+# 사전 학습에 쓰는 최근 대화 수 / 다시 압축할 때 한 번에 처리하는 행 수
+TEXT_DICT_SAMPLES = 5000
+RECOMPRESS_BATCH_SIZE = 500
+
+RAW, ZLIB, ZSTD = b'\x00', b'\x01', b'\x02'
+
+
+class TextCodec:
+    def __init__(self, method=TEXT_COMPRESSION, dict_dir=TEXT_DICT_DIR):
+        if method == 'zstd' and zstandard is None:
+            print("TEXT_COMPRESSION=zstd but zstandard is not installed, using zlib")
+            method = 'zlib'
+        self.method = method
+        self.dict_dir = dict_dir
+        self._lock = threading.Lock()
+        self._local = threading.local()  # zstd (de)compressor 는 스레드 간에 공유하지 않음
+        self._dicts = None               # dict_id -> ZstdCompressionDict
+        self._current_dict = None
+        self.encoded = 0
+        self.decoded = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+        self.encode_seconds = 0.0
+        self.decode_seconds = 0.0
+
+    def load_dicts(self):
+        """TEXT_DICT_DIR 의 사전을 모두 불러오고 가장 최근 사전을 압축에 사용."""
+        dicts, newest = {}, None
+        if zstandard is not None and os.path.isdir(self.dict_dir):
+            paths = [os.path.join(self.dict_dir, name) for name in os.listdir(self.dict_dir) if name.endswith('.zdict')]
+            for path in sorted(paths, key=os.path.getmtime):
+                with open(path, 'rb') as f:
+                    newest = zstandard.ZstdCompressionDict(f.read())
+                dicts[newest.dict_id()] = newest
+        with self._lock:
+            self._dicts = dicts
+            self._current_dict = newest if self.method == 'zstd' else None
+        self._local = threading.local()
+
+    def _zstd(self):
+        if self._dicts is None:
+            self.load_dicts()
+        local = self._local
+        if getattr(local, 'compressor', None) is None:
+            dict_data = self._current_dict
+            local.compressor = zstandard.ZstdCompressor(level=TEXT_ZSTD_LEVEL, dict_data=dict_data) \
+                if dict_data is not None else zstandard.ZstdCompressor(level=TEXT_ZSTD_LEVEL)
+            local.decompressors = {}
+        return local
+
+    def _decompressor(self, dict_id):
+        local = self._zstd()
+        if dict_id not in local.decompressors:
+            if dict_id and dict_id not in self._dicts:
+                # 다른 프로세스가 새로 학습한 사전으로 압축한 값일 수 있으므로 사전을 다시 읽고 한 번 더 확인
+                self.load_dicts()
+                local = self._zstd()
+            if dict_id and dict_id not in self._dicts:
+                raise ValueError(f'zstd dictionary {dict_id} not found in {self.dict_dir}')
+            local.decompressors[dict_id] = zstandard.ZstdDecompressor(dict_data=self._dicts[dict_id]) \
+                if dict_id else zstandard.ZstdDecompressor()
+        return local.decompressors[dict_id]
+
+    def encode(self, value):
+        started = time.perf_counter()
+        raw = value.encode('utf-8')
+        stored = RAW + raw
+        if len(raw) >= TEXT_COMPRESS_MIN_SIZE and self.method != 'none':
+            if self.method == 'zstd':
+                compressed = ZSTD + self._zstd().compressor.compress(raw)
+            else:
+                compressed = ZLIB + zlib.compress(raw, TEXT_ZLIB_LEVEL)
+            if len(compressed) < len(stored):
+                stored = compressed
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.encoded += 1
+            self.raw_bytes += len(raw)
+            self.stored_bytes += len(stored)
+            self.encode_seconds += elapsed
+        return stored
+
+    def decode(self, stored):
+        started = time.perf_counter()
+        stored = bytes(stored)
+        header, body = stored[:1], stored[1:]
+        if header == RAW:
+            raw = body
+        elif header == ZLIB:
+            raw = zlib.decompress(body)
+        elif header == ZSTD:
+            if zstandard is None:
+                raise ValueError('zstd-compressed text requires the zstandard package')
+            dict_id = zstandard.get_frame_parameters(body).dict_id
+            raw = self._decompressor(dict_id).decompress(body)
+        else:
+            raise ValueError(f'Unknown text compression header {header!r}')
+        value = raw.decode('utf-8')
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.decoded += 1
+            self.decode_seconds += elapsed
+        return value
+
+    def is_current(self, stored):
+        """현재 설정(방식 / 사전)으로 압축된 값인지. recompress 에서 다시 압축할 행을 고를 때 사용."""
+        header = bytes(stored[:1])
+        if header == RAW:
+            return len(stored) - 1 < TEXT_COMPRESS_MIN_SIZE or self.method == 'none'
+        if self.method == 'zlib':
+            return header == ZLIB
+        if self.method != 'zstd' or header != ZSTD:
+            return False
+        self._zstd()
+        current_id = self._current_dict.dict_id() if self._current_dict is not None else 0
+        return zstandard.get_frame_parameters(bytes(stored[1:])).dict_id == current_id
+
+    def stats(self):
+        with self._lock:
+            return {
+                'method': self.method,
+                'dict_id': self._current_dict.dict_id() if self._current_dict is not None else None,
+                'encoded': self.encoded,
+                'decoded': self.decoded,
+                'raw_bytes': self.raw_bytes,
+                'stored_bytes': self.stored_bytes,
+                'saved_bytes': self.raw_bytes - self.stored_bytes,
+                'ratio': round(self.stored_bytes / self.raw_bytes, 3) if self.raw_bytes else None,
+                'encode_us': round(self.encode_seconds / self.encoded * 1e6, 1) if self.encoded else None,
+                'decode_us': round(self.decode_seconds / self.decoded * 1e6, 1) if self.decoded else None,
+            }
+
+
+text_codec = TextCodec()
+register_metrics('text_compression', text_codec.stats)
+
+
+class CompressedText(TypeDecorator):
+    """str <-> 압축된 bytes 컬럼 (MySQL 에서는 MEDIUMBLOB)."""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'mysql':
+            return dialect.type_descriptor(mysql.MEDIUMBLOB())
+        return dialect.type_descriptor(LargeBinary())
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else text_codec.encode(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, str):
+            return value
+        return text_codec.decode(value)
+
+
+def train_dictionary(texts, dict_dir=TEXT_DICT_DIR, dict_size=TEXT_DICT_SIZE):
+    """대화 원문 샘플로 zstd 사전을 학습해 <dict_id>.zdict 로 저장. 사전 ID 반환."""
+    if zstandard is None:
+        raise RuntimeError('zstandard is required to train a dictionary')
+    samples = [t.encode('utf-8') for t in texts if t]
+    trained = zstandard.train_dictionary(dict_size, samples, level=TEXT_ZSTD_LEVEL)
+    os.makedirs(dict_dir, exist_ok=True)
+    path = os.path.join(dict_dir, f'{trained.dict_id()}.zdict')
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(trained.as_bytes())
+    os.replace(tmp_path, path)
+    return trained.dict_id()
+
+
+def recompress(conn, codec=text_codec, batch_size=RECOMPRESS_BATCH_SIZE):
+    """conversation.original_text 를 batch_size 행씩 현재 설정으로 다시 압축. (확인한 행 수, 바꾼 행 수)"""
+    select_sql = text(
+        f"SELECT id, original_text FROM conversation WHERE id > :last_id ORDER BY id LIMIT {batch_size}"
+    )
+    update_sql = text("UPDATE conversation SET original_text = :original_text WHERE id = :id")
+    last_id, checked, changed = 0, 0, 0
+    while True:
+        rows = conn.execute(select_sql, {'last_id': last_id}).all()
+        if not rows:
+            break
+        updates = []
+        for row in rows:
+            if codec.is_current(row.original_text):
+                continue
+            stored = codec.encode(codec.decode(row.original_text))
+            if stored != bytes(row.original_text):
+                updates.append({'id': row.id, 'original_text': stored})
+        if updates:
+            conn.execute(update_sql, updates)
+        conn.commit()
+        checked += len(rows)
+        changed += len(updates)
+        last_id = rows[-1].id
+    return checked, changed
+
+
+if __name__ == '__main__':
+    command = sys.argv[1:]
+    if command == ['train']:
+        from .app import app
+        from .extensions import db
+        from .models import Conversation
+        with app.app_context():
+            texts = [row.original_text for row in db.session.query(Conversation.original_text)
+                     .order_by(Conversation.id.desc()).limit(TEXT_DICT_SAMPLES)]
+        dict_id = train_dictionary(texts)
+        print(f"Trained zstd dictionary {dict_id} from {len(texts)} conversations in {TEXT_DICT_DIR}")
+    elif command == ['recompress']:
+        from .app import app
+        from .extensions import db
+        with app.app_context(), db.engine.connect() as conn:
+            checked, changed = recompress(conn)
+        print(f"Recompressed {changed} of {checked} conversations ({text_codec.stats()})")
+    else:
+        print('usage: python -m backend.text_compression train|recompress')
@@ -15,6 +15,7 @@ const MyPage = () => {
         newPassword: ''
     });
     const [conversations, setConversations] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);  // 다음 대화 목록 페이지
     const [error, setError] = useState('');
     const [success, setSuccess] = useState('');
     const navigate = useNavigate();
@@ -34,6 +35,7 @@ const MyPage = () => {
             try {
                 const response = await axios.get('https://reciperecom.store/api/conversations', { withCredentials: true });
                 setConversations(response.data.conversations);
+                setNextCursor(response.data.next_cursor);
             } catch (error) {
                 console.error('Error fetching conversations:', error);
             }
@@ -91,6 +93,19 @@ const MyPage = () => {
         }
     };
 
+    const loadMoreConversations = async () => {
+        try {
+            const response = await axios.get('https://reciperecom.store/api/conversations', {
+                params: { cursor: nextCursor },
+                withCredentials: true
+            });
+            setConversations([...conversations, ...response.data.conversations]);
+            setNextCursor(response.data.next_cursor);
+        } catch (error) {
+            console.error('Error fetching conversations:', error);
+        }
+    };
+
     const handleDeleteConversation = async (id) => {
         try {
             await axios.delete(`https://reciperecom.store/api/conversation/${id}`, { withCredentials: true });
@@ -225,6 +240,11 @@ const MyPage = () => {
                         ) : (
                             <p>요약된 대화가 없습니다.</p>
                         )}
+                        {nextCursor && (
+                            <Button variant="outline-secondary" className="w-100 mt-3" onClick={loadMoreConversations}>
+                                더 보기
+                            </Button>
+                        )}
                     </Card.Body>
                 </Card>
             </Container>